@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Lock contention benchmark of pppipam.threadsafe.ThreadSafeAddressSpace.
+
+Reader threads look up random addresses while one writer thread
+describes and deletes hosts, for each number of readers requested.
+The same load runs over an address space guarded by a plain mutex,
+for comparison.  Lookups and writes per second are printed as a table.
+
+Usage:
+    python benchmarks/contention.py [--readers 1,2,4,8] [--seconds 2]
+"""
+
+import argparse
+import random
+import threading
+import time
+import typing
+
+from pppipam.pppipam import AddressSpace
+from pppipam.threadsafe import ThreadSafeAddressSpace
+
+
+class MutexAddressSpace:
+    """Address space serializing every call with a single lock."""
+
+    def __init__(self, address_space: AddressSpace) -> None:
+        self.__address_space = address_space
+        self.__lock = threading.Lock()
+
+    def description(self, ip_parameter: str) -> typing.Optional[str]:
+        with self.__lock:
+            return self.__address_space.description(ip_parameter)
+
+    def describe(self, *, ip_parameter: str, description: str) -> bool:
+        with self.__lock:
+            return self.__address_space.describe(
+                ip_parameter=ip_parameter, description=description
+            )
+
+    def delete(self, *, ip_parameter: str, cascade: bool) -> bool:
+        with self.__lock:
+            return self.__address_space.delete(
+                ip_parameter=ip_parameter, cascade=cascade
+            )
+
+
+def build_address_space(networks: int) -> AddressSpace:
+    """Describes networks /24 under 10.0.0.0/8 with a gateway each."""
+    address_space = AddressSpace(strict_=False)
+    rows = [("10.0.0.0/8", "private")]
+    for number in range(networks):
+        prefix = f"10.{number >> 8 & 255}.{number & 255}"
+        rows.append((prefix + ".0/24", "network"))
+        rows.append((prefix + ".1", "gateway"))
+    address_space.describe_many(rows)
+    return address_space
+
+
+def run(
+    space: typing.Any, readers: int, seconds: float, networks: int
+) -> typing.Tuple[float, float]:
+    """Returns lookups and writes per second under contention."""
+    stop = threading.Event()
+    lookups = [0] * readers
+    writes = [0]
+
+    def reader(slot: int) -> None:
+        generator = random.Random(slot)
+        count = 0
+        while not stop.is_set():
+            number = generator.randrange(networks)
+            space.description(
+                f"10.{number >> 8 & 255}.{number & 255}."
+                f"{generator.randrange(256)}"
+            )
+            count += 1
+        lookups[slot] = count
+
+    def writer() -> None:
+        generator = random.Random(-1)
+        count = 0
+        while not stop.is_set():
+            number = generator.randrange(networks)
+            host = f"10.{number >> 8 & 255}.{number & 255}.200"
+            space.describe(ip_parameter=host, description="host")
+            space.delete(ip_parameter=host, cascade=False)
+            count += 2
+        writes[0] = count
+
+    threads = [
+        threading.Thread(target=reader, args=(slot,))
+        for slot in range(readers)
+    ]
+    threads.append(threading.Thread(target=writer))
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return sum(lookups) / elapsed, writes[0] / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--readers", default="1,2,4,8",
+        help="comma separated numbers of reader threads",
+    )
+    parser.add_argument(
+        "--seconds", type=float, default=2.0,
+        help="duration of each run",
+    )
+    parser.add_argument(
+        "--networks", type=int, default=4096,
+        help="number of described /24 networks",
+    )
+    args = parser.parse_args()
+
+    print(f"{'lock':<8}{'readers':>8}{'lookups/s':>14}{'writes/s':>12}")
+    for readers in (int(value) for value in args.readers.split(",")):
+        for name, guard in (
+            ("rwlock", ThreadSafeAddressSpace),
+            ("mutex", MutexAddressSpace),
+        ):
+            space = guard(build_address_space(args.networks))
+            reads, writes = run(space, readers, args.seconds, args.networks)
+            print(f"{name:<8}{readers:>8}{reads:>14.0f}{writes:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
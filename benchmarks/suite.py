@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Benchmark suite of pppipam.AddressSpace operations.
+
+Synthetic address plans are generated offline for each plan shape, IP
+version and size:
+
+- flat: top-level networks side by side, without nesting;
+- deep: chains of networks, each one inside the previous one, down to
+  the longest prefix length;
+- wide: a single network with every other network as its child;
+- dense-host: /24 (IPv4) or /120 (IPv6) networks full of addresses.
+
+For each plan, describe, description, delete (with and without cascade)
+and export_data are timed call by call, and reported as number of calls,
+throughput, latency percentiles and peak memory traced while running
+them.  Deletions only count targets still described when deleted.
+
+Results are saved as JSON, and a previous results file can be given to
+compare throughput with.
+
+Usage:
+    python benchmarks/suite.py [--sizes 1000,10000,100000]
+                               [--plans flat,deep,wide,dense-host]
+                               [--versions 4,6] [--output results.json]
+                               [--compare previous.json]
+"""
+
+import argparse
+import datetime
+import gc
+import ipaddress
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+import typing
+
+from pppipam.pppipam import AddressSpace, IPObjectNotInSpaceError
+
+
+PLANS = ("flat", "deep", "wide", "dense-host")
+OPERATIONS = (
+    "describe", "description", "delete", "delete_cascade", "export_data"
+)
+
+# Base network and host network prefix length of each IP version.
+BASE = {
+    4: ipaddress.ip_network("10.0.0.0/8"),
+    6: ipaddress.ip_network("2001:db8::/32"),
+}
+HOST_PREFIXLEN = {4: 24, 6: 120}
+
+Row = typing.Tuple[str, str]
+
+_ADDRESS_CLASS = {4: ipaddress.IPv4Address, 6: ipaddress.IPv6Address}
+_NETWORK_CLASS = {4: ipaddress.IPv4Network, 6: ipaddress.IPv6Network}
+
+
+def _network(version: int, address: int, prefixlen: int) -> str:
+    """Returns network as str."""
+    return str(_NETWORK_CLASS[version]((address, prefixlen)))
+
+
+def _address(version: int, address: int) -> str:
+    """Returns address as str."""
+    return str(_ADDRESS_CLASS[version](address))
+
+
+def generate_plan(plan: str, version: int, size: int) -> typing.List[Row]:
+    """Generates rows of a synthetic address plan.
+
+    Args:
+        plan: one of PLANS.
+        version: IP version, 4 or 6.
+        size: number of rows.
+
+    Returns:
+        list of (IP object, description) rows, supernets first.
+    """
+    base = BASE[version]
+    first = int(base.network_address)
+    width = base.max_prefixlen
+    rows = list()
+
+    if plan in ("flat", "wide"):
+        # Smallest children of base holding size networks.
+        prefixlen = base.prefixlen + max(1, (size - 1).bit_length())
+        step = 1 << (width - prefixlen)
+        if plan == "wide":
+            rows.append((str(base), "wide parent"))
+        for number in range(size - len(rows)):
+            rows.append((
+                _network(version, first + number * step, prefixlen),
+                f"{plan} network {number}",
+            ))
+    elif plan == "deep":
+        levels = width - base.prefixlen
+        chains = -(-size // levels)
+        chain_bits = max(1, (chains - 1).bit_length())
+        for chain in range(chains):
+            start = first + (chain << (width - base.prefixlen - chain_bits))
+            for prefixlen in range(base.prefixlen, width):
+                if len(rows) == size:
+                    break
+                mask = ((1 << width) - 1) ^ ((1 << (width - prefixlen)) - 1)
+                rows.append((
+                    _network(version, start & mask, prefixlen),
+                    f"deep chain {chain} level {prefixlen}",
+                ))
+        # Chains share their first levels, so keep one row of each.
+        rows = list(dict(rows).items())
+    elif plan == "dense-host":
+        prefixlen = HOST_PREFIXLEN[version]
+        hosts = (1 << (width - prefixlen)) - 2
+        step = 1 << (width - prefixlen)
+        network = 0
+        while len(rows) < size:
+            start = first + network * step
+            rows.append((
+                _network(version, start, prefixlen), f"hosts {network}"
+            ))
+            for host in range(1, hosts + 1):
+                if len(rows) == size:
+                    break
+                rows.append((
+                    _address(version, start + host), f"host {host}"
+                ))
+            network += 1
+    else:
+        raise ValueError("plan must be one of " + ", ".join(PLANS))
+
+    return rows
+
+
+def _build(rows: typing.List[Row]) -> AddressSpace:
+    """Returns a non strict address space with rows described."""
+    address_space = AddressSpace(strict_=False)
+    address_space.describe_many(rows)
+    return address_space
+
+
+def _queries(
+    rows: typing.List[Row], version: int, count: int, generator: random.Random
+) -> typing.List[str]:
+    """Returns described IP objects and random addresses to look up."""
+    base = BASE[version]
+    queries = [row[0] for row in generator.choices(rows, k=count // 2)]
+    queries.extend(
+        _address(
+            version,
+            int(base.network_address)
+            + generator.randrange(base.num_addresses),
+        )
+        for _ in range(count - len(queries))
+    )
+    generator.shuffle(queries)
+    return queries
+
+
+def _deleted_targets(
+    rows: typing.List[Row], targets: typing.List[str], cascade: bool
+) -> typing.List[str]:
+    """Returns targets still described when their turn to be deleted comes.
+
+    Deletions are run once untimed, so targets removed by an earlier
+    cascade are neither timed nor counted as calls.
+    """
+    space = _build(rows)
+    deleted = list()
+    for ip in targets:
+        try:
+            space.delete(ip_parameter=ip, cascade=cascade)
+        except IPObjectNotInSpaceError:
+            continue
+        deleted.append(ip)
+    return deleted
+
+
+def _run(
+    operation: str,
+    rows: typing.List[Row],
+    version: int,
+    samples: int,
+) -> typing.Tuple[
+    typing.Callable[[], None],
+    typing.Callable[[], typing.List[typing.Callable[[], typing.Any]]],
+]:
+    """Prepares an operation.
+
+    Returns:
+        tuple of setup function, run before timing, and a function
+        returning the list of calls to be timed one by one.
+    """
+    state = dict()
+    generator = random.Random(0)
+
+    if operation == "describe":
+        def setup():
+            state["space"] = AddressSpace(strict_=False)
+
+        def calls():
+            describe = state["space"].describe
+            return [
+                (lambda ip=ip, text=text: describe(
+                    ip_parameter=ip, description=text
+                ))
+                for ip, text in rows
+            ]
+    elif operation == "description":
+        queries = _queries(rows, version, samples, generator)
+
+        def setup():
+            state["space"] = _build(rows)
+
+        def calls():
+            description = state["space"].description
+            return [(lambda ip=ip: description(ip)) for ip in queries]
+    elif operation in ("delete", "delete_cascade"):
+        cascade = operation == "delete_cascade"
+        sampled = generator.sample(rows, min(samples, len(rows)))
+        targets = _deleted_targets(rows, [row[0] for row in sampled], cascade)
+
+        def setup():
+            state["space"] = _build(rows)
+
+        def calls():
+            delete = state["space"].delete
+            return [
+                (lambda ip=ip: delete(ip_parameter=ip, cascade=cascade))
+                for ip in targets
+            ]
+    elif operation == "export_data":
+        def setup():
+            state["space"] = _build(rows)
+
+        def calls():
+            return [state["space"].export_data] * 5
+    else:
+        raise ValueError("operation must be one of " + ", ".join(OPERATIONS))
+
+    return setup, calls
+
+
+def _percentile(ordered: typing.List[float], fraction: float) -> float:
+    """Returns a percentile of sorted values, by nearest rank."""
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def measure(
+    operation: str, rows: typing.List[Row], version: int, samples: int
+) -> typing.Dict[str, typing.Any]:
+    """Times an operation call by call, then traces its peak memory.
+
+    Args:
+        operation: one of OPERATIONS.
+        rows: plan rows.
+        version: IP version of plan.
+        samples: number of lookups or deletions.
+
+    Returns:
+        dict of measurements.
+    """
+    setup, calls = _run(operation, rows, version, samples)
+
+    setup()
+    pending = calls()
+    latencies = list()
+    clock = time.perf_counter
+    gc.collect()
+    gc.disable()
+    try:
+        for call in pending:
+            start = clock()
+            call()
+            latencies.append(clock() - start)
+    finally:
+        gc.enable()
+
+    setup()
+    pending = calls()
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for call in pending:
+        call()
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    total = sum(latencies)
+    ordered = sorted(latencies)
+    return {
+        "calls": len(latencies),
+        "seconds": total,
+        "calls_per_second": len(latencies) / total if total else None,
+        "latency_us": {
+            name: _percentile(ordered, fraction) * 1e6
+            for name, fraction in (
+                ("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0)
+            )
+        },
+        "peak_memory_bytes": peak,
+    }
+
+
+def run_suite(
+    plans: typing.Iterable[str],
+    versions: typing.Iterable[int],
+    sizes: typing.Iterable[int],
+    operations: typing.Iterable[str],
+    samples: int,
+) -> typing.Iterator[typing.Dict[str, typing.Any]]:
+    """Yields measurements of every combination."""
+    for plan in plans:
+        for version in versions:
+            for size in sizes:
+                rows = generate_plan(plan, version, size)
+                for operation in operations:
+                    result = {
+                        "plan": plan,
+                        "version": version,
+                        "size": len(rows),
+                        "operation": operation,
+                    }
+                    result.update(measure(operation, rows, version, samples))
+                    yield result
+
+
+def _key(result: typing.Dict[str, typing.Any]) -> typing.Tuple:
+    """Returns what identifies a measurement across results files."""
+    return (
+        result["plan"], result["version"], result["size"],
+        result["operation"],
+    )
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--plans", default=",".join(PLANS),
+        help="comma separated plan shapes",
+    )
+    parser.add_argument(
+        "--versions", default="4,6", help="comma separated IP versions"
+    )
+    parser.add_argument(
+        "--sizes", default="1000,10000,100000",
+        help="comma separated numbers of IP objects per plan",
+    )
+    parser.add_argument(
+        "--operations", default=",".join(OPERATIONS),
+        help="comma separated operations",
+    )
+    parser.add_argument(
+        "--samples", type=int, default=10000,
+        help="number of lookups and deletions per plan",
+    )
+    parser.add_argument("--output", help="JSON file to save results to")
+    parser.add_argument(
+        "--compare", help="JSON file of previous results to compare with"
+    )
+    args = parser.parse_args()
+
+    previous = dict()
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fp:
+            previous = {
+                _key(result): result for result in json.load(fp)["results"]
+            }
+
+    results = list()
+    print(
+        f"{'plan':<11}{'v':>2}{'size':>9} {'operation':<15}"
+        f"{'calls':>8}{'calls/s':>12}{'p50 us':>9}{'p99 us':>9}"
+        f"{'peak MiB':>10}"
+        + (f"{'vs prev':>9}" if previous else "")
+    )
+    for result in run_suite(
+        args.plans.split(","),
+        [int(version) for version in args.versions.split(",")],
+        [int(size) for size in args.sizes.split(",")],
+        args.operations.split(","),
+        args.samples,
+    ):
+        results.append(result)
+        line = (
+            f"{result['plan']:<11}{result['version']:>2}{result['size']:>9} "
+            f"{result['operation']:<15}{result['calls']:>8}"
+            f"{result['calls_per_second'] or 0:>12.0f}"
+            f"{result['latency_us']['p50']:>9.1f}"
+            f"{result['latency_us']['p99']:>9.1f}"
+            f"{result['peak_memory_bytes'] / 2 ** 20:>10.1f}"
+        )
+        before = previous.get(_key(result))
+        if before and before["calls_per_second"]:
+            ratio = result["calls_per_second"] / before["calls_per_second"]
+            line += f"{ratio:>8.2f}x"
+        print(line, flush=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump(
+                {
+                    "meta": {
+                        "date": datetime.datetime.now(
+                            datetime.timezone.utc
+                        ).isoformat(),
+                        "python": sys.version,
+                        "platform": platform.platform(),
+                        "samples": args.samples,
+                    },
+                    "results": results,
+                },
+                fp,
+                indent=1,
+            )
+
+
+if __name__ == "__main__":
+    main()
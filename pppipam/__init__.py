@@ -3,6 +3,10 @@
 """Top-level package for PPPIPAM."""
 
 from .pppipam import AddressSpace
+from .journal import JournaledAddressSpace
+from .mapped import MappedAddressSpace
+from .sqlite import SQLiteAddressSpace
+from .threadsafe import ThreadSafeAddressSpace
 
 __author__ = """Alexandre Yukio Harano"""
 __email__ = 'alexandre@harano.net.br'
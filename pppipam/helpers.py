@@ -3,6 +3,8 @@
 
 """Module with helper functions."""
 
+import collections
+import functools
 import ipaddress
 import logging
 import typing
@@ -13,6 +15,20 @@ IPAddressParameter = typing.Union[str, IPAddress]
 IPNetwork = typing.Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
 IPNetworkParameter = typing.Union[str, IPNetwork]
 
+_IP_OBJECT_TYPES = (
+    ipaddress.IPv4Address,
+    ipaddress.IPv6Address,
+    ipaddress.IPv4Network,
+    ipaddress.IPv6Network,
+)
+
+# Number of parameters clean_ip_parameter could not process, per kind
+# the parameter was first parsed as ("address" or "network").
+parse_failures = collections.Counter()
+
+# If evaluated to True, clean_ip_parameter logs every failed parameter.
+log_parse_failures = False
+
 
 def clean_address(
     address_parameter: IPAddressParameter
@@ -78,6 +94,135 @@ def clean_network(
     return value
 
 
+def _record_parse_failure(kind: str, parameter: typing.Any) -> None:
+    """Counts and optionally logs a parameter that failed parsing."""
+    parse_failures[kind] += 1
+    if log_parse_failures:
+        logging.info("'%s' could not instantiate an IP %s", parameter, kind)
+
+
+def clean_ip_parameter(
+    ip_parameter: typing.Union[IPAddressParameter, IPNetworkParameter]
+) -> typing.Optional[typing.Union[IPAddress, IPNetwork]]:
+    """Process given parameter as an Address or else a Network instance.
+
+    Same result as trying clean_address and then clean_network, but
+    a str is parsed only once: as a network if it has a prefix length
+    separator, as an address otherwise.  Valid parameters raise no
+    exception internally and nothing is logged; failures are counted
+    in parse_failures and only logged if log_parse_failures is set.
+
+    >>> clean_ip_parameter('invalid parameter')
+    >>> clean_ip_parameter('203.0.113.123')
+    IPv4Address('203.0.113.123')
+    >>> clean_ip_parameter('2001:db8::/32')
+    IPv6Network('2001:db8::/32')
+    >>> clean_ip_parameter(ipaddress.ip_network('10.0.0.0/8'))
+    IPv4Network('10.0.0.0/8')
+
+    Args:
+        ip_parameter: value to be processed as an IP address or
+                      an IP network.
+
+    Returns:
+        IPv4Address, IPv6Address, IPv4Network or IPv6Network instance
+        or None.
+    """
+    if isinstance(ip_parameter, _IP_OBJECT_TYPES):
+        return ip_parameter
+
+    if isinstance(ip_parameter, str):
+        if _cached_parse is not None:
+            return _cached_parse(ip_parameter)
+        return _parse_str(ip_parameter)
+
+    return _parse(ip_parameter, ("address", "network"))
+
+
+def _parse(
+    ip_parameter: typing.Any, kinds: typing.Tuple[str, str]
+) -> typing.Optional[typing.Union[IPAddress, IPNetwork]]:
+    """Parses parameter trying each kind of IP object in order."""
+    for kind in kinds:
+        try:
+            if kind == "address":
+                return ipaddress.ip_address(ip_parameter)
+            return ipaddress.ip_network(ip_parameter)
+        except ValueError:
+            pass
+
+    _record_parse_failure(kinds[0], ip_parameter)
+    return None
+
+
+def _parse_str(
+    ip_parameter: str
+) -> typing.Optional[typing.Union[IPAddress, IPNetwork]]:
+    """Parses str parameter as clean_ip_parameter does."""
+    if "/" in ip_parameter:
+        return _parse(ip_parameter, ("network", "address"))
+    return _parse(ip_parameter, ("address", "network"))
+
+
+# Memoized _parse_str, if parameter cache is enabled.
+_cached_parse = None
+
+
+def configure_parameter_cache(maxsize: int) -> None:
+    """Enables, resizes or disables the parsed str parameter cache.
+
+    When enabled, clean_ip_parameter keeps up to maxsize str parameters
+    with their IP objects, discarding the least recently used ones.
+    IP objects are immutable, so sharing them is safe.  Parameters
+    that are not str are never cached.  Reconfiguring clears the cache
+    and its statistics.
+
+    Failures of cached parameters are counted in parse_failures
+    only once, when first parsed.
+
+    >>> configure_parameter_cache(128)
+    >>> clean_ip_parameter('192.0.2.0/24')
+    IPv4Network('192.0.2.0/24')
+    >>> clean_ip_parameter('192.0.2.0/24')
+    IPv4Network('192.0.2.0/24')
+    >>> parameter_cache_info()
+    CacheInfo(hits=1, misses=1, maxsize=128, currsize=1)
+    >>> configure_parameter_cache(0)
+    >>> parameter_cache_info()
+
+    Args:
+        maxsize: maximum number of cached parameters;
+                 0 disables the cache.
+
+    Raises:
+        TypeError: maxsize not int.
+        ValueError: negative maxsize.
+    """
+    global _cached_parse
+
+    if isinstance(maxsize, bool) or not isinstance(maxsize, int):
+        raise TypeError("maxsize must be int")
+    if maxsize < 0:
+        raise ValueError("maxsize must not be negative")
+
+    if maxsize == 0:
+        _cached_parse = None
+    else:
+        _cached_parse = functools.lru_cache(maxsize=maxsize)(_parse_str)
+
+
+def parameter_cache_info() -> typing.Optional[typing.NamedTuple]:
+    """Retrieves parsed str parameter cache statistics.
+
+    Returns:
+        CacheInfo named tuple with hits, misses, maxsize and currsize,
+        or None if cache is disabled.
+    """
+    if _cached_parse is None:
+        return None
+    return _cached_parse.cache_info()
+
+
 if __name__ == "__main__":
     import doctest
 
@@ -0,0 +1,1104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Module with index structures used by address space."""
+
+import bisect
+import typing
+
+
+# Sentinel for radix nodes that only join two branches.
+_EMPTY = object()
+
+
+def _count_entries(node: typing.Any) -> int:
+    """Returns number of entries of a radix subtree."""
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.value is not _EMPTY:
+            count += 1
+        if node.left is not None:
+            stack.append(node.left)
+        if node.right is not None:
+            stack.append(node.right)
+    return count
+
+
+class _RadixNode:
+    """Path-compressed node of a binary radix tree."""
+
+    __slots__ = ("key", "prefixlen", "value", "left", "right")
+
+    def __init__(
+        self, key: int, prefixlen: int, value: typing.Any = _EMPTY
+    ) -> None:
+        self.key = key
+        self.prefixlen = prefixlen
+        self.value = value
+        self.left = None
+        self.right = None
+
+
+class RadixTree:
+    """Binary radix (Patricia) tree over integer prefixes.
+
+    Each entry is identified by an integer key, already masked to its
+    prefix length, and a prefix length.  Lookups walk at most one node
+    per bit of the queried prefix, no matter how many entries exist.
+
+    >>> tree = RadixTree(32)
+    >>> tree.insert(0x0A000000, 8, "10.0.0.0/8")
+    >>> tree.insert(0x0A010000, 16, "10.1.0.0/16")
+    >>> tree.longest_match(0x0A010203, 32)
+    '10.1.0.0/16'
+    >>> tree.longest_match(0x0A020203, 32)
+    '10.0.0.0/8'
+    >>> tree.longest_match(0x0A010000, 15)
+    '10.0.0.0/8'
+    >>> tree.longest_match(0x0B000000, 32)
+    >>> tree.remove(0x0A000000, 8)
+    '10.0.0.0/8'
+    >>> len(tree)
+    1
+    """
+
+    def __init__(self, width: int) -> None:
+        """Creates an empty tree.
+
+        Args:
+            width: number of bits of every key (32 for IPv4,
+                   128 for IPv6).
+        """
+        self.__width = width
+        self.__root = None
+        self.__size = 0
+
+    def __len__(self) -> int:
+        """Returns number of entries."""
+        return self.__size
+
+    def __bit(self, key: int, position: int) -> int:
+        """Returns the bit of key at position, counting from the left."""
+        return (key >> (self.__width - 1 - position)) & 1
+
+    def __attach(
+        self,
+        parent: typing.Optional[_RadixNode],
+        old: typing.Optional[_RadixNode],
+        new: typing.Optional[_RadixNode],
+        bit: int = 0,
+    ) -> None:
+        """Replaces old child of parent (or root) with new node."""
+        if parent is None:
+            self.__root = new
+        elif old is not None and parent.left is old:
+            parent.left = new
+        elif old is not None and parent.right is old:
+            parent.right = new
+        elif bit:
+            parent.right = new
+        else:
+            parent.left = new
+
+    def insert(self, key: int, prefixlen: int, value: typing.Any) -> None:
+        """Inserts or replaces an entry.
+
+        Args:
+            key: integer prefix, masked to prefixlen.
+            prefixlen: number of significant bits of key.
+            value: object returned by lookups of this entry.
+        """
+        width = self.__width
+        parent = None
+        bit = 0
+        node = self.__root
+
+        while node is not None:
+            common = min(
+                width - (key ^ node.key).bit_length(),
+                prefixlen,
+                node.prefixlen,
+            )
+            if common == node.prefixlen:
+                if common == prefixlen:
+                    if node.value is _EMPTY:
+                        self.__size += 1
+                    node.value = value
+                    return
+                parent = node
+                bit = self.__bit(key, node.prefixlen)
+                node = node.right if bit else node.left
+                continue
+
+            new = _RadixNode(key, prefixlen, value)
+            if common == prefixlen:
+                replacement = new
+            else:
+                mask = ((1 << common) - 1) << (width - common)
+                replacement = _RadixNode(key & mask, common)
+                if self.__bit(key, common):
+                    replacement.right = new
+                else:
+                    replacement.left = new
+            if self.__bit(node.key, common):
+                replacement.right = node
+            else:
+                replacement.left = node
+            self.__attach(parent, node, replacement)
+            self.__size += 1
+            return
+
+        self.__attach(parent, None, _RadixNode(key, prefixlen, value), bit)
+        self.__size += 1
+
+    def remove(self, key: int, prefixlen: int) -> typing.Any:
+        """Removes an entry.
+
+        Args:
+            key: integer prefix, masked to prefixlen.
+            prefixlen: number of significant bits of key.
+
+        Returns:
+            value of removed entry.
+
+        Raises:
+            KeyError: entry not found.
+        """
+        grandparent = None
+        parent = None
+        node = self.__root
+
+        while node is not None and node.prefixlen < prefixlen:
+            grandparent, parent = parent, node
+            node = node.right if self.__bit(key, node.prefixlen) else node.left
+
+        if (
+            node is None
+            or node.prefixlen != prefixlen
+            or node.key != key
+            or node.value is _EMPTY
+        ):
+            raise KeyError((key, prefixlen))
+
+        value = node.value
+        node.value = _EMPTY
+        self.__size -= 1
+
+        if node.left is not None and node.right is not None:
+            return value
+
+        child = node.left if node.left is not None else node.right
+        self.__attach(parent, node, child)
+        if child is None and parent is not None and parent.value is _EMPTY:
+            # Parent only joined two branches and now has a single one.
+            other = parent.left if parent.left is not None else parent.right
+            self.__attach(grandparent, parent, other)
+
+        return value
+
+    def remove_covered(self, key: int, prefixlen: int) -> int:
+        """Removes an entry and every entry it covers, at once.
+
+        The branch holding them is detached as a whole, so only
+        counting removed entries depends on their number.
+
+        Args:
+            key: integer prefix, masked to prefixlen.
+            prefixlen: number of significant bits of key.
+
+        Returns:
+            number of removed entries.
+        """
+        width = self.__width
+        grandparent = None
+        parent = None
+        node = self.__root
+
+        while node is not None and node.prefixlen < prefixlen:
+            if (key ^ node.key) >> (width - node.prefixlen):
+                return 0
+            grandparent, parent = parent, node
+            node = node.right if self.__bit(key, node.prefixlen) else node.left
+
+        if node is None or (key ^ node.key) >> (width - prefixlen):
+            return 0
+
+        removed = _count_entries(node)
+        self.__size -= removed
+        self.__attach(parent, node, None)
+        if parent is not None and parent.value is _EMPTY:
+            # Parent only joined two branches and now has a single one.
+            other = parent.left if parent.left is not None else parent.right
+            self.__attach(grandparent, parent, other)
+
+        return removed
+
+    def longest_match(
+        self, key: int, prefixlen: int
+    ) -> typing.Optional[typing.Any]:
+        """Retrieves the value of the longest entry covering a prefix.
+
+        Args:
+            key: integer to be matched.
+            prefixlen: largest entry prefix length to be considered.
+
+        Returns:
+            value of the entry with the largest prefix length whose
+            prefix matches key, or None if there is no such entry.
+        """
+        width = self.__width
+        best = None
+        node = self.__root
+
+        while node is not None and node.prefixlen <= prefixlen:
+            if (key ^ node.key) >> (width - node.prefixlen):
+                break
+            if node.value is not _EMPTY:
+                best = node.value
+            if node.prefixlen == width:
+                break
+            node = node.right if self.__bit(key, node.prefixlen) else node.left
+
+        return best
+
+    def longest_match_counted(
+        self, key: int, prefixlen: int
+    ) -> typing.Tuple[typing.Optional[typing.Any], int]:
+        """Same as longest_match, also counting covering entries.
+
+        Args:
+            key: integer to be matched.
+            prefixlen: largest entry prefix length to be considered.
+
+        Returns:
+            tuple of longest_match result and number of entries
+            covering key examined on the way.
+        """
+        width = self.__width
+        best = None
+        examined = 0
+        node = self.__root
+
+        while node is not None and node.prefixlen <= prefixlen:
+            if (key ^ node.key) >> (width - node.prefixlen):
+                break
+            if node.value is not _EMPTY:
+                best = node.value
+                examined += 1
+            if node.prefixlen == width:
+                break
+            node = node.right if self.__bit(key, node.prefixlen) else node.left
+
+        return best, examined
+
+
+class _PersistentNode:
+    """Radix node owned by the tree version allowed to change it."""
+
+    __slots__ = ("key", "prefixlen", "value", "left", "right", "owner")
+
+    def __init__(
+        self,
+        key: int,
+        prefixlen: int,
+        value: typing.Any,
+        owner: typing.Optional[object],
+    ) -> None:
+        self.key = key
+        self.prefixlen = prefixlen
+        self.value = value
+        self.left = None
+        self.right = None
+        self.owner = owner
+
+
+class PersistentRadixTree:
+    """Binary radix tree whose versions share unchanged nodes.
+
+    Same entries and lookups as RadixTree.  freeze returns a read-only
+    tree in O(1), sharing every node with this one; afterwards, each
+    change copies only the nodes on its path that are still shared, so
+    frozen trees never see later changes.
+
+    >>> tree = PersistentRadixTree(32)
+    >>> tree.insert(0x0A000000, 8, "10.0.0.0/8")
+    >>> frozen = tree.freeze()
+    >>> tree.insert(0x0A010000, 16, "10.1.0.0/16")
+    >>> tree.longest_match(0x0A010203, 32)
+    '10.1.0.0/16'
+    >>> frozen.longest_match(0x0A010203, 32)
+    '10.0.0.0/8'
+    >>> tree.remove(0x0A000000, 8)
+    '10.0.0.0/8'
+    >>> [value for _, _, value in tree.items()]
+    ['10.1.0.0/16']
+    >>> [value for _, _, value in frozen.items()]
+    ['10.0.0.0/8']
+    >>> frozen.insert(0x0B000000, 8, "11.0.0.0/8")
+    Traceback (most recent call last):
+        ...
+    TypeError: frozen tree cannot be changed
+    """
+
+    def __init__(self, width: int) -> None:
+        """Creates an empty tree.
+
+        Args:
+            width: number of bits of every key.
+        """
+        self.__width = width
+        self.__root = None
+        self.__size = 0
+        self.__owner = object()
+
+    def __len__(self) -> int:
+        """Returns number of entries."""
+        return self.__size
+
+    def __bit(self, key: int, position: int) -> int:
+        """Returns the bit of key at position, counting from the left."""
+        return (key >> (self.__width - 1 - position)) & 1
+
+    def __own(self, node: _PersistentNode) -> _PersistentNode:
+        """Returns node itself if this tree owns it, or an owned copy."""
+        if node.owner is self.__owner:
+            return node
+        copy = _PersistentNode(
+            node.key, node.prefixlen, node.value, self.__owner
+        )
+        copy.left = node.left
+        copy.right = node.right
+        return copy
+
+    def freeze(self) -> "PersistentRadixTree":
+        """Returns a read-only tree with current entries.
+
+        Returns:
+            PersistentRadixTree instance that cannot be changed.
+        """
+        frozen = PersistentRadixTree(self.__width)
+        frozen.__root = self.__root
+        frozen.__size = self.__size
+        frozen.__owner = None
+        # Every current node is now shared with frozen tree.
+        self.__owner = object()
+        return frozen
+
+    def insert(self, key: int, prefixlen: int, value: typing.Any) -> None:
+        """Inserts or replaces an entry.
+
+        Args:
+            key: integer prefix, masked to prefixlen.
+            prefixlen: number of significant bits of key.
+            value: object returned by lookups of this entry.
+
+        Raises:
+            TypeError: tree is frozen.
+        """
+        if self.__owner is None:
+            raise TypeError("frozen tree cannot be changed")
+        self.__root = self.__insert(self.__root, key, prefixlen, value)
+
+    def __insert(
+        self,
+        node: typing.Optional[_PersistentNode],
+        key: int,
+        prefixlen: int,
+        value: typing.Any,
+    ) -> _PersistentNode:
+        """Returns subtree root after inserting an entry in it."""
+        if node is None:
+            self.__size += 1
+            return _PersistentNode(key, prefixlen, value, self.__owner)
+
+        width = self.__width
+        common = min(
+            width - (key ^ node.key).bit_length(), prefixlen, node.prefixlen
+        )
+        if common == node.prefixlen:
+            node = self.__own(node)
+            if common == prefixlen:
+                if node.value is _EMPTY:
+                    self.__size += 1
+                node.value = value
+            elif self.__bit(key, common):
+                node.right = self.__insert(node.right, key, prefixlen, value)
+            else:
+                node.left = self.__insert(node.left, key, prefixlen, value)
+            return node
+
+        self.__size += 1
+        new = _PersistentNode(key, prefixlen, value, self.__owner)
+        if common == prefixlen:
+            replacement = new
+        else:
+            mask = ((1 << common) - 1) << (width - common)
+            replacement = _PersistentNode(
+                key & mask, common, _EMPTY, self.__owner
+            )
+            if self.__bit(key, common):
+                replacement.right = new
+            else:
+                replacement.left = new
+        if self.__bit(node.key, common):
+            replacement.right = node
+        else:
+            replacement.left = node
+        return replacement
+
+    def remove(self, key: int, prefixlen: int) -> typing.Any:
+        """Removes an entry.
+
+        Args:
+            key: integer prefix, masked to prefixlen.
+            prefixlen: number of significant bits of key.
+
+        Returns:
+            value of removed entry.
+
+        Raises:
+            KeyError: entry not found.
+            TypeError: tree is frozen.
+        """
+        if self.__owner is None:
+            raise TypeError("frozen tree cannot be changed")
+        removed = list()
+        self.__root = self.__remove(self.__root, key, prefixlen, removed)
+        self.__size -= 1
+        return removed[0]
+
+    def __remove(
+        self,
+        node: typing.Optional[_PersistentNode],
+        key: int,
+        prefixlen: int,
+        removed: typing.List[typing.Any],
+    ) -> typing.Optional[_PersistentNode]:
+        """Returns subtree root after removing an entry from it."""
+        if node is None or node.prefixlen > prefixlen or (
+            (key ^ node.key) >> (self.__width - node.prefixlen)
+        ):
+            raise KeyError((key, prefixlen))
+
+        if node.prefixlen == prefixlen:
+            if node.value is _EMPTY:
+                raise KeyError((key, prefixlen))
+            removed.append(node.value)
+            if node.left is not None and node.right is not None:
+                node = self.__own(node)
+                node.value = _EMPTY
+                return node
+            return node.left if node.left is not None else node.right
+
+        if self.__bit(key, node.prefixlen):
+            child = self.__remove(node.right, key, prefixlen, removed)
+            if child is None and node.value is _EMPTY:
+                # Node only joined two branches and now has a single one.
+                return node.left
+            node = self.__own(node)
+            node.right = child
+        else:
+            child = self.__remove(node.left, key, prefixlen, removed)
+            if child is None and node.value is _EMPTY:
+                return node.right
+            node = self.__own(node)
+            node.left = child
+        return node
+
+    def remove_covered(self, key: int, prefixlen: int) -> int:
+        """Removes an entry and every entry it covers, at once.
+
+        Args:
+            key: integer prefix, masked to prefixlen.
+            prefixlen: number of significant bits of key.
+
+        Returns:
+            number of removed entries.
+
+        Raises:
+            TypeError: tree is frozen.
+        """
+        if self.__owner is None:
+            raise TypeError("frozen tree cannot be changed")
+        removed = list()
+        self.__root = self.__remove_covered(
+            self.__root, key, prefixlen, removed
+        )
+        self.__size -= sum(removed)
+        return sum(removed)
+
+    def __remove_covered(
+        self,
+        node: typing.Optional[_PersistentNode],
+        key: int,
+        prefixlen: int,
+        removed: typing.List[int],
+    ) -> typing.Optional[_PersistentNode]:
+        """Returns subtree root after removing entries covered by prefix."""
+        if node is None or (key ^ node.key) >> (
+            self.__width - min(node.prefixlen, prefixlen)
+        ):
+            return node
+        if node.prefixlen >= prefixlen:
+            removed.append(_count_entries(node))
+            return None
+
+        right = self.__bit(key, node.prefixlen)
+        old = node.right if right else node.left
+        child = self.__remove_covered(old, key, prefixlen, removed)
+        if child is old:
+            return node
+        if child is None and node.value is _EMPTY:
+            # Node only joined two branches and now has a single one.
+            return node.left if right else node.right
+        node = self.__own(node)
+        if right:
+            node.right = child
+        else:
+            node.left = child
+        return node
+
+    def get(self, key: int, prefixlen: int) -> typing.Optional[typing.Any]:
+        """Retrieves the value of an entry.
+
+        Args:
+            key: integer prefix, masked to prefixlen.
+            prefixlen: number of significant bits of key.
+
+        Returns:
+            value of entry or None if there is no such entry.
+        """
+        node = self.__root
+        while node is not None and node.prefixlen < prefixlen:
+            node = node.right if self.__bit(key, node.prefixlen) else node.left
+
+        if (
+            node is None
+            or node.prefixlen != prefixlen
+            or node.key != key
+            or node.value is _EMPTY
+        ):
+            return None
+        return node.value
+
+    def longest_match(
+        self, key: int, prefixlen: int
+    ) -> typing.Optional[typing.Any]:
+        """Retrieves the value of the longest entry covering a prefix.
+
+        Args:
+            key: integer to be matched.
+            prefixlen: largest entry prefix length to be considered.
+
+        Returns:
+            value of the entry with the largest prefix length whose
+            prefix matches key, or None if there is no such entry.
+        """
+        width = self.__width
+        best = None
+        node = self.__root
+
+        while node is not None and node.prefixlen <= prefixlen:
+            if (key ^ node.key) >> (width - node.prefixlen):
+                break
+            if node.value is not _EMPTY:
+                best = node.value
+            if node.prefixlen == width:
+                break
+            node = node.right if self.__bit(key, node.prefixlen) else node.left
+
+        return best
+
+    def items(self) -> typing.Iterator[typing.Tuple[int, int, typing.Any]]:
+        """Iterates entries by key, then by prefix length.
+
+        Yields:
+            tuples of key, prefix length and value.
+        """
+        stack = [self.__root] if self.__root is not None else []
+        while stack:
+            node = stack.pop()
+            if node.value is not _EMPTY:
+                yield node.key, node.prefixlen, node.value
+            if node.right is not None:
+                stack.append(node.right)
+            if node.left is not None:
+                stack.append(node.left)
+
+
+class ChildIndex:
+    """Children of a network, ordered by their first address.
+
+    Children of a same network never overlap, so their first addresses
+    are unique and also order their last addresses.  The children a new
+    network covers are then a contiguous slice, found by bisection.
+
+    >>> children = ChildIndex()
+    >>> children.add(30, "30/31")
+    >>> children.add(10, "10/31")
+    >>> children.add(20, "20")
+    >>> list(children)
+    ['10/31', '20', '30/31']
+    >>> list(children.pop_range(15, 31))
+    ['20', '30/31']
+    >>> list(children)
+    ['10/31']
+    """
+
+    __slots__ = ("starts", "items")
+
+    def __init__(
+        self,
+        starts: typing.Optional[typing.List[int]] = None,
+        items: typing.Optional[typing.List[typing.Any]] = None,
+    ) -> None:
+        """Creates children index.
+
+        Args:
+            starts: first addresses as int, already sorted.
+            items: children matching starts' order.
+        """
+        self.starts = starts if starts is not None else []
+        self.items = items if items is not None else []
+
+    def __len__(self) -> int:
+        """Returns number of children."""
+        return len(self.items)
+
+    def __iter__(self) -> typing.Iterator[typing.Any]:
+        """Iterates children by their first address."""
+        return iter(self.items)
+
+    def add(self, start: int, item: typing.Any) -> None:
+        """Inserts a child.
+
+        Args:
+            start: first address of child as int.
+            item: child to be inserted.
+        """
+        position = bisect.bisect_left(self.starts, start)
+        self.starts.insert(position, start)
+        self.items.insert(position, item)
+
+    def append(self, start: int, item: typing.Any) -> None:
+        """Inserts a child starting after every other child.
+
+        Args:
+            start: first address of child as int.
+            item: child to be inserted.
+        """
+        self.starts.append(start)
+        self.items.append(item)
+
+    def remove(self, start: int, item: typing.Any) -> None:
+        """Removes a child.
+
+        Args:
+            start: first address of child as int.
+            item: child to be removed.
+
+        Raises:
+            ValueError: child not found.
+        """
+        position = bisect.bisect_left(self.starts, start)
+        if position == len(self.starts) or self.items[position] != item:
+            raise ValueError("child not found")
+        del self.starts[position]
+        del self.items[position]
+
+    def pop_range(self, first: int, last: int) -> "ChildIndex":
+        """Removes and returns children starting between two addresses.
+
+        Args:
+            first: lowest first address as int, inclusive.
+            last: highest first address as int, inclusive.
+
+        Returns:
+            ChildIndex instance with removed children.
+        """
+        low = bisect.bisect_left(self.starts, first)
+        high = bisect.bisect_right(self.starts, last, low)
+        removed = ChildIndex(self.starts[low:high], self.items[low:high])
+        del self.starts[low:high]
+        del self.items[low:high]
+        return removed
+
+    def merge(self, other: "ChildIndex") -> None:
+        """Moves every child of another index into this one.
+
+        Every child of other must fit between two consecutive children
+        of this index, as children of a removed subnet do.  Children of
+        the smaller index are copied into the lists of the larger one,
+        which are kept: cost is copying min(n, m) children plus moving
+        the larger lists' items after the insertion point, done by a
+        single memmove.
+
+        Args:
+            other: index whose children are moved.
+        """
+        if not other.starts:
+            return
+        position = bisect.bisect_left(self.starts, other.starts[0])
+        if len(other.starts) > len(self.starts):
+            other.starts[:0] = self.starts[:position]
+            other.items[:0] = self.items[:position]
+            other.starts.extend(self.starts[position:])
+            other.items.extend(self.items[position:])
+            self.starts = other.starts
+            self.items = other.items
+        else:
+            self.starts[position:position] = other.starts
+            self.items[position:position] = other.items
+        other.starts = []
+        other.items = []
+
+
+class _BlockNode:
+    """Node of a free map: an occupied block or a join of two branches.
+
+    Occupied blocks are leaves; joins always have both branches.
+    """
+
+    __slots__ = ("key", "prefixlen", "free", "left", "right")
+
+    def __init__(self, key: int, prefixlen: int, free: int) -> None:
+        self.key = key
+        self.prefixlen = prefixlen
+        self.free = free
+        self.left = None
+        self.right = None
+
+
+class FreeMap:
+    """Occupied aligned blocks inside a network, for first-fit search.
+
+    Blocks are kept in a path-compressed binary trie whose nodes also
+    keep the shortest prefix length of a fully free aligned block under
+    them, as a buddy allocator does.  Finding the first free block of a
+    given size then only descends into branches with room for it, one
+    step per bit, no matter how many blocks are occupied.
+
+    >>> free_map = FreeMap(32, 0x0A000000, 24)
+    >>> free_map.insert(0x0A000000, 26)
+    >>> free_map.insert(0x0A000040, 32)
+    >>> hex(free_map.first_fit(26))
+    '0xa000080'
+    >>> hex(free_map.first_fit(30))
+    '0xa000044'
+    >>> hex(free_map.first_fit(32, start=0x0A000046))
+    '0xa000046'
+    >>> free_map.remove(0x0A000000, 26)
+    >>> hex(free_map.first_fit(26))
+    '0xa000000'
+    >>> free_map.insert(0x0A000000, 24)
+    >>> free_map.first_fit(32)
+    """
+
+    def __init__(self, width: int, key: int, prefixlen: int) -> None:
+        """Creates a free map of a fully free network.
+
+        Args:
+            width: number of bits of every key (32 for IPv4,
+                   128 for IPv6).
+            key: first address of network as int.
+            prefixlen: prefix length of network.
+        """
+        self.__width = width
+        self.__key = key
+        self.__prefixlen = prefixlen
+        self.__root = None
+
+    def __bit(self, key: int, position: int) -> int:
+        """Returns the bit of key at position, counting from the left."""
+        return (key >> (self.__width - 1 - position)) & 1
+
+    def __slot_free(
+        self, prefixlen: int, node: typing.Optional[_BlockNode]
+    ) -> int:
+        """Shortest free prefix length in a block holding a subtree.
+
+        Args:
+            prefixlen: prefix length of block.
+            node: only subtree inside block or None.
+
+        Returns:
+            prefix length of largest free aligned block inside block,
+            or width plus one if block is fully occupied.
+        """
+        if node is None:
+            return prefixlen
+        if node.prefixlen == prefixlen:
+            return node.free
+        # Half of block without node is free.
+        return prefixlen + 1
+
+    def __update(self, path: typing.List[_BlockNode]) -> None:
+        """Recomputes free values of joins, deepest first."""
+        for node in reversed(path):
+            node.free = min(
+                self.__slot_free(node.prefixlen + 1, node.left),
+                self.__slot_free(node.prefixlen + 1, node.right),
+            )
+
+    def __attach(
+        self,
+        parent: typing.Optional[_BlockNode],
+        old: _BlockNode,
+        new: typing.Optional[_BlockNode],
+    ) -> None:
+        """Replaces old child of parent (or root) with new node."""
+        if parent is None:
+            self.__root = new
+        elif parent.left is old:
+            parent.left = new
+        else:
+            parent.right = new
+
+    def insert(self, key: int, prefixlen: int) -> None:
+        """Marks a block as occupied.
+
+        Occupied blocks inside it are merged into it.
+
+        Args:
+            key: first address of block as int.
+            prefixlen: prefix length of block.
+
+        Raises:
+            ValueError: block is inside an occupied block.
+        """
+        width = self.__width
+        leaf = _BlockNode(key, prefixlen, width + 1)
+        path = list()
+        parent = None
+        node = self.__root
+
+        while node is not None:
+            common = min(
+                width - (key ^ node.key).bit_length(),
+                prefixlen,
+                node.prefixlen,
+            )
+            if common == prefixlen:
+                self.__attach(parent, node, leaf)
+                break
+            if common == node.prefixlen:
+                if node.left is None:
+                    raise ValueError("block inside an occupied block")
+                path.append(node)
+                parent = node
+                node = (
+                    node.right if self.__bit(key, node.prefixlen)
+                    else node.left
+                )
+                continue
+
+            mask = ((1 << common) - 1) << (width - common)
+            join = _BlockNode(key & mask, common, 0)
+            if self.__bit(key, common):
+                join.left, join.right = node, leaf
+            else:
+                join.left, join.right = leaf, node
+            self.__attach(parent, node, join)
+            path.append(join)
+            break
+        else:
+            self.__root = leaf
+
+        self.__update(path)
+
+    def __find_leaf(
+        self, key: int, prefixlen: int
+    ) -> typing.Tuple[typing.List[_BlockNode], _BlockNode]:
+        """Retrieves path of joins to an occupied block and its leaf.
+
+        Raises:
+            KeyError: block is not occupied.
+        """
+        path = list()
+        node = self.__root
+
+        while (
+            node is not None
+            and node.prefixlen < prefixlen
+            and node.left is not None
+        ):
+            path.append(node)
+            node = node.right if self.__bit(key, node.prefixlen) else node.left
+
+        if (
+            node is None
+            or node.key != key
+            or node.prefixlen != prefixlen
+            or node.left is not None
+        ):
+            raise KeyError((key, prefixlen))
+
+        return path, node
+
+    def remove(self, key: int, prefixlen: int) -> None:
+        """Marks an occupied block as free.
+
+        Args:
+            key: first address of block as int.
+            prefixlen: prefix length of block.
+
+        Raises:
+            KeyError: block is not occupied.
+        """
+        self.graft(key, prefixlen, None)
+
+    def graft(
+        self, key: int, prefixlen: int, other: typing.Optional["FreeMap"]
+    ) -> None:
+        """Replaces an occupied block with another map of that block.
+
+        Args:
+            key: first address of block as int.
+            prefixlen: prefix length of block.
+            other: free map of block, emptied, or None to free block.
+
+        Raises:
+            KeyError: block is not occupied.
+        """
+        path, leaf = self.__find_leaf(key, prefixlen)
+        parent = path[-1] if path else None
+        replacement = None
+        if other is not None:
+            replacement, other.__root = other.__root, None
+
+        if replacement is not None or parent is None:
+            self.__attach(parent, leaf, replacement)
+        else:
+            # Parent only joined two branches and now has a single one.
+            path.pop()
+            sibling = parent.right if parent.left is leaf else parent.left
+            self.__attach(path[-1] if path else None, parent, sibling)
+
+        self.__update(path)
+
+    def first_fit(
+        self, prefixlen: int, start: typing.Optional[int] = None
+    ) -> typing.Optional[int]:
+        """Retrieves the first free aligned block of a prefix length.
+
+        Args:
+            prefixlen: prefix length of block, at least the prefix
+                       length of map's network.
+            start: lowest first address as int of block, if any.
+
+        Returns:
+            first address as int of free block with the lowest
+            address, or None if there is no such block.
+        """
+        if start is None or start <= self.__key:
+            return self.__first_in(
+                prefixlen, self.__prefixlen, self.__key, self.__root
+            )
+        return self.__first_after(
+            prefixlen, start, self.__prefixlen, self.__key, self.__root
+        )
+
+    def __first_in(
+        self,
+        prefixlen: int,
+        block_prefixlen: int,
+        block_key: int,
+        node: typing.Optional[_BlockNode],
+    ) -> typing.Optional[int]:
+        """Retrieves the first free aligned block inside a block.
+
+        Args:
+            prefixlen: prefix length of free block.
+            block_prefixlen: prefix length of block to search in.
+            block_key: first address of block to search in as int.
+            node: only subtree inside block or None.
+
+        Returns:
+            first address as int of free block or None.
+        """
+        while self.__slot_free(block_prefixlen, node) <= prefixlen:
+            if node is None:
+                return block_key
+            half_bit = 1 << (self.__width - 1 - block_prefixlen)
+            block_prefixlen += 1
+            if node.prefixlen + 1 == block_prefixlen:
+                # Join of this block: left half first.
+                if self.__slot_free(block_prefixlen, node.left) <= prefixlen:
+                    node = node.left
+                else:
+                    block_key |= half_bit
+                    node = node.right
+            elif self.__bit(node.key, block_prefixlen - 1):
+                # Left half is free and, as block had room,
+                # large enough.
+                return block_key
+            elif self.__slot_free(block_prefixlen, node) > prefixlen:
+                # No room beside node in left half, so right one.
+                return block_key | half_bit
+
+        return None
+
+    def __first_after(
+        self,
+        prefixlen: int,
+        start: int,
+        block_prefixlen: int,
+        block_key: int,
+        node: typing.Optional[_BlockNode],
+    ) -> typing.Optional[int]:
+        """Retrieves the first free aligned block from an address on.
+
+        Only the half holding start is searched with the bound; any
+        half after it is searched as __first_in does.
+
+        Args:
+            prefixlen: prefix length of free block.
+            start: lowest first address as int of free block.
+            block_prefixlen: prefix length of block to search in.
+            block_key: first address of block to search in as int.
+            node: only subtree inside block or None.
+
+        Returns:
+            first address as int of free block or None.
+        """
+        width = self.__width
+        block_last = block_key | ((1 << (width - block_prefixlen)) - 1)
+        if (
+            block_last < start
+            or self.__slot_free(block_prefixlen, node) > prefixlen
+        ):
+            return None
+        if start <= block_key:
+            return self.__first_in(prefixlen, block_prefixlen, block_key, node)
+        if node is None:
+            host_bits = width - prefixlen
+            aligned = ((start + (1 << host_bits) - 1) >> host_bits) << host_bits
+            return aligned if aligned <= block_last else None
+
+        if node.prefixlen == block_prefixlen:
+            left, right = node.left, node.right
+        elif self.__bit(node.key, block_prefixlen):
+            left, right = None, node
+        else:
+            left, right = node, None
+
+        found = self.__first_after(
+            prefixlen, start, block_prefixlen + 1, block_key, left
+        )
+        if found is None:
+            found = self.__first_after(
+                prefixlen,
+                start,
+                block_prefixlen + 1,
+                block_key | (1 << (width - 1 - block_prefixlen)),
+                right,
+            )
+        return found
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
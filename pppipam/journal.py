@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Module with journaled address space.
+
+A journaled address space keeps, in its own directory:
+
+- snapshot.N: binary snapshot (see pppipam.snapshot module) with every
+  mutation journaled before generation N;
+- journal.N: append-only journal of mutations of generation N.
+
+On open, the latest snapshot is loaded and journals from its generation
+onwards are replayed.  Compaction starts a new journal generation and
+folds previous ones into a new snapshot in a background thread; files
+are only removed once a newer snapshot covers them.
+
+A journal starts with a header (magic bytes, format version and
+strictness) followed by records, each one with payload length,
+CRC-32 of payload and payload: operation, IP parameter length,
+IP parameter and description as UTF-8.  Integers are big-endian.
+Replay stops at the first incomplete or corrupted record, which can
+only be left by an interrupted append.
+"""
+
+import os
+import re
+import struct
+import threading
+import typing
+import zlib
+
+from . import helpers
+from .pppipam import AddressSpace, IPObject, IPParameter
+
+
+MAGIC = b"PPPIPAMJ"
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct(">8sHB5x")
+RECORD = struct.Struct(">II")
+PAYLOAD = struct.Struct(">BH")
+
+DESCRIBE = 1
+DESCRIBE_DELEGATED = 2
+DELETE = 3
+DELETE_CASCADE = 4
+
+SYNC_POLICIES = ("always", "batch", "never")
+
+_FILE_NAME = re.compile(r"^(snapshot|journal)\.([0-9]+)$")
+
+# operation, IP parameter, description
+Entry = typing.Tuple[int, str, str]
+
+
+def encode_entry(operation: int, ip_parameter: str, description: str) -> bytes:
+    """Encodes a journal record.
+
+    Args:
+        operation: one of DESCRIBE, DESCRIBE_DELEGATED, DELETE or
+                   DELETE_CASCADE.
+        ip_parameter: IP object as str.
+        description: description, empty for deletions.
+
+    Returns:
+        record bytes.
+    """
+    ip_data = ip_parameter.encode("utf-8")
+    payload = (
+        PAYLOAD.pack(operation, len(ip_data))
+        + ip_data
+        + description.encode("utf-8")
+    )
+    return RECORD.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_journal(
+    data: bytes
+) -> typing.Tuple[bool, typing.List[Entry], int]:
+    """Decodes journal content.
+
+    Args:
+        data: whole journal content.
+
+    Returns:
+        tuple of strictness, entries and length of content up to
+        the end of the last complete record.
+
+    Raises:
+        ValueError: not a supported journal.
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("not a supported pppipam journal")
+    magic, version, flags = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError("not a supported pppipam journal")
+
+    entries = list()
+    position = HEADER.size
+    while position + RECORD.size <= len(data):
+        length, checksum = RECORD.unpack_from(data, position)
+        start = position + RECORD.size
+        payload = data[start:start + length]
+        if (
+            len(payload) != length
+            or length < PAYLOAD.size
+            or zlib.crc32(payload) != checksum
+        ):
+            break
+        operation, ip_length = PAYLOAD.unpack_from(payload)
+        ip_end = PAYLOAD.size + ip_length
+        entries.append((
+            operation,
+            str(payload[PAYLOAD.size:ip_end], "utf-8"),
+            str(payload[ip_end:], "utf-8"),
+        ))
+        position = start + length
+
+    return bool(flags & 1), entries, position
+
+
+def apply_entry(address_space: AddressSpace, entry: Entry) -> None:
+    """Replays a journal entry on an address space.
+
+    Args:
+        address_space: address space the entry was journaled from.
+        entry: tuple of operation, IP parameter and description.
+
+    Raises:
+        ValueError: unknown operation.
+    """
+    operation, ip_parameter, description = entry
+    if operation in (DESCRIBE, DESCRIBE_DELEGATED):
+        address_space.describe(
+            ip_parameter=ip_parameter,
+            description=description,
+            is_new_delegated_net=operation == DESCRIBE_DELEGATED,
+        )
+    elif operation in (DELETE, DELETE_CASCADE):
+        address_space.delete(
+            ip_parameter=ip_parameter, cascade=operation == DELETE_CASCADE
+        )
+    else:
+        raise ValueError("unknown journal operation")
+
+
+def _fsync_directory(directory: str) -> None:
+    """Persists directory entries, where supported."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    descriptor = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+class JournaledAddressSpace:
+    """Address space persisted by snapshot and append-only journal.
+
+    Mutations (describe, describe_new_delegated_network and delete)
+    are applied to an in-memory AddressSpace and, if successful,
+    appended to the journal.  Queries go straight to the in-memory
+    address space.
+
+    doctest example:
+        >>> import tempfile
+        >>> with tempfile.TemporaryDirectory() as directory:
+        ...     with JournaledAddressSpace(directory) as jas:
+        ...         jas.describe_new_delegated_network(
+        ...             network_parameter="192.0.2.0/24",
+        ...             description="TEST-NET-1")
+        ...         jas.describe(ip_parameter="192.0.2.1",
+        ...                      description="gateway")
+        ...     with JournaledAddressSpace(directory) as jas:
+        ...         jas.description("192.0.2.1")
+        True
+        True
+        'gateway'
+        >>>
+    """
+
+    def __init__(
+        self,
+        directory: typing.Union[str, os.PathLike],
+        *,
+        strict_: bool = True,
+        sync: str = "always",
+        batch_size: int = 64,
+        compaction_threshold: int = 16 * 1024 * 1024,
+    ) -> None:
+        """Opens, or creates, a journaled address space.
+
+        Args:
+            directory: directory with snapshot and journal files,
+                       created if missing.
+            strict_: strictness of a new address space; existing
+                     address spaces keep their own.
+            sync: "always" to fsync every record; "batch" to fsync
+                  every batch_size records; or "never" to leave it
+                  to the operating system.
+            batch_size: number of records per fsync with "batch".
+            compaction_threshold: journal size in bytes that starts
+                                  a background compaction.
+
+        Raises:
+            TypeError: parameters not of expected type.
+            ValueError: invalid parameter value, or directory files
+                        are not supported snapshots or journals.
+        """
+        if sync not in SYNC_POLICIES:
+            raise ValueError("sync must be one of " + ", ".join(SYNC_POLICIES))
+        for name, value in (
+            ("batch_size", batch_size),
+            ("compaction_threshold", compaction_threshold),
+        ):
+            if isinstance(value, bool) or not isinstance(value, int):
+                raise TypeError(name + " must be int")
+            if value < 1:
+                raise ValueError(name + " must be positive")
+
+        self.__directory = os.fspath(directory)
+        self.__sync = sync
+        self.__batch_size = batch_size
+        self.__compaction_threshold = compaction_threshold
+        self.__lock = threading.Lock()
+        self.__compactor = None
+        self.__compaction_error = None
+        self.__unsynced = 0
+
+        os.makedirs(self.__directory, exist_ok=True)
+        snapshots, journals = self.__generations()
+        base = max(snapshots, default=0)
+        last = max([base, *journals])
+        address_space = self.__rebuild(base, last)
+        if address_space is None:
+            address_space = AddressSpace(strict_=strict_)
+        self.__address_space = address_space
+
+        for generation in snapshots:
+            if generation < base:
+                os.remove(self.__path("snapshot", generation))
+        for generation in journals:
+            if generation < base:
+                os.remove(self.__path("journal", generation))
+
+        self.__generation = last
+        self.__open_journal()
+
+    def __path(self, kind: str, generation: int) -> str:
+        """Returns path of a snapshot or journal generation."""
+        return os.path.join(self.__directory, "%s.%d" % (kind, generation))
+
+    def __generations(self) -> typing.Tuple[typing.List[int], typing.List[int]]:
+        """Lists existing snapshot and journal generations."""
+        found = {"snapshot": [], "journal": []}
+        for name in os.listdir(self.__directory):
+            match = _FILE_NAME.match(name)
+            if match:
+                found[match.group(1)].append(int(match.group(2)))
+        return sorted(found["snapshot"]), sorted(found["journal"])
+
+    def __rebuild(
+        self, base: int, last: int
+    ) -> typing.Optional[AddressSpace]:
+        """Loads a snapshot and replays following journals.
+
+        Incomplete records at the end of a journal are truncated.
+
+        Args:
+            base: generation of snapshot, if any.
+            last: last journal generation to be replayed.
+
+        Returns:
+            AddressSpace instance or None if there are no such files.
+        """
+        address_space = None
+        if os.path.exists(self.__path("snapshot", base)):
+            address_space = AddressSpace.load_snapshot(
+                self.__path("snapshot", base)
+            )
+
+        for generation in range(base, last + 1):
+            path = self.__path("journal", generation)
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as fp:
+                data = fp.read()
+            strict, entries, end = decode_journal(data)
+            if address_space is None:
+                address_space = AddressSpace(strict_=strict)
+            for entry in entries:
+                apply_entry(address_space, entry)
+            if end < len(data):
+                with open(path, "r+b") as fp:
+                    fp.truncate(end)
+
+        return address_space
+
+    def __open_journal(self) -> None:
+        """Opens current journal generation for appending."""
+        path = self.__path("journal", self.__generation)
+        self.__journal = open(path, "ab")
+        if self.__journal.tell() == 0:
+            self.__journal.write(HEADER.pack(
+                MAGIC, FORMAT_VERSION, self.__address_space.strict
+            ))
+            self.__journal.flush()
+            os.fsync(self.__journal.fileno())
+            _fsync_directory(self.__directory)
+
+    def __append(
+        self, operation: int, ip_object: IPObject, description: str = ""
+    ) -> None:
+        """Appends a record to journal, following sync policy."""
+        self.__journal.write(
+            encode_entry(operation, str(ip_object), description)
+        )
+        self.__journal.flush()
+        if self.__sync == "always":
+            os.fsync(self.__journal.fileno())
+        elif self.__sync == "batch":
+            self.__unsynced += 1
+            if self.__unsynced >= self.__batch_size:
+                self.sync()
+
+        if self.__journal.tell() >= self.__compaction_threshold:
+            # Mutation is already applied: errors of previous
+            # compactions are left for compact or close to raise.
+            with self.__lock:
+                self.__start_compaction()
+
+    def sync(self) -> None:
+        """Flushes and fsyncs pending journal records."""
+        self.__journal.flush()
+        os.fsync(self.__journal.fileno())
+        self.__unsynced = 0
+
+    @property
+    def strict(self) -> bool:
+        """Returns strict value of address space."""
+        return self.__address_space.strict
+
+    def describe(
+        self,
+        *,
+        ip_parameter: IPParameter,
+        description: str,
+        is_new_delegated_net: bool = False,
+    ) -> bool:
+        """Journaled AddressSpace.describe."""
+        result = self.__address_space.describe(
+            ip_parameter=ip_parameter,
+            description=description,
+            is_new_delegated_net=is_new_delegated_net,
+        )
+        self.__append(
+            DESCRIBE_DELEGATED if is_new_delegated_net else DESCRIBE,
+            helpers.clean_ip_parameter(ip_parameter),
+            description,
+        )
+        return result
+
+    def describe_new_delegated_network(
+        self, *, network_parameter: helpers.IPNetworkParameter, description: str
+    ) -> bool:
+        """Journaled AddressSpace.describe_new_delegated_network."""
+        result = self.__address_space.describe_new_delegated_network(
+            network_parameter=network_parameter, description=description
+        )
+        self.__append(
+            DESCRIBE_DELEGATED,
+            helpers.clean_ip_parameter(network_parameter),
+            description,
+        )
+        return result
+
+    def delete(self, *, ip_parameter: IPParameter, cascade: bool) -> bool:
+        """Journaled AddressSpace.delete."""
+        result = self.__address_space.delete(
+            ip_parameter=ip_parameter, cascade=cascade
+        )
+        self.__append(
+            DELETE_CASCADE if cascade else DELETE,
+            helpers.clean_ip_parameter(ip_parameter),
+        )
+        return result
+
+    def description(self, ip_parameter: IPParameter) -> typing.Optional[str]:
+        """Same as AddressSpace.description."""
+        return self.__address_space.description(ip_parameter)
+
+    def description_many(
+        self, ip_parameters: typing.Iterable[IPParameter]
+    ) -> typing.List[typing.Optional[str]]:
+        """Same as AddressSpace.description_many."""
+        return self.__address_space.description_many(ip_parameters)
+
+    def iter_export(
+        self
+    ) -> typing.Iterator[typing.Tuple[int, IPObject, str]]:
+        """Same as AddressSpace.iter_export."""
+        return self.__address_space.iter_export()
+
+    def export_data(self) -> typing.Dict[str, dict]:
+        """Same as AddressSpace.export_data."""
+        return self.__address_space.export_data()
+
+    def compact(self, *, wait: bool = False) -> None:
+        """Folds journals into a new snapshot.
+
+        A new journal generation is started right away; previous
+        generations are replayed over the last snapshot and saved as
+        a new one by a background thread, without touching the
+        in-memory address space.  Does nothing else if a compaction
+        is already running.
+
+        Args:
+            wait: if evaluates to True, waits for compaction to end.
+
+        Raises:
+            Exception: error raised by a previous compaction.
+        """
+        with self.__lock:
+            self.__raise_compaction_error()
+            compactor = self.__start_compaction()
+
+        if wait:
+            compactor.join()
+            with self.__lock:
+                self.__raise_compaction_error()
+
+    def __start_compaction(self) -> threading.Thread:
+        """Starts a compaction thread, unless one is running.
+
+        Must be called holding lock.
+
+        Returns:
+            running compaction thread.
+        """
+        if self.__compactor is None or not self.__compactor.is_alive():
+            self.sync()
+            self.__journal.close()
+            last = self.__generation
+            self.__generation += 1
+            self.__open_journal()
+            self.__compactor = threading.Thread(
+                target=self.__compact,
+                args=(last,),
+                name="pppipam-compaction",
+            )
+            self.__compactor.start()
+        return self.__compactor
+
+    def __raise_compaction_error(self) -> None:
+        """Raises, once, error of a previous compaction."""
+        error, self.__compaction_error = self.__compaction_error, None
+        if error is not None:
+            raise error
+
+    def __compact(self, last: int) -> None:
+        """Writes snapshot of every generation up to last."""
+        try:
+            snapshots, journals = self.__generations()
+            base = max(
+                (generation for generation in snapshots if generation <= last),
+                default=0,
+            )
+            address_space = self.__rebuild(base, last)
+            if address_space is None:
+                address_space = AddressSpace(strict_=self.strict)
+            address_space.save_snapshot(self.__path("snapshot", last + 1))
+            _fsync_directory(self.__directory)
+
+            for generation in snapshots:
+                if generation <= last:
+                    os.remove(self.__path("snapshot", generation))
+            for generation in journals:
+                if generation <= last:
+                    os.remove(self.__path("journal", generation))
+        except Exception as error:
+            with self.__lock:
+                self.__compaction_error = error
+
+    def close(self) -> None:
+        """Waits for compaction and syncs and closes journal.
+
+        Raises:
+            Exception: error raised by a previous compaction.
+        """
+        compactor = self.__compactor
+        if compactor is not None:
+            compactor.join()
+        if not self.__journal.closed:
+            self.sync()
+            self.__journal.close()
+        with self.__lock:
+            self.__raise_compaction_error()
+
+    def __enter__(self) -> "JournaledAddressSpace":
+        return self
+
+    def __exit__(self, *exc_info: typing.Any) -> None:
+        self.close()
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Module with read-only address space over a binary snapshot."""
+
+import mmap
+import os
+import typing
+
+from . import helpers, snapshot
+from .pppipam import (
+    IPObject,
+    IPParameter,
+    _ADDRESS_CLASS,
+    _ADDRESS_RANK,
+    _MAX_PREFIXLEN,
+    _NETWORK_CLASS,
+    _unpack,
+)
+
+
+class MappedAddressSpace:
+    """Read-only address space answering queries from a snapshot.
+
+    Snapshot records are sorted by version, first address and rank, so
+    lookups are binary searches straight over the mapped file's keys,
+    compared as bytes.  Records and descriptions are only decoded when
+    a query touches them, and mapped pages are shared by every process
+    mapping the same file.
+
+    Keys of buffers given to from_buffer as memoryview, such as shared
+    memory, and of version 1 snapshots, which have no keys, are copied
+    into process memory once (18 bytes per record), as memoryview
+    slices cannot be compared.
+    """
+
+    def __init__(self, path: typing.Union[str, os.PathLike]) -> None:
+        """Maps a snapshot file written by AddressSpace.save_snapshot.
+
+        Args:
+            path: snapshot file path.
+
+        Raises:
+            ValueError: not a supported snapshot.
+        """
+        with open(path, "rb") as fp:
+            self.__mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.__attach(self.__mmap)
+        except ValueError:
+            self.close()
+            raise
+
+    @classmethod
+    def from_buffer(
+        cls, buffer: typing.Union[bytes, memoryview]
+    ) -> "MappedAddressSpace":
+        """Uses a snapshot already in memory, such as shared memory.
+
+        Args:
+            buffer: whole snapshot content; must outlive instance.
+
+        Returns:
+            new MappedAddressSpace instance.
+
+        Raises:
+            ValueError: not a supported snapshot.
+        """
+        address_space = cls.__new__(cls)
+        address_space.__mmap = None
+        address_space.__attach(buffer)
+        return address_space
+
+    def __attach(self, buffer: typing.Union[bytes, memoryview]) -> None:
+        """Reads snapshot layout and keys of buffer."""
+        layout = snapshot.read_layout(buffer)
+        self.__buffer = buffer
+        self.__layout = layout
+
+        if layout.keys_start is None:
+            self.__keys = b"".join(
+                snapshot.pack_key(version, address, rank)
+                for version, rank, address, _, _ in (
+                    snapshot.read_record(buffer, layout, index)
+                    for index in range(layout.record_count)
+                )
+            )
+            self.__keys_start = 0
+        elif isinstance(buffer, (bytes, mmap.mmap)):
+            self.__keys = buffer
+            self.__keys_start = layout.keys_start
+        else:
+            self.__keys = bytes(memoryview(buffer)[
+                layout.keys_start:
+                layout.keys_start + layout.record_count * snapshot.KEY.size
+            ])
+            self.__keys_start = 0
+
+    def close(self) -> None:
+        """Unmaps snapshot file, if mapped."""
+        self.__buffer = None
+        self.__keys = None
+        if self.__mmap is not None:
+            self.__mmap.close()
+            self.__mmap = None
+
+    def __enter__(self) -> "MappedAddressSpace":
+        return self
+
+    def __exit__(self, *exc_info: typing.Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """Returns number of described IP objects."""
+        return self.__layout.record_count
+
+    @property
+    def strict(self) -> bool:
+        """Returns strict value of snapshot's address space."""
+        return self.__layout.strict
+
+    def __find(
+        self, version: int, address: int, rank: int
+    ) -> typing.Tuple[int, bool]:
+        """Finds the last record not after an IP object.
+
+        Args:
+            version: IP version of IP object.
+            address: first address of IP object as int.
+            rank: prefix length of network or _ADDRESS_RANK.
+
+        Returns:
+            tuple of record index (-1 if none) and whether that record
+            is the IP object itself.
+        """
+        keys = self.__keys
+        start = self.__keys_start
+        size = snapshot.KEY.size
+        target = snapshot.pack_key(version, address, rank)
+
+        low = 0
+        high = self.__layout.record_count
+        while low < high:
+            middle = (low + high) // 2
+            position = start + middle * size
+            if keys[position:position + size] <= target:
+                low = middle + 1
+            else:
+                high = middle
+
+        index = low - 1
+        if index < 0:
+            return index, False
+        position = start + index * size
+        return index, keys[position:position + size] == target
+
+    def __supernet_record(
+        self, index: int, version: int, address: int, prefixlen: int
+    ) -> typing.Optional[typing.Tuple[int, int, int, int, int]]:
+        """Finds the smallest network record strictly covering IP object.
+
+        The smallest covering network, if any, is the record at index
+        or one of its ancestors, as records are in tree order.
+
+        Args:
+            index: index of last record before IP object.
+            version: IP version of IP object.
+            address: first address of IP object as int.
+            prefixlen: prefix length of IP object, or maximum prefix
+                       length plus one for addresses.
+
+        Returns:
+            record tuple, as snapshot.read_record, or None.
+        """
+        buffer = self.__buffer
+        layout = self.__layout
+        max_prefixlen = _MAX_PREFIXLEN[version]
+
+        while index >= 0:
+            record = snapshot.read_record(buffer, layout, index)
+            record_version, rank, record_address, _, parent = record
+            if record_version != version:
+                return None
+            if (
+                rank != _ADDRESS_RANK
+                and rank < prefixlen
+                and (address ^ record_address) >> (max_prefixlen - rank) == 0
+            ):
+                return record
+            index = parent
+
+        return None
+
+    def __clean(self, ip_parameter: IPParameter) -> IPObject:
+        """Processes parameter as AddressSpace.description does."""
+        if isinstance(ip_parameter, int):
+            raise TypeError("ip_parameter must not be int")
+        ip_object = helpers.clean_ip_parameter(ip_parameter)
+        if ip_object is None:
+            raise TypeError("ip_parameter must be a valid IP parameter")
+        return ip_object
+
+    def description(self, ip_parameter: IPParameter) -> typing.Optional[str]:
+        """Retrieve a description of an IP address or IP network.
+
+        Args:
+            ip_parameter: value to be processed as an IP address or
+                          an IP network.
+
+        Returns:
+            Same value as AddressSpace.description for snapshot's
+            address space.
+
+        Raises:
+            TypeError: parameters not of expected type.
+        """
+        version, address, prefixlen, rank = _unpack(
+            self.__clean(ip_parameter)
+        )
+        index, found = self.__find(version, address, rank)
+        if found:
+            _, _, _, string, _ = snapshot.read_record(
+                self.__buffer, self.__layout, index
+            )
+            return snapshot.read_string(self.__buffer, self.__layout, string)
+
+        if rank == _ADDRESS_RANK:
+            prefixlen += 1
+        if self.__supernet_record(index, version, address, prefixlen):
+            return str("")
+
+        return None
+
+    def description_many(
+        self, ip_parameters: typing.Iterable[IPParameter]
+    ) -> typing.List[typing.Optional[str]]:
+        """Retrieve descriptions of many IP addresses or IP networks.
+
+        Args:
+            ip_parameters: iterable of values to be processed as
+                           IP addresses or IP networks.
+
+        Returns:
+            list with description's result for each parameter.
+
+        Raises:
+            TypeError: parameters not of expected type.
+        """
+        return [
+            self.description(ip_parameter) for ip_parameter in ip_parameters
+        ]
+
+    def supernet(
+        self, ip_parameter: IPParameter
+    ) -> typing.Optional[helpers.IPNetwork]:
+        """Retrieve the smallest described supernet of an IP object.
+
+        Args:
+            ip_parameter: value to be processed as an IP address or
+                          an IP network.
+
+        Returns:
+            IP network object or None if no described network
+            covers IP object.
+
+        Raises:
+            TypeError: parameters not of expected type.
+        """
+        version, address, prefixlen, rank = _unpack(
+            self.__clean(ip_parameter)
+        )
+        index, found = self.__find(version, address, rank)
+        if found:
+            # Record itself is not its own supernet.
+            index -= 1
+        if rank == _ADDRESS_RANK:
+            prefixlen += 1
+
+        record = self.__supernet_record(index, version, address, prefixlen)
+        if record is None:
+            return None
+        return _NETWORK_CLASS[version]((record[2], record[1]))
+
+    def iter_export(
+        self
+    ) -> typing.Iterator[typing.Tuple[int, IPObject, str]]:
+        """Iterates described IP objects in tree order.
+
+        Yields:
+            same tuples as AddressSpace.iter_export.
+        """
+        stack = list()
+        for index in range(self.__layout.record_count):
+            version, rank, address, string, parent = snapshot.read_record(
+                self.__buffer, self.__layout, index
+            )
+            while stack and stack[-1] != parent:
+                stack.pop()
+            if rank == _ADDRESS_RANK:
+                ip_object = _ADDRESS_CLASS[version](address)
+            else:
+                ip_object = _NETWORK_CLASS[version]((address, rank))
+            yield (
+                len(stack),
+                ip_object,
+                snapshot.read_string(self.__buffer, self.__layout, string),
+            )
+            if rank != _ADDRESS_RANK:
+                stack.append(index)
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Module with process pool lookups and loading of address spaces.
+
+For lookups, an address space is written once as a binary snapshot (see
+pppipam.snapshot module) into a multiprocessing.shared_memory block.
+Every worker process of a pool maps that block as a MappedAddressSpace
+when it starts, so tasks only carry chunks of IP parameters and their
+descriptions, never the address space itself.
+
+For loading, a dump (see AddressSpace.dump) is parsed and sorted in
+chunks of lines by a pool.  The parent process merges sorted chunks
+and builds the address space from them in a single sweep, as building
+partitions in workers costs more to send back than to build.
+"""
+
+import io
+import itertools
+import multiprocessing
+import operator
+import os
+import typing
+
+from .mapped import MappedAddressSpace
+from .pppipam import (
+    AddressSpace,
+    IPParameter,
+    ParsedRow,
+    RowError,
+    _dump_rows,
+    _dump_strictness,
+    _parse_rows,
+    _raise_dump_errors,
+)
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python 3.7
+    shared_memory = None
+
+
+# Shared memory block and mapped address space of a worker process.
+_worker_memory = None
+_worker_space = None
+
+
+def _attach(name: str, size: int) -> None:
+    """Maps shared snapshot in a worker process.
+
+    Args:
+        name: shared memory block name.
+        size: snapshot size, as blocks may be rounded up to pages.
+    """
+    global _worker_memory, _worker_space
+    _worker_memory = shared_memory.SharedMemory(name=name)
+    _worker_space = MappedAddressSpace.from_buffer(_worker_memory.buf[:size])
+
+
+def _description_chunk(
+    ip_parameters: typing.List[IPParameter]
+) -> typing.List[typing.Optional[str]]:
+    """Resolves a chunk of IP parameters in a worker process."""
+    return _worker_space.description_many(ip_parameters)
+
+
+class ParallelResolver:
+    """Process pool answering description_many over shared memory.
+
+    Changes to the address space after the resolver is created are not
+    seen by it; create a new resolver to publish them.
+
+    Workers answer from a MappedAddressSpace, whose lookups take about
+    twice as long as AddressSpace.description_many, so a resolver only
+    pays off with at least three worker processes on as many CPUs.
+
+    doctest example:
+        >>> as_ = AddressSpace(strict_=False)
+        >>> as_.describe(ip_parameter="192.0.2.0/24",
+        ...              description="TEST-NET-1")
+        True
+        >>> with ParallelResolver(as_, processes=2, chunksize=2) as resolver:
+        ...     resolver.description_many(
+        ...         ["192.0.2.0/24", "192.0.2.1", "198.51.100.1"])
+        ['TEST-NET-1', '', None]
+        >>>
+    """
+
+    def __init__(
+        self,
+        address_space: AddressSpace,
+        *,
+        processes: typing.Optional[int] = None,
+        chunksize: int = 4096,
+    ) -> None:
+        """Publishes address space and starts worker processes.
+
+        Args:
+            address_space: address space to be resolved against, or
+                           any object with a write_snapshot method.
+            processes: number of worker processes; None for
+                       os.cpu_count().
+            chunksize: number of IP parameters per task.
+
+        Raises:
+            TypeError: chunksize not int.
+            ValueError: chunksize not positive.
+            RuntimeError: shared memory is not available.
+        """
+        if isinstance(chunksize, bool) or not isinstance(chunksize, int):
+            raise TypeError("chunksize must be int")
+        if chunksize < 1:
+            raise ValueError("chunksize must be positive")
+        if shared_memory is None:
+            raise RuntimeError("shared memory requires Python 3.8 or later")
+
+        buffer = io.BytesIO()
+        address_space.write_snapshot(buffer)
+        data = buffer.getbuffer()
+
+        self.__chunksize = chunksize
+        self.__memory = shared_memory.SharedMemory(
+            create=True, size=max(len(data), 1)
+        )
+        try:
+            self.__memory.buf[:len(data)] = data
+            self.__pool = multiprocessing.Pool(
+                processes, initializer=_attach,
+                initargs=(self.__memory.name, len(data)),
+            )
+        except BaseException:
+            self.__memory.close()
+            self.__memory.unlink()
+            raise
+        finally:
+            data.release()
+
+    def description_many(
+        self, ip_parameters: typing.Iterable[IPParameter]
+    ) -> typing.List[typing.Optional[str]]:
+        """Resolves IP parameters across worker processes.
+
+        Args:
+            ip_parameters: iterable of values to be processed as
+                           IP addresses or IP networks; they must
+                           be picklable, such as str.
+
+        Returns:
+            list with, for each parameter in the same order, the same
+            value AddressSpace.description would return.
+
+        Raises:
+            TypeError: parameters not of expected type.
+        """
+        iterator = iter(ip_parameters)
+        chunks = iter(
+            lambda: list(itertools.islice(iterator, self.__chunksize)), []
+        )
+        results = list()
+        for chunk_results in self.__pool.imap(_description_chunk, chunks):
+            results.extend(chunk_results)
+        return results
+
+    def close(self) -> None:
+        """Stops worker processes and releases shared memory."""
+        if self.__memory is None:
+            return
+        self.__pool.terminate()
+        self.__pool.join()
+        self.__memory.close()
+        self.__memory.unlink()
+        self.__memory = None
+
+    def __enter__(self) -> "ParallelResolver":
+        return self
+
+    def __exit__(self, *exc_info: typing.Any) -> None:
+        self.close()
+
+
+# Bits of row positions numbering rows inside a dump chunk.
+_CHUNK_BITS = 48
+
+
+def _chunk_lines(path: str, start: int, end: int) -> typing.List[str]:
+    """Reads non-blank lines between two file offsets."""
+    with open(path, "rb") as fp:
+        fp.seek(start)
+        data = fp.read(end - start)
+    return [line for line in data.decode("utf-8").split("\n") if line.strip()]
+
+
+def _parse_chunk(
+    task: typing.Tuple[str, int, int, int]
+) -> typing.Tuple[typing.List[ParsedRow], typing.List[RowError], int]:
+    """Parses and sorts rows of a dump chunk in a worker process.
+
+    Rows of chunk number n are numbered from n << _CHUNK_BITS, so
+    positions follow file order before rows of previous chunks are
+    counted.
+
+    Args:
+        task: tuple of path, start and end offsets and chunk number.
+
+    Returns:
+        tuple of parsed rows, sorted as in describe_many, invalid rows
+        and number of rows.
+    """
+    path, start, end, number = task
+    lines = _chunk_lines(path, start, end)
+    parsed, errors = _parse_rows(_dump_rows(lines), number << _CHUNK_BITS)
+    parsed.sort(key=operator.itemgetter(0, 1, 2))
+    return parsed, errors, len(lines)
+
+
+def load_parallel(
+    path: typing.Union[str, os.PathLike],
+    *,
+    processes: typing.Optional[int] = None,
+    chunk_bytes: int = 4 * 1024 * 1024,
+) -> AddressSpace:
+    """Reads an address space written by dump with a process pool.
+
+    Same result and validation as AddressSpace.load.  Lines are parsed
+    and sorted in parallel, in chunks of about chunk_bytes; the address
+    space is then built by this process, as load does.
+
+    Args:
+        path: dump file path.
+        processes: number of worker processes; None for
+                   os.cpu_count().
+        chunk_bytes: approximate size of each parsed chunk.
+
+    Returns:
+        new AddressSpace instance.
+
+    Raises:
+        TypeError: chunk_bytes not int.
+        ValueError: chunk_bytes not positive, not a dump file or
+                    invalid IP object lines.
+
+    doctest example:
+        >>> import os, tempfile
+        >>> as_ = AddressSpace(strict_=True)
+        >>> as_.describe_many([("192.0.2.0/24", "TEST-NET-1"),
+        ...                    ("2001:db8::/32", "IPv6 doc")],
+        ...                   delegated=True)
+        []
+        >>> as_.describe(ip_parameter="192.0.2.1", description="gateway")
+        True
+        >>> with tempfile.TemporaryDirectory() as directory:
+        ...     path = os.path.join(directory, "space.jsonl")
+        ...     with open(path, "w", encoding="utf-8") as fp:
+        ...         as_.dump(fp)
+        ...     load_parallel(path, processes=2, chunk_bytes=16) == as_
+        True
+        >>>
+    """
+    if isinstance(chunk_bytes, bool) or not isinstance(chunk_bytes, int):
+        raise TypeError("chunk_bytes must be int")
+    if chunk_bytes < 1:
+        raise ValueError("chunk_bytes must be positive")
+
+    path = os.fspath(path)
+    offsets = list()
+    with open(path, "rb") as fp:
+        strict = _dump_strictness(fp.readline().decode("utf-8"))
+        offsets.append(fp.tell())
+        size = os.fstat(fp.fileno()).st_size
+        while offsets[-1] < size:
+            # Chunks end right after a line break.
+            fp.seek(min(offsets[-1] + chunk_bytes, size))
+            fp.readline()
+            offsets.append(fp.tell())
+    chunks = [
+        (path, start, end, number)
+        for number, (start, end) in enumerate(zip(offsets, offsets[1:]))
+    ]
+
+    rows = list()
+    errors = list()
+    counts = list()
+    with multiprocessing.Pool(processes) as pool:
+        for parsed, chunk_errors, count in pool.imap(_parse_chunk, chunks):
+            rows.extend(parsed)
+            errors.extend(chunk_errors)
+            counts.append(count)
+
+    # Sorting merges sorted runs of chunks, and keeps equal keys in
+    # row order as chunks are in row order.
+    rows.sort(key=operator.itemgetter(0, 1, 2))
+    address_space = AddressSpace(strict_=strict)
+    errors.extend(address_space._describe_sorted(rows, delegated=None))
+
+    if errors:
+        firsts = list(itertools.accumulate([0] + counts[:-1]))
+        mask = (1 << _CHUNK_BITS) - 1
+        errors = [
+            (firsts[position >> _CHUNK_BITS] + (position & mask), error)
+            for position, error in errors
+        ]
+        errors.sort(key=operator.itemgetter(0))
+        _raise_dump_errors(errors)
+
+    return address_space
@@ -3,11 +3,18 @@
 
 """PPPIPAM main module."""
 
+import bisect
 import ipaddress
+import itertools
+import json
+import operator
+import os
 import typing
 from dataclasses import dataclass, InitVar
 
-from . import helpers
+from . import helpers, snapshot
+from .index import ChildIndex, FreeMap, PersistentRadixTree, RadixTree
+from .stats import Hook, Stats
 
 
 IPParameter = typing.Union[helpers.IPAddressParameter, helpers.IPNetworkParameter]
@@ -15,6 +22,24 @@ IPObject = typing.Union[helpers.IPAddress, helpers.IPNetwork]
 IPAddressTuple = tuple([ipaddress.IPv4Address, ipaddress.IPv6Address])
 IPNetworkTuple = tuple([ipaddress.IPv4Network, ipaddress.IPv6Network])
 
+_ADDRESS_CLASS = {4: ipaddress.IPv4Address, 6: ipaddress.IPv6Address}
+_NETWORK_CLASS = {4: ipaddress.IPv4Network, 6: ipaddress.IPv6Network}
+_MAX_PREFIXLEN = {4: 32, 6: 128}
+
+# Addresses rank after every network starting at the same address.
+_ADDRESS_RANK = 255
+
+# Methods recorded as operations by enable_stats.
+_INSTRUMENTED = (
+    "describe", "describe_many", "describe_new_delegated_network",
+    "allocate", "allocate_address", "utilization", "description",
+    "description_many", "delete", "export_data", "snapshot",
+)
+
+# Header of dump format, followed by the address space strictness.
+_DUMP_FORMAT = "pppipam"
+_DUMP_VERSION = 1
+
 
 class StrictSupernetError(Exception):
     """Error related to supernet missing or present."""
@@ -31,18 +56,369 @@ class IPObjectNotInSpaceError(Exception):
     pass
 
 
+class NoFreeSpaceError(Exception):
+    """Error due to no free block of requested size in a network."""
+    pass
+
+
+def _node_key(version: int, address: int, rank: int) -> int:
+    """Packs an IP object identity into a primary index key.
+
+    Args:
+        version: IP version.
+        address: first address as int.
+        rank: network prefix length or _ADDRESS_RANK for addresses.
+
+    Returns:
+        int unique for every possible IP object.
+    """
+    return (address << 9) | (rank << 1) | (version == 6)
+
+
+def _view_key(
+    version: int, address: int, rank: int
+) -> typing.Tuple[int, int]:
+    """Packs an IP object identity into a view index entry.
+
+    View index keys have one more bit than addresses: networks end
+    with 0 and addresses with 1, at the largest prefix length.  So a
+    single address network covers its address, and entries order as
+    in iter_export.
+
+    Args:
+        version: IP version.
+        address: first address as int.
+        rank: network prefix length or _ADDRESS_RANK for addresses.
+
+    Returns:
+        tuple of key and prefix length of entry.
+    """
+    if rank == _ADDRESS_RANK:
+        return (address << 1) | 1, _MAX_PREFIXLEN[version] + 1
+    return address << 1, rank
+
+
+def _unpack(ip_object: IPObject) -> typing.Tuple[int, int, int, int]:
+    """Retrieves version, first address as int, prefix length and rank.
+
+    Args:
+        ip_object: IP address or IP network object.
+
+    Returns:
+        tuple of IP version, first address as int, prefix length
+        (maximum prefix length for addresses) and rank.
+    """
+    if isinstance(ip_object, IPNetworkTuple):
+        prefixlen = ip_object.prefixlen
+        return (
+            ip_object.version,
+            int(ip_object.network_address),
+            prefixlen,
+            prefixlen,
+        )
+    return (
+        ip_object.version,
+        int(ip_object),
+        ip_object.max_prefixlen,
+        _ADDRESS_RANK,
+    )
+
+
+def _clean_described_object(
+    ip_parameter: IPParameter, description: str
+) -> IPObject:
+    """Validates a pair of IP parameter and description.
+
+    Args:
+        ip_parameter: value to be processed as an IP address or
+                      an IP network.
+        description: non-empty str to describe IP object.
+
+    Returns:
+        IP address object or, if not an address, IP network object.
+
+    Raises:
+        TypeError: parameters not of expected type.
+        ValueError: invalid description value.
+    """
+    if description == "":
+        raise ValueError("No empty description allowed")
+    if not isinstance(description, str):
+        raise TypeError("description must be str")
+    if isinstance(ip_parameter, int):
+        raise TypeError("ip_parameter must not be int")
+
+    ip_object = helpers.clean_ip_parameter(ip_parameter)
+    if ip_object is None:
+        raise TypeError("ip_parameter must be a valid IP parameter")
+
+    return ip_object
+
+
+# version, first address, rank, prefix length, description, row position
+ParsedRow = typing.Tuple[int, int, int, int, str, int]
+# row position, exception
+RowError = typing.Tuple[int, Exception]
+
+
+def _parse_rows(
+    rows: typing.Iterable[typing.Tuple[IPParameter, str]], start: int = 0
+) -> typing.Tuple[typing.List[ParsedRow], typing.List[RowError]]:
+    """Validates describe_many rows.
+
+    Args:
+        rows: iterable of (ip_parameter, description) pairs.
+        start: position of first row.
+
+    Returns:
+        tuple of parsed rows, in rows' order, and list of
+        (row position, exception) pairs of invalid rows.
+    """
+    parsed = list()
+    errors = list()
+
+    for position, row in enumerate(rows, start):
+        try:
+            ip_parameter, description = row
+            ip_object = _clean_described_object(ip_parameter, description)
+        except (TypeError, ValueError) as error:
+            errors.append((position, error))
+            continue
+        version, address, prefixlen, rank = _unpack(ip_object)
+        parsed.append(
+            (version, address, rank, prefixlen, description, position)
+        )
+
+    return parsed, errors
+
+
+def _dump_strictness(header_line: str) -> bool:
+    """Checks header line of a dump.
+
+    Args:
+        header_line: first line of a dump.
+
+    Returns:
+        strictness of dumped address space.
+
+    Raises:
+        ValueError: not a supported dump.
+    """
+    header = json.loads(header_line or "null")
+    if (
+        not isinstance(header, dict)
+        or header.get("format") != _DUMP_FORMAT
+        or header.get("version") != _DUMP_VERSION
+    ):
+        raise ValueError("not a supported pppipam dump")
+    return header.get("strict", True)
+
+
+def _dump_rows(
+    lines: typing.Iterable[str]
+) -> typing.Iterator[typing.Tuple[typing.Any, typing.Any]]:
+    """Iterates (ip_parameter, description) pairs of dump lines.
+
+    Args:
+        lines: IP object lines of a dump; blank ones are skipped.
+
+    Yields:
+        pairs of "ip" and "description" members of every line.
+
+    Raises:
+        ValueError: line is not JSON.
+    """
+    for row in map(json.loads, filter(str.strip, lines)):
+        yield row.get("ip"), row.get("description")
+
+
+def _raise_dump_errors(errors: typing.List[RowError]) -> None:
+    """Reports invalid rows of a dump, if any.
+
+    Args:
+        errors: (row position, exception) pairs, in row order.
+
+    Raises:
+        ValueError: there are invalid rows.
+    """
+    if errors:
+        position, error = errors[0]
+        raise ValueError(
+            f"{len(errors)} invalid IP object lines, "
+            f"first one is row {position + 1}: {error}"
+        )
+
+
+def _bulk_row_error(
+    strict: bool,
+    rank: int,
+    supernet: typing.Optional[typing.Any],
+    node: typing.Optional[typing.Any],
+    delegated: typing.Optional[bool],
+) -> typing.Optional[Exception]:
+    """Checks a describe_many row as describe would.
+
+    Args:
+        strict: address space strictness.
+        rank: prefix length of network or _ADDRESS_RANK.
+        supernet: smallest described supernet or None.
+        node: IP object already described as the same one or None.
+        delegated: describe_many's delegated argument.
+
+    Returns:
+        Exception instance describe would have raised or None.
+    """
+    if delegated:
+        if rank == _ADDRESS_RANK:
+            return ValueError("No address as parameter allowed")
+        if supernet is not None:
+            return StrictSupernetError("supernet already described")
+        if node is not None:
+            return SameDelegationAsNewError("already described")
+    elif delegated is None:
+        # Trusted rows, such as dumps of a valid address space, where
+        # deletions may have left IP objects without supernet.
+        pass
+    elif strict and supernet is None:
+        return StrictSupernetError("supernet not found")
+
+    return None
+
+
+def _nest_export(
+    exported: typing.Iterable[typing.Tuple[int, IPObject, str]]
+) -> typing.Dict[str, dict]:
+    """Builds export_data's dict from iter_export's tuples.
+
+    Args:
+        exported: tuples of depth, IP object and description,
+                  in tree order.
+
+    Returns:
+        dict as described in AddressSpace.export_data.
+    """
+    description = dict()
+    nested_ip_objects = dict()
+    nest_stack = list()
+
+    for depth, ip_object, ip_description in exported:
+        description[ip_object] = ip_description
+        if depth == 0:
+            nest_stack = [
+                nested_ip_objects.setdefault(ip_object.version, dict())
+            ]
+        else:
+            del nest_stack[depth + 1:]
+        children = dict()
+        nest_stack[depth][ip_object] = children
+        nest_stack.append(children)
+
+    return dict({
+        "description": description,
+        "nested_ip_objects": nested_ip_objects,
+    })
+
+
+class Utilization(typing.NamedTuple):
+    """Utilization of a described network."""
+
+    descendants: int
+    covered: int
+    addresses: int
+    percent: float
+
+
+def _count_descendants(node: typing.Optional["_IPNode"], delta: int) -> None:
+    """Adds delta to descendants count of a node and its supernets."""
+    while node is not None:
+        node.descendants += delta
+        node = node.parent
+
+
+class _IPNode:
+    """Described IP address or network in address space.
+
+    Networks always have a children index; addresses have None.
+    Networks' free map of children blocks is only built when needed.
+    Networks also count described IP objects under them and addresses
+    taken by their children.
+    """
+
+    __slots__ = (
+        "address", "prefixlen", "version", "description", "parent",
+        "children", "free_map", "descendants", "covered",
+    )
+
+    def __init__(
+        self,
+        address: int,
+        prefixlen: int,
+        version: int,
+        description: str,
+        parent: typing.Optional["_IPNode"],
+        children: typing.Optional[ChildIndex],
+    ) -> None:
+        self.address = address
+        self.prefixlen = prefixlen
+        self.version = version
+        self.description = description
+        self.parent = parent
+        self.children = children
+        self.free_map = None
+        self.descendants = 0
+        self.covered = 0
+
+    @property
+    def key(self) -> int:
+        """Returns primary index key."""
+        if self.children is None:
+            return _node_key(self.version, self.address, _ADDRESS_RANK)
+        return _node_key(self.version, self.address, self.prefixlen)
+
+    @property
+    def last_address(self) -> int:
+        """Returns last address as int."""
+        return self.address | (
+            (1 << (_MAX_PREFIXLEN[self.version] - self.prefixlen)) - 1
+        )
+
+    def ip_object(self) -> IPObject:
+        """Returns a new IP address or IP network object."""
+        if self.children is None:
+            return _ADDRESS_CLASS[self.version](self.address)
+        return _NETWORK_CLASS[self.version]((self.address, self.prefixlen))
+
+    def block_prefixlen(self) -> int:
+        """Returns prefix length of block taken in its supernet."""
+        if self.children is None:
+            return _MAX_PREFIXLEN[self.version]
+        return self.prefixlen
+
+    def block_size(self) -> int:
+        """Returns number of addresses taken in its supernet."""
+        return 1 << (_MAX_PREFIXLEN[self.version] - self.block_prefixlen())
+
+    def build_free_map(self) -> FreeMap:
+        """Returns free map of network node, building it if needed."""
+        if self.free_map is None:
+            self.free_map = FreeMap(
+                _MAX_PREFIXLEN[self.version], self.address, self.prefixlen
+            )
+            for child in self.children:
+                self.free_map.insert(child.address, child.block_prefixlen())
+        return self.free_map
+
+
 @dataclass(init=False)
 class AddressSpace:
     """IP addresses and networks description manager."""
 
     __strict: bool
-    __description: typing.Dict[IPObject, str]
-    __networks: typing.Dict[int, typing.Set[helpers.IPNetwork]]
-    __addresses: typing.Dict[int, typing.Set[helpers.IPAddress]]
-    __parent_supernet: typing.Dict[IPObject, helpers.IPNetwork]
-    __children_ip_object: typing.Dict[
-        typing.Optional[helpers.IPNetwork], typing.Set[IPObject]
-    ]
+    __nodes: typing.Dict[int, _IPNode]
+    __top_level_children: typing.Dict[int, ChildIndex]
+    __supernet_index: typing.Dict[int, RadixTree]
+    __view_index: typing.Optional[typing.Dict[int, PersistentRadixTree]]
+    __stats: typing.Optional[Stats]
     strict_: InitVar[bool] = True
 
     def __init__(self, *, strict_: bool = True) -> None:
@@ -54,142 +430,327 @@ class AddressSpace:
                      previous delegated networks are inserted.
         """
         self.__strict = bool(strict_)
-        self.__description = dict()
-        self.__networks = dict()
-        self.__addresses = dict()
-        self.__parent_supernet = dict()
-        self.__children_ip_object = dict()
+        self.__nodes = dict()
+        self.__top_level_children = dict()
+        self.__supernet_index = dict()
+        self.__view_index = None
+        self.__stats = None
+
+    def __children_of(
+        self, supernet: typing.Optional[_IPNode], version: int
+    ) -> ChildIndex:
+        """Retrieves children index of a supernet.
+
+        Args:
+            supernet: network node registered in address space or
+                      None, the address space top supernet parent.
+            version: IP version of children.
+
+        Returns:
+            ChildIndex instance of supernet's children.
+        """
 
-        # None is address space top supernet parent.
-        self.__children_ip_object[None] = set()
+        if supernet is not None:
+            return supernet.children
+
+        if version not in self.__top_level_children:
+            self.__top_level_children[version] = ChildIndex()
+        return self.__top_level_children[version]
 
     def __get_supernet(
-        self, cleaned_ip_object: IPObject
-    ) -> typing.Optional[helpers.IPNetwork]:
+        self, version: int, address: int, prefixlen: int, rank: int
+    ) -> typing.Optional[_IPNode]:
         """Retrieves the smallest supernet of IP object, if described.
 
         Args:
-            cleaned_ip_object: IP object to be verified.
+            version: IP version of IP object.
+            address: first address of IP object as int.
+            prefixlen: prefix length of IP object.
+            rank: prefix length of network or _ADDRESS_RANK.
 
         Returns:
-            An IP network object with the largest prefix length
+            A network node with the largest prefix length
             if a supernet exists or None, otherwise.
-
-        Raises:
-            AttribureError: if parameter is not an IP object.
         """
 
-        version = cleaned_ip_object.version
-
-        if version not in self.__networks:
+        if version not in self.__supernet_index:
             return None
 
-        current_tentative = None
-        current_prefixlen = None
+        if rank != _ADDRESS_RANK:
+            # A network is not its own supernet.
+            if prefixlen == 0:
+                return None
+            prefixlen -= 1
+
+        if self.__stats is None:
+            return self.__supernet_index[version].longest_match(
+                address, prefixlen
+            )
 
-        if isinstance(cleaned_ip_object, IPAddressTuple):
-            for tentative_supernet in self.__networks[version]:
-                if cleaned_ip_object in tentative_supernet:
-                    if (current_prefixlen is None or
-                            tentative_supernet.prefixlen > current_prefixlen):
-                        current_tentative = tentative_supernet
-                        current_prefixlen = tentative_supernet.prefixlen
+        supernet, examined = self.__supernet_index[
+            version
+        ].longest_match_counted(address, prefixlen)
+        self.__stats.count("supernet_searches")
+        self.__stats.count("supernet_candidates", examined)
+        return supernet
 
-        if isinstance(cleaned_ip_object, IPNetworkTuple):
-            for tentative_supernet in self.__networks[version]:
-                if cleaned_ip_object == tentative_supernet:
-                    continue
-                if cleaned_ip_object.subnet_of(tentative_supernet):
-                    if (current_prefixlen is None or
-                            tentative_supernet.prefixlen > current_prefixlen):
-                        current_tentative = tentative_supernet
-                        current_prefixlen = tentative_supernet.prefixlen
+    def __track(self, node: _IPNode) -> None:
+        """Inserts or updates node in view index, if snapshots were taken.
 
-        return current_tentative
+        Args:
+            node: node registered in address space.
+        """
+
+        if self.__view_index is None:
+            return
+        rank = _ADDRESS_RANK if node.children is None else node.prefixlen
+        if node.version not in self.__view_index:
+            self.__view_index[node.version] = PersistentRadixTree(
+                _MAX_PREFIXLEN[node.version] + 1
+            )
+        self.__view_index[node.version].insert(
+            *_view_key(node.version, node.address, rank), node.description
+        )
 
-    def __remove_ip_object(self, ip_object: IPObject) -> bool:
-        """Adjust private variables to remove an IP object.
+    def __untrack(self, node: _IPNode) -> None:
+        """Removes node from view index, if snapshots were taken.
 
         Args:
-            ip_object: IP object registered in address space.
+            node: node registered in address space.
+        """
 
-        Returns:
-            bool if successfully removed.
+        if self.__view_index is None:
+            return
+        rank = _ADDRESS_RANK if node.children is None else node.prefixlen
+        self.__view_index[node.version].remove(
+            *_view_key(node.version, node.address, rank)
+        )
 
-        Raises:
-            TypeError: parameters not of expected type.
+    def __insert_node(
+        self,
+        version: int,
+        address: int,
+        prefixlen: int,
+        rank: int,
+        description: str,
+        supernet: typing.Optional[_IPNode],
+    ) -> _IPNode:
+        """Registers a new IP object under its supernet.
+
+        Args:
+            version: IP version of IP object.
+            address: first address of IP object as int.
+            prefixlen: prefix length of IP object.
+            rank: prefix length of network or _ADDRESS_RANK.
+            description: non-empty str to describe IP object.
+            supernet: smallest described supernet or None.
+
+        Returns:
+            inserted node.
         """
 
-        if ip_object not in self.__description:
-            raise IPObjectNotInSpaceError(
-                "cannot remove undescribed IP object"
+        children_of_supernet = self.__children_of(supernet, version)
+
+        node = _IPNode(
+            address, prefixlen, version, description, supernet, None
+        )
+
+        if rank != _ADDRESS_RANK:
+            # Supernet's children inside new network are now its children.
+            # Siblings never overlap and none of them contains new network,
+            # so those are exactly the ones starting inside new network.
+            node.children = children_of_supernet.pop_range(
+                address, node.last_address
             )
+            for child in node.children:
+                child.parent = node
+                node.descendants += child.descendants + 1
+                node.covered += child.block_size()
+            if supernet is not None:
+                supernet.covered -= node.covered
+            if self.__stats is not None and node.children:
+                self.__stats.count("child_rearrangements")
+                self.__stats.count("children_moved", len(node.children))
+
+            if version not in self.__supernet_index:
+                self.__supernet_index[version] = RadixTree(
+                    _MAX_PREFIXLEN[version]
+                )
+            self.__supernet_index[version].insert(address, prefixlen, node)
 
-        if isinstance(ip_object, IPAddressTuple):
+        self.__nodes[_node_key(version, address, rank)] = node
+        children_of_supernet.add(address, node)
+        if supernet is not None:
+            supernet.covered += node.block_size()
+            _count_descendants(supernet, 1)
+            if supernet.free_map is not None:
+                supernet.free_map.insert(address, node.block_prefixlen())
+        self.__track(node)
 
-            supernet = self.__parent_supernet[ip_object]
-            self.__children_ip_object[supernet].remove(ip_object)
-            del self.__parent_supernet[ip_object]
-            del self.__description[ip_object]
-            self.__addresses[ip_object.version].remove(ip_object)
-            if not self.__addresses[ip_object.version]:
-                del self.__addresses[ip_object.version]
+        return node
 
-        elif isinstance(ip_object, IPNetworkTuple):
+    def __append_node(
+        self,
+        version: int,
+        address: int,
+        prefixlen: int,
+        rank: int,
+        description: str,
+        supernet: typing.Optional[_IPNode],
+    ) -> _IPNode:
+        """Registers a new IP object after every child of its supernet.
 
-            supernet = self.__parent_supernet[ip_object]
-            children_of_supernet = (
-                self.__children_ip_object.setdefault(supernet, set())
-            )
+        Faster than __insert_node, but only valid if new IP object
+        starts after every supernet's child and covers none of them.
 
-            for child in self.__children_ip_object[ip_object]:
-                self.__parent_supernet[child] = supernet
-                children_of_supernet.add(child)
+        Args:
+            version: IP version of IP object.
+            address: first address of IP object as int.
+            prefixlen: prefix length of IP object.
+            rank: prefix length of network or _ADDRESS_RANK.
+            description: non-empty str to describe IP object.
+            supernet: smallest described supernet or None.
 
-            self.__children_ip_object[supernet].remove(ip_object)
-            del self.__children_ip_object[ip_object]
-            del self.__parent_supernet[ip_object]
-            del self.__description[ip_object]
-            self.__networks[ip_object.version].remove(ip_object)
-            if not self.__networks[ip_object.version]:
-                del self.__networks[ip_object.version]
+        Returns:
+            appended node.
+        """
 
-        else:
+        node = _IPNode(
+            address, prefixlen, version, description, supernet, None
+        )
 
-            raise TypeError("ip_parameter must be a valid IP object")
+        if rank != _ADDRESS_RANK:
+            node.children = ChildIndex()
+            if version not in self.__supernet_index:
+                self.__supernet_index[version] = RadixTree(
+                    _MAX_PREFIXLEN[version]
+                )
+            self.__supernet_index[version].insert(address, prefixlen, node)
 
-        return True
+        self.__nodes[_node_key(version, address, rank)] = node
+        self.__children_of(supernet, version).append(address, node)
+        if supernet is not None:
+            supernet.covered += node.block_size()
+            _count_descendants(supernet, 1)
+            if supernet.free_map is not None:
+                supernet.free_map.insert(address, node.block_prefixlen())
+        self.__track(node)
 
-    def __cascading_remove_ip_network(
-        self, ip_network_object: helpers.IPNetwork
-    ) -> bool:
-        """Recursively removes children IP objects and itself.
+        return node
+
+    def __remove_node(self, node: _IPNode) -> bool:
+        """Adjust private variables to remove a described IP object.
 
         Args:
-            ip_network_object: IP Network object registered in
-                               address space.
+            node: node registered in address space.
 
         Returns:
             bool if successfully removed.
+        """
 
-        Raises:
-            TypeError: parameters not of expected type.
+        children_of_supernet = self.__children_of(node.parent, node.version)
+        children_of_supernet.remove(node.address, node)
+
+        supernet = node.parent
+        if supernet is not None:
+            supernet.covered += node.covered - node.block_size()
+            _count_descendants(supernet, -1)
+        if supernet is not None and supernet.free_map is not None:
+            if node.children is None or node.free_map is not None:
+                # Node's block now holds node's children, if any.
+                supernet.free_map.graft(
+                    node.address, node.block_prefixlen(), node.free_map
+                )
+            elif node.children:
+                # Rebuilt in O(children) by the next allocation, rather
+                # than here by every delete.
+                supernet.free_map = None
+            else:
+                supernet.free_map.remove(node.address, node.prefixlen)
+
+        if node.children is not None:
+            if self.__stats is not None and node.children:
+                self.__stats.count("child_rearrangements")
+                self.__stats.count("children_moved", len(node.children))
+            for child in node.children:
+                child.parent = node.parent
+            children_of_supernet.merge(node.children)
+
+            supernet_index = self.__supernet_index[node.version]
+            supernet_index.remove(node.address, node.prefixlen)
+            if not supernet_index:
+                del self.__supernet_index[node.version]
+
+        del self.__nodes[node.key]
+        self.__untrack(node)
+
+        return True
+
+    def __cascading_remove_node(self, node: _IPNode) -> bool:
+        """Removes a network node and its whole subtree at once.
+
+        Subtree is detached from its supernet in a single step, and its
+        networks dropped from radix indexes by cutting their branch, so
+        only unregistering each node depends on the subtree size.
+
+        Args:
+            node: network node registered in address space.
+
+        Returns:
+            bool if successfully removed.
         """
 
-        children = list(self.__children_ip_object[ip_network_object])
+        version = node.version
+        self.__children_of(node.parent, version).remove(node.address, node)
+
+        supernet = node.parent
+        if supernet is not None:
+            supernet.covered -= node.block_size()
+            _count_descendants(supernet, -1 - node.descendants)
+            if supernet.free_map is not None:
+                supernet.free_map.remove(node.address, node.prefixlen)
+
+        supernet_index = self.__supernet_index[version]
+        supernet_index.remove_covered(node.address, node.prefixlen)
+        if not supernet_index:
+            del self.__supernet_index[version]
+        if self.__view_index is not None:
+            self.__view_index[version].remove_covered(
+                *_view_key(version, node.address, node.prefixlen)
+            )
+
+        nodes = self.__nodes
+        stack = [node]
+        while stack:
+            removed = stack.pop()
+            del nodes[removed.key]
+            # No reference cycles left, so memory is freed right away.
+            removed.parent = None
+            if removed.children is not None:
+                stack.extend(removed.children)
 
-        for child in children:
-            if child not in self.__description:
-                continue
+        return True
 
-            if isinstance(child, IPAddressTuple):
-                self.__remove_ip_object(child)
-            elif isinstance(child, IPNetworkTuple):
-                self.__cascading_remove_ip_network(child)
-            else:
-                raise TypeError("child must be a valid IP object")
+    def __eq__(self, other: typing.Any) -> bool:
+        """Compares strictness and described IP objects.
 
-        return self.__remove_ip_object(ip_network_object)
+        Nodes reference their parents and children, so comparing them
+        as dataclass fields would compare identities; iter_export
+        yields a canonical order of comparable values instead.
+        """
+
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        if self.__strict != other.__strict:
+            return False
+
+        missing = object()
+        return all(
+            mine == theirs
+            for mine, theirs in itertools.zip_longest(
+                self.iter_export(), other.iter_export(), fillvalue=missing
+            )
+        )
 
     @property
     def strict(self) -> bool:
@@ -279,88 +840,172 @@ class AddressSpace:
             >>>
         """
 
-        if description == "":
-            raise ValueError("No empty description allowed")
-        if not isinstance(description, str):
-            raise TypeError("description must be str")
-        if isinstance(ip_parameter, int):
-            raise TypeError("ip_parameter must not be int")
+        ip_object = _clean_described_object(ip_parameter, description)
 
         is_new_delegated_net = bool(is_new_delegated_net)
 
-        as_address = helpers.clean_address(ip_parameter)
-        as_network = helpers.clean_network(ip_parameter)
+        if is_new_delegated_net and isinstance(ip_object, IPAddressTuple):
+            raise ValueError(
+                "is_new_delegated_net was set with address parameter"
+            )
 
-        described = False
+        version, address, prefixlen, rank = _unpack(ip_object)
+        supernet = self.__get_supernet(version, address, prefixlen, rank)
 
-        if isinstance(as_address, IPAddressTuple):
-            if is_new_delegated_net:
+        if rank != _ADDRESS_RANK and is_new_delegated_net:
+            if supernet is not None:
                 raise ValueError(
-                    "is_new_delegated_net was set with address parameter"
+                    "Invalid combination of existing supernet "
+                    "and new delegated network"
                 )
+        elif self.__strict and supernet is None:
+            raise StrictSupernetError("supernet not found")
 
-            supernet = self.__get_supernet(as_address)
-            if self.__strict and supernet is None:
-                raise StrictSupernetError("supernet not found")
-
-            version_set = self.__addresses.setdefault(
-                as_address.version, set()
+        node = self.__nodes.get(_node_key(version, address, rank))
+        if node is not None:
+            node.description = description
+            self.__track(node)
+        else:
+            self.__insert_node(
+                version, address, prefixlen, rank, description, supernet
             )
-            version_set.add(as_address)
-            self.__description[as_address] = description
-            described = True
 
-            self.__parent_supernet[as_address] = supernet
-            children_of_supernet = (
-                self.__children_ip_object.setdefault(supernet, set())
-            )
-            children_of_supernet.add(as_address)
-        elif isinstance(as_network, IPNetworkTuple):
-            supernet = self.__get_supernet(as_network)
-            if is_new_delegated_net and supernet is not None:
-                raise ValueError(
-                    "Invalid combination of existing supernet "
-                    "and new delegated network"
-                )
-            if (
-                self.__strict and supernet is None and not is_new_delegated_net
-            ):
-                raise StrictSupernetError("supernet not found")
+        return True
 
+    def describe_many(
+        self,
+        rows: typing.Iterable[typing.Tuple[IPParameter, str]],
+        *,
+        delegated: typing.Optional[bool] = False,
+    ) -> typing.List[typing.Tuple[int, Exception]]:
+        """Insert many IP addresses or networks with descriptions.
 
-            version_set = self.__networks.setdefault(as_network.version, set())
-            version_set.add(as_network)
-            self.__description[as_network] = description
-            described = True
+        Rows are sorted by IP version, first address and prefix length
+        and then described in that order, so supernets are always
+        described before their subnets.  If no IP object of a version
+        is described yet, the hierarchy of that version is built in
+        one sweep, without any supernet lookup.
 
-            self.__parent_supernet[as_network] = supernet
-            children_of_as_network = (
-                self.__children_ip_object.setdefault(as_network, set())
-            )
-            children_of_supernet = (
-                self.__children_ip_object.setdefault(supernet, set())
-            )
-            # Supernet's child can be as_network's child
-            version = as_network.version
-            to_arrange = set()
-            for tentative_child in children_of_supernet:
-                if (isinstance(tentative_child, IPAddressTuple)
-                        and tentative_child.version == version
-                        and tentative_child in as_network):
-                    to_arrange.add(tentative_child)
-                elif (isinstance(tentative_child, IPNetworkTuple)
-                        and tentative_child.version == version
-                        and tentative_child.subnet_of(as_network)):
-                    to_arrange.add(tentative_child)
-            for child in to_arrange:
-                self.__parent_supernet[child] = as_network
-                children_of_as_network.add(child)
-                children_of_supernet.remove(child)
-            children_of_supernet.add(as_network)
-        else:
-            raise TypeError("ip_parameter must be a valid IP parameter")
+        Invalid rows are not described and are reported instead of
+        interrupting the remaining ones.
+
+        Args:
+            rows: iterable of (ip_parameter, description) pairs.
+            delegated: if evaluates to True, every row must be a new
+                       delegated network, as in
+                       describe_new_delegated_network;
+                       if None, rows are trusted, as when loading a
+                       dump, so IP objects without supernet are
+                       described even in strict address spaces;
+                       otherwise, rows are described as in describe.
+
+        Returns:
+            list of (row position, exception) pairs, ordered by
+            row position, of rows that could not be described.
+
+        doctest example:
+            >>> sas = AddressSpace(strict_=True)
+            >>> sas.describe_many([
+            ...     ("2001:db8::/32", "IPv6 documentation network"),
+            ...     ("192.0.2.0/24", "TEST-NET-1"),
+            ... ], delegated=True)
+            []
+            >>> errors = sas.describe_many([
+            ...     ("192.0.2.1", "TEST-NET-1 gateway"),
+            ...     ("2001:db8:abcd::/48", "IPv6 doc subnet"),
+            ...     ("198.51.100.1", "not in any delegated network"),
+            ...     ("2001:db8:abcd::1", ""),
+            ... ])
+            >>> for position, error in errors:
+            ...     print(position, repr(error))
+            2 StrictSupernetError('supernet not found')
+            3 ValueError('No empty description allowed')
+            >>> sas.description("2001:db8:abcd::/48")
+            'IPv6 doc subnet'
+            >>> sas.describe_many([
+            ...     ("10.0.0.0/8", "private network"),
+            ...     ("10.1.2.3", "an address in private network"),
+            ... ], delegated=None)
+            []
+            >>> sas.description("10.1.2.3")
+            'an address in private network'
+            >>>
+        """
+
+        parsed, errors = _parse_rows(rows)
+        parsed.sort(key=operator.itemgetter(0, 1, 2))
+        errors.extend(self._describe_sorted(parsed, delegated))
+        errors.sort(key=operator.itemgetter(0))
+
+        return errors
+
+    def _describe_sorted(
+        self,
+        parsed: typing.Iterable[ParsedRow],
+        delegated: typing.Optional[bool] = False,
+    ) -> typing.List[RowError]:
+        """Describes parsed rows already sorted as in describe_many.
+
+        Args:
+            parsed: rows as parsed by _parse_rows, sorted by version,
+                    first address and rank.
+            delegated: same as in describe_many.
+
+        Returns:
+            list of (row position, exception) pairs, in processing
+            order, of rows that could not be described.
+        """
 
-        return described
+        if delegated is not None:
+            delegated = bool(delegated)
+
+        errors = list()
+
+        for version, group in itertools.groupby(
+            parsed, key=operator.itemgetter(0)
+        ):
+            # Without previous IP objects of this version, the sorted
+            # rows are a preorder of the hierarchy and a stack of open
+            # networks is enough to know every supernet.
+            sweep = not self.__top_level_children.get(version)
+            stack = list()
+
+            for _, address, rank, prefixlen, description, position in group:
+                node = self.__nodes.get(_node_key(version, address, rank))
+
+                if node is not None:
+                    supernet = node.parent
+                elif sweep:
+                    while stack and stack[-1].last_address < address:
+                        stack.pop()
+                    supernet = stack[-1] if stack else None
+                else:
+                    supernet = self.__get_supernet(
+                        version, address, prefixlen, rank
+                    )
+
+                error = _bulk_row_error(
+                    self.__strict, rank, supernet, node, delegated
+                )
+                if error is not None:
+                    errors.append((position, error))
+                elif node is not None:
+                    node.description = description
+                    self.__track(node)
+                elif sweep:
+                    node = self.__append_node(
+                        version, address, prefixlen, rank, description,
+                        supernet,
+                    )
+                    if node.children is not None:
+                        stack.append(node)
+                else:
+                    self.__insert_node(
+                        version, address, prefixlen, rank, description,
+                        supernet,
+                    )
+
+        return errors
 
     def describe_new_delegated_network(
         self, *, network_parameter: helpers.IPNetworkParameter, description: str
@@ -449,16 +1094,18 @@ class AddressSpace:
         if isinstance(network_parameter, int):
             raise TypeError("network_parameter must not be int")
 
-        as_address = helpers.clean_address(network_parameter)
-        as_network = helpers.clean_network(network_parameter)
+        as_network = helpers.clean_ip_parameter(network_parameter)
 
-        if isinstance(as_address, IPAddressTuple):
+        if isinstance(as_network, IPAddressTuple):
             raise ValueError("No address as parameter allowed")
 
         if isinstance(as_network, IPNetworkTuple):
-            if self.__get_supernet(as_network) is not None:
+            version, address, prefixlen, rank = _unpack(as_network)
+            if self.__get_supernet(
+                version, address, prefixlen, rank
+            ) is not None:
                 raise StrictSupernetError("supernet already described")
-            if as_network in self.__description:
+            if _node_key(version, address, rank) in self.__nodes:
                 raise SameDelegationAsNewError("already described")
         else:
             raise TypeError("network_parameter must be "
@@ -470,6 +1117,245 @@ class AddressSpace:
             is_new_delegated_net=True,
         )
 
+    def __described_network(
+        self, network_parameter: helpers.IPNetworkParameter
+    ) -> _IPNode:
+        """Retrieves node of a described network.
+
+        Args:
+            network_parameter: value to be processed as an IP network.
+
+        Returns:
+            network node.
+
+        Raises:
+            TypeError: parameter not of expected type.
+            ValueError: parameter is an address.
+            IPObjectNotInSpaceError: network is not described.
+        """
+
+        if isinstance(network_parameter, int):
+            raise TypeError("network_parameter must not be int")
+
+        as_network = helpers.clean_ip_parameter(network_parameter)
+
+        if isinstance(as_network, IPAddressTuple):
+            raise ValueError("No address as parameter allowed")
+        if not isinstance(as_network, IPNetworkTuple):
+            raise TypeError("network_parameter must be "
+                            "a valid IP network parameter")
+
+        version, address, _, rank = _unpack(as_network)
+        node = self.__nodes.get(_node_key(version, address, rank))
+        if node is None:
+            raise IPObjectNotInSpaceError("network is not described")
+
+        return node
+
+    def allocate(
+        self,
+        parent: helpers.IPNetworkParameter,
+        prefixlen: int,
+        description: str,
+    ) -> helpers.IPNetwork:
+        """Describe the first free subnet of a described network.
+
+        The subnet is the free aligned block of the requested prefix
+        length with the lowest address, not overlapping any IP object
+        described in parent network.  Parent's free blocks are tracked
+        in a free map, built on first allocation and then kept up to
+        date, so each allocation costs one step per prefix bit.
+
+        Args:
+            parent: value to be processed as a described IP network.
+            prefixlen: prefix length of subnet, longer than parent's.
+            description: non-empty str to describe subnet.
+
+        Returns:
+            described subnet.
+
+        Raises:
+            TypeError: parameters not of expected type.
+            ValueError: invalid description or prefix length value.
+            IPObjectNotInSpaceError: parent network is not described.
+            NoFreeSpaceError: no free block of prefix length in parent.
+
+        doctest example:
+            >>> sas = AddressSpace(strict_=True)
+            >>> sas.describe_new_delegated_network(
+            ...     network_parameter="10.0.0.0/16",
+            ...     description="a private network")
+            True
+            >>> sas.describe(ip_parameter="10.0.0.0/24",
+            ...              description="described by hand")
+            True
+            >>> sas.allocate("10.0.0.0/16", 24, "first allocation")
+            IPv4Network('10.0.1.0/24')
+            >>> sas.allocate("10.0.0.0/16", 23, "second allocation")
+            IPv4Network('10.0.2.0/23')
+            >>> sas.allocate("10.0.0.0/16", 25, "third allocation")
+            IPv4Network('10.0.4.0/25')
+            >>> sas.description("10.0.2.0/23")
+            'second allocation'
+            >>> sas.allocate("10.0.1.0/24", 33, "too long")
+            Traceback (most recent call last):
+                ...
+            ValueError: prefixlen must be longer than network's and valid
+            >>> sas.allocate("10.0.0.0/24", 24, "same size")
+            Traceback (most recent call last):
+                ...
+            ValueError: prefixlen must be longer than network's and valid
+            >>> sas.allocate("10.0.0.0/8", 24, "not described")
+            Traceback (most recent call last):
+                ...
+            pppipam.pppipam.IPObjectNotInSpaceError: network is not described
+            >>>
+        """
+
+        node = self.__described_network(parent)
+        _clean_described_object(node.ip_object(), description)
+
+        if isinstance(prefixlen, bool) or not isinstance(prefixlen, int):
+            raise TypeError("prefixlen must be int")
+        if not node.prefixlen < prefixlen <= _MAX_PREFIXLEN[node.version]:
+            raise ValueError(
+                "prefixlen must be longer than network's and valid"
+            )
+
+        address = node.build_free_map().first_fit(prefixlen)
+        if address is None:
+            raise NoFreeSpaceError("no free block of prefixlen in network")
+
+        self.__insert_node(
+            node.version, address, prefixlen, prefixlen, description, node
+        )
+
+        return _NETWORK_CLASS[node.version]((address, prefixlen))
+
+    def allocate_address(
+        self,
+        network: helpers.IPNetworkParameter,
+        description: str,
+        *,
+        skip_network_broadcast: bool = True,
+    ) -> helpers.IPAddress:
+        """Describe the first free address of a described network.
+
+        Free addresses are found in the network's free map, as in
+        allocate, so the cost does not grow with how full it is.
+
+        Args:
+            network: value to be processed as a described IP network.
+            description: non-empty str to describe address.
+            skip_network_broadcast: if evaluates to True, only
+                                    addresses ipaddress' hosts()
+                                    yields are allocated: for networks
+                                    with more than two addresses, the
+                                    first one (and, for IPv4, the last
+                                    one) is skipped.
+
+        Returns:
+            described address.
+
+        Raises:
+            TypeError: parameters not of expected type.
+            ValueError: invalid description value.
+            IPObjectNotInSpaceError: network is not described.
+            NoFreeSpaceError: no free address in network.
+
+        doctest example:
+            >>> as_ = AddressSpace(strict_=False)
+            >>> as_.describe(ip_parameter="192.0.2.0/29",
+            ...              description="a small TEST-NET-1 subnet")
+            True
+            >>> as_.describe(ip_parameter="192.0.2.1",
+            ...              description="gateway")
+            True
+            >>> as_.allocate_address("192.0.2.0/29", "first host")
+            IPv4Address('192.0.2.2')
+            >>> as_.allocate_address("192.0.2.0/29", "network address",
+            ...                      skip_network_broadcast=False)
+            IPv4Address('192.0.2.0')
+            >>> as_.describe(ip_parameter="2001:db8::/126",
+            ...              description="a small IPv6 subnet")
+            True
+            >>> as_.allocate_address("2001:db8::/126", "first host")
+            IPv6Address('2001:db8::1')
+            >>>
+        """
+
+        node = self.__described_network(network)
+        _clean_described_object(node.ip_object(), description)
+
+        max_prefixlen = _MAX_PREFIXLEN[node.version]
+        first = node.address
+        last = node.last_address
+        if skip_network_broadcast and max_prefixlen - node.prefixlen >= 2:
+            first += 1
+            if node.version == 4:
+                last -= 1
+
+        address = node.build_free_map().first_fit(max_prefixlen, first)
+        if address is None or address > last:
+            raise NoFreeSpaceError("no free address in network")
+
+        self.__insert_node(
+            node.version, address, max_prefixlen, _ADDRESS_RANK, description,
+            node,
+        )
+
+        return _ADDRESS_CLASS[node.version](address)
+
+    def utilization(
+        self, network: helpers.IPNetworkParameter
+    ) -> Utilization:
+        """Retrieve utilization of a described network.
+
+        Counters are kept up to date as IP objects are described and
+        deleted, so no subtree is walked.
+
+        Args:
+            network: value to be processed as a described IP network.
+
+        Returns:
+            Utilization with number of IP objects described under
+            network, number of addresses covered by network's children
+            (subnets and addresses), number of addresses of network and
+            percent of them covered by children.
+
+        Raises:
+            TypeError: parameter not of expected type.
+            ValueError: parameter is an address.
+            IPObjectNotInSpaceError: network is not described.
+
+        doctest example:
+            >>> as_ = AddressSpace(strict_=False)
+            >>> as_.describe_many([
+            ...     ("192.0.2.0/24", "TEST-NET-1"),
+            ...     ("192.0.2.0/25", "TEST-NET-1 lower half"),
+            ...     ("192.0.2.1", "TEST-NET-1 gateway"),
+            ...     ("192.0.2.200", "TEST-NET-1 host"),
+            ... ])
+            []
+            >>> tuple(as_.utilization("192.0.2.0/24"))
+            (3, 129, 256, 50.390625)
+            >>> as_.delete(ip_parameter="192.0.2.0/25", cascade=False)
+            True
+            >>> as_.utilization("192.0.2.0/24").descendants
+            2
+            >>>
+        """
+
+        node = self.__described_network(network)
+        addresses = node.block_size()
+
+        return Utilization(
+            node.descendants,
+            node.covered,
+            addresses,
+            node.covered * 100 / addresses,
+        )
+
     def description(self, ip_parameter: IPParameter) -> typing.Optional[str]:
         """Retrieve a description of an IP address or IP network.
 
@@ -574,33 +1460,120 @@ class AddressSpace:
         if isinstance(ip_parameter, int):
             raise TypeError("ip_parameter must not be int")
 
-        as_address = helpers.clean_address(ip_parameter)
-        as_network = helpers.clean_network(ip_parameter)
+        ip_object = helpers.clean_ip_parameter(ip_parameter)
 
-        if not isinstance(as_address, IPAddressTuple) and not isinstance(
-            as_network, IPNetworkTuple
-        ):
+        if ip_object is None:
             raise TypeError("ip_parameter must be a valid IP parameter")
 
+        version, address, prefixlen, rank = _unpack(ip_object)
+        node = self.__nodes.get(_node_key(version, address, rank))
+        if node is not None:
+            return node.description
 
-        if isinstance(as_address, IPAddressTuple):
-            if as_address in self.__description:
-                return self.__description[as_address]
+        supernet = self.__get_supernet(version, address, prefixlen, rank)
+        if supernet is not None:
+            return str("")
 
-            supernet = self.__get_supernet(as_address)
-            if supernet is not None:
-                return str("")
+        return None
 
-        if isinstance(as_network, IPNetworkTuple):
-            if as_network in self.__description:
-                return self.__description[as_network]
+    def __top_level_supernet(
+        self, version: int, address: int, prefixlen: int
+    ) -> typing.Optional[_IPNode]:
+        """Retrieves the top-level network covering an IP object, if any.
 
-            supernet = self.__get_supernet(as_network)
-            if supernet is not None:
-                return str("")
+        Top-level IP objects never overlap, so the only candidate is
+        the last one starting at or before IP object's first address.
+
+        Args:
+            version: IP version of IP object.
+            address: first address of IP object as int.
+            prefixlen: prefix length of IP object.
+
+        Returns:
+            top-level network node covering IP object or None.
+        """
+
+        children = self.__top_level_children.get(version)
+        if not children:
+            return None
+
+        position = bisect.bisect_right(children.starts, address) - 1
+        if position < 0:
+            return None
+        if self.__stats is not None:
+            self.__stats.count("supernet_searches")
+            self.__stats.count("supernet_candidates")
+
+        candidate = children.items[position]
+        if (
+            candidate.children is not None
+            and candidate.prefixlen <= prefixlen
+            and address <= candidate.last_address
+        ):
+            return candidate
 
         return None
 
+    def description_many(
+        self, ip_parameters: typing.Iterable[IPParameter]
+    ) -> typing.List[typing.Optional[str]]:
+        """Retrieve descriptions of many IP addresses or IP networks.
+
+        Same results as calling description for each parameter, but
+        IP objects that are not described are resolved by bisection
+        over top-level networks, sorted by first address, instead of
+        a supernet search.
+
+        Args:
+            ip_parameters: iterable of values to be processed as
+                           IP addresses or IP networks.
+
+        Returns:
+            list with, for each parameter in the same order, the same
+            value description would return.
+
+        Raises:
+            TypeError: parameters not of expected type.
+
+        doctest example:
+            >>> as_ = AddressSpace(strict_=False)
+            >>> as_.describe(ip_parameter='198.51.100.0/24',
+            ...              description="TEST-NET-2 (RFC5735)")
+            True
+            >>> as_.describe(description="An address in test net",
+            ...              ip_parameter="198.51.100.123")
+            True
+            >>> as_.description_many(["198.51.100.123", "198.51.100.1",
+            ...                       "198.51.100.0/24", "198.51.99.0",
+            ...                       "2001:db8::1"])
+            ['An address in test net', '', 'TEST-NET-2 (RFC5735)', None, None]
+            >>>
+        """
+
+        nodes = self.__nodes
+        results = list()
+
+        for ip_parameter in ip_parameters:
+            if isinstance(ip_parameter, int):
+                raise TypeError("ip_parameter must not be int")
+
+            ip_object = helpers.clean_ip_parameter(ip_parameter)
+            if ip_object is None:
+                raise TypeError("ip_parameter must be a valid IP parameter")
+
+            version, address, prefixlen, rank = _unpack(ip_object)
+            node = nodes.get(_node_key(version, address, rank))
+            if node is not None:
+                results.append(node.description)
+            elif self.__top_level_supernet(
+                version, address, prefixlen
+            ) is not None:
+                results.append(str(""))
+            else:
+                results.append(None)
+
+        return results
+
     def delete(self, *, ip_parameter: IPParameter, cascade: bool) -> bool:
         """Delete only described IP object and optionally its children.
 
@@ -618,84 +1591,465 @@ class AddressSpace:
                                      not registered.
         """
 
-        as_address = helpers.clean_address(ip_parameter)
-        as_network = helpers.clean_network(ip_parameter)
+        ip_object = helpers.clean_ip_parameter(ip_parameter)
 
-        if as_address in self.__description:
-            return self.__remove_ip_object(as_address)
-        elif as_network in self.__description:
-            if cascade:
-                return self.__cascading_remove_ip_network(as_network)
-            else:
-                return self.__remove_ip_object(as_network)
+        if ip_object is not None:
+            version, address, prefixlen, rank = _unpack(ip_object)
+            node = self.__nodes.get(_node_key(version, address, rank))
+            if node is None and rank == _ADDRESS_RANK:
+                # An address parameter also stands for its single
+                # address network.
+                node = self.__nodes.get(_node_key(version, address, prefixlen))
+
+            if node is not None:
+                if cascade and node.children is not None:
+                    return self.__cascading_remove_node(node)
+                return self.__remove_node(node)
 
         raise IPObjectNotInSpaceError("cannot delete undescribed IP object")
 
-    def __gather_nested_children(
-       self, ip_object: IPObject
-    ) -> typing.Dict[IPObject, dict]:
-        """Retrieves nested children of an IP object.
+    def iter_export(
+        self
+    ) -> typing.Iterator[typing.Tuple[int, IPObject, str]]:
+        """Iterates described IP objects in tree order.
+
+        IPv4 objects come before IPv6 ones; every network is followed
+        by its subtree and siblings are ordered by first address.
+        Only one iterator per tree level is kept, so memory does not
+        grow with the number of IP objects.  Address space must not
+        be changed while iterating.
+
+        Yields:
+            tuples of depth (0 for IP objects without supernet),
+            IP object and its description.
+
+        doctest example:
+            >>> as_ = AddressSpace(strict_=False)
+            >>> as_.describe_many([
+            ...     ("2001:db8::/32", "IPv6 documentation network"),
+            ...     ("192.0.2.0/24", "TEST-NET-1"),
+            ...     ("192.0.2.1", "TEST-NET-1 gateway"),
+            ...     ("192.0.2.128/25", "TEST-NET-1 upper half"),
+            ... ])
+            []
+            >>> for depth, ip_object, description in as_.iter_export():
+            ...     print(depth, ip_object, description)
+            0 192.0.2.0/24 TEST-NET-1
+            1 192.0.2.1 TEST-NET-1 gateway
+            1 192.0.2.128/25 TEST-NET-1 upper half
+            0 2001:db8::/32 IPv6 documentation network
+            >>>
+        """
 
-        If parameter is an address, there is no child.
-        If parameter is a network, recursively calculates children's
-        nested children.
+        for version in sorted(self.__top_level_children):
+            stack = [iter(self.__top_level_children[version])]
+            while stack:
+                node = next(stack[-1], None)
+                if node is None:
+                    stack.pop()
+                    continue
+                yield len(stack) - 1, node.ip_object(), node.description
+                if node.children:
+                    stack.append(iter(node.children))
+
+    def export_data(self) -> typing.Dict[str, dict]:
+        """Exports data as dict.
+
+        Returns:
+            dict composed by a dict of IP objects' descriptions and
+            a dict of nested IP objects according to
+            available IP objects' version.
+        """
+
+        return _nest_export(self.iter_export())
+
+    def dump(self, fp: typing.TextIO) -> None:
+        """Writes address space to a text file as JSON Lines.
+
+        First line is a header object with "format" ("pppipam"),
+        "version" (1) and "strict" members.  Every other line is an
+        object with "ip" and "description" members of a described
+        IP object, in iter_export order.  Networks always have a
+        prefix length, so addresses and single address networks do
+        not clash.  Lines are written as IP objects are iterated.
 
         Args:
-            ip_object: IP object registered in address space.
+            fp: text file open for writing.
+
+        doctest example:
+            >>> import io
+            >>> as_ = AddressSpace(strict_=False)
+            >>> as_.describe(ip_parameter="192.0.2.0/24",
+            ...              description="TEST-NET-1")
+            True
+            >>> as_.describe(ip_parameter="192.0.2.1",
+            ...              description="TEST-NET-1 gateway")
+            True
+            >>> fp = io.StringIO()
+            >>> as_.dump(fp)
+            >>> print(fp.getvalue(), end="")
+            {"format":"pppipam","version":1,"strict":false}
+            {"ip":"192.0.2.0/24","description":"TEST-NET-1"}
+            {"ip":"192.0.2.1","description":"TEST-NET-1 gateway"}
+            >>> _ = fp.seek(0)
+            >>> AddressSpace.load(fp) == as_
+            True
+            >>>
+        """
+
+        separators = (",", ":")
+        fp.write(json.dumps(
+            {
+                "format": _DUMP_FORMAT,
+                "version": _DUMP_VERSION,
+                "strict": self.__strict,
+            },
+            separators=separators,
+        ))
+        fp.write("\n")
+
+        for _, ip_object, description in self.iter_export():
+            fp.write(json.dumps(
+                {"ip": str(ip_object), "description": description},
+                separators=separators,
+            ))
+            fp.write("\n")
+
+    @classmethod
+    def load(cls, fp: typing.TextIO) -> "AddressSpace":
+        """Reads an address space written by dump.
+
+        Lines are parsed as they are read and described at once by
+        describe_many as trusted rows, so IP objects left without
+        supernet by deletions load even in strict address spaces.
+
+        Args:
+            fp: text file open for reading.
 
         Returns:
-            dict instance with nested children's dicts.
+            new AddressSpace instance.
 
         Raises:
-            TypeError: parameters not of expected type.
-            ValueError: children set not defined.
+            ValueError: not a dump file or invalid IP object lines.
         """
 
-        nested_dict = dict()
+        address_space = cls(strict_=_dump_strictness(fp.readline()))
+        errors = address_space.describe_many(
+            _dump_rows(fp), delegated=None
+        )
+        _raise_dump_errors(errors)
 
-        if isinstance(ip_object, IPAddressTuple):
+        return address_space
 
-            pass
+    def __iter_records(self) -> typing.Iterator[snapshot.Record]:
+        """Iterates snapshot records of nodes in tree order.
 
-        elif isinstance(ip_object, IPNetworkTuple):
+        Yields:
+            tuples of version, rank, first address as int,
+            description and parent record index (-1 if none).
+        """
 
-            if ip_object not in self.__children_ip_object:
-                raise ValueError("Network value should have children set")
+        index = 0
+        for version in sorted(self.__top_level_children):
+            stack = [(iter(self.__top_level_children[version]), -1)]
+            while stack:
+                node = next(stack[-1][0], None)
+                if node is None:
+                    stack.pop()
+                    continue
+                rank = (
+                    _ADDRESS_RANK if node.children is None else node.prefixlen
+                )
+                yield (
+                    version, rank, node.address, node.description,
+                    stack[-1][1],
+                )
+                if node.children:
+                    stack.append((iter(node.children), index))
+                index += 1
 
-            for child in self.__children_ip_object[ip_object]:
-                nested_dict[child] = self.__gather_nested_children(child)
+    def write_snapshot(self, fp: typing.BinaryIO) -> None:
+        """Writes address space as a binary snapshot to a file object.
 
-        else:
-            raise TypeError(f"unexpected parameter type: {type(ip_object)}")
+        Snapshot format is described in pppipam.snapshot module.
 
-        return nested_dict
+        Args:
+            fp: seekable binary file open for writing, at position 0,
+                such as an io.BytesIO instance.
+        """
 
+        snapshot.write_snapshot(
+            fp,
+            strict=self.__strict,
+            record_count=len(self.__nodes),
+            records=self.__iter_records(),
+        )
 
-    def export_data(self) -> typing.Dict[str, dict]:
-        """Exports data as dict.
+    def save_snapshot(self, path: typing.Union[str, os.PathLike]) -> None:
+        """Writes address space to a binary snapshot file.
+
+        File is written beside path and then renamed over it,
+        so path always has a complete snapshot.
+
+        Args:
+            path: snapshot file path.
+        """
+
+        path = os.fspath(path)
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "wb") as fp:
+            self.write_snapshot(fp)
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load_snapshot(
+        cls, path: typing.Union[str, os.PathLike]
+    ) -> "AddressSpace":
+        """Reads an address space from a binary snapshot file.
+
+        Records are trusted to come from save_snapshot: nodes and
+        indexes are rebuilt in tree order without describe's checks.
+
+        Args:
+            path: snapshot file path.
 
         Returns:
-            dict composed by a dict of IP objects' descriptions and
-            a dict of nested IP objects according to
-            available IP objects' version.
+            new AddressSpace instance.
+
+        Raises:
+            ValueError: not a supported snapshot.
+
+        doctest example:
+            >>> import os, tempfile
+            >>> as_ = AddressSpace(strict_=False)
+            >>> as_.describe(ip_parameter="192.0.2.0/24",
+            ...              description="TEST-NET-1")
+            True
+            >>> as_.describe(ip_parameter="192.0.2.1",
+            ...              description="TEST-NET-1 gateway")
+            True
+            >>> with tempfile.TemporaryDirectory() as directory:
+            ...     path = os.path.join(directory, "space.snapshot")
+            ...     as_.save_snapshot(path)
+            ...     AddressSpace.load_snapshot(path) == as_
+            True
+            >>>
         """
 
-        nested_ip_objects = dict()
+        with open(path, "rb") as fp:
+            data = fp.read()
 
-        if self.__children_ip_object and None in self.__children_ip_object:
-            children_per_version = dict()
-            for child in self.__children_ip_object[None]:
-                version_set = children_per_version.setdefault(
-                    child.version, set()
-                )
-                version_set.add(child)
+        layout = snapshot.read_layout(data)
+        address_space = cls(strict_=layout.strict)
+
+        # Records are in tree order, so every parent is an open network.
+        stack = list()
+        for index, (version, rank, address, description, parent) in (
+            enumerate(snapshot.iter_records(data, layout))
+        ):
+            while stack and stack[-1][0] != parent:
+                stack.pop()
+            supernet = stack[-1][1] if stack else None
+            prefixlen = (
+                _MAX_PREFIXLEN[version] if rank == _ADDRESS_RANK else rank
+            )
+            node = address_space.__append_node(
+                version, address, prefixlen, rank, description, supernet
+            )
+            if node.children is not None:
+                stack.append((index, node))
+
+        return address_space
+
+    def enable_stats(self, hook: typing.Optional[Hook] = None) -> None:
+        """Starts recording operations and counters, from scratch.
 
-            for version in children_per_version:
-                version_nest = nested_ip_objects.setdefault(version, dict())
-                for child in children_per_version[version]:
-                    version_nest[child] = self.__gather_nested_children(child)
+        Recording wraps operation methods of this instance only, so
+        address spaces without stats run unchanged code.  Counters and
+        operations are described in pppipam.stats module.
 
-        return dict({
-            "description": dict(self.__description),
-            "nested_ip_objects": nested_ip_objects,
-        })
+        Args:
+            hook: callable called after every operation with its name,
+                  duration in seconds and dict of counters incremented
+                  during it.
+
+        doctest example:
+            >>> as_ = AddressSpace(strict_=False)
+            >>> as_.enable_stats()
+            >>> as_.describe(ip_parameter="192.0.2.1", description="host")
+            True
+            >>> as_.describe(ip_parameter="192.0.2.0/24",
+            ...              description="TEST-NET-1")
+            True
+            >>> stats = as_.stats()
+            >>> stats["operations"]["describe"]["calls"]
+            2
+            >>> stats["counters"]["children_moved"]
+            1
+            >>> as_.disable_stats()
+            >>> as_.stats()
+            >>>
+        """
+
+        self.disable_stats()
+        self.__stats = Stats(hook)
+        for name in _INSTRUMENTED:
+            method = getattr(type(self), name).__get__(self, type(self))
+            setattr(self, name, self.__stats.wrap(name, method))
+
+    def disable_stats(self) -> None:
+        """Stops recording operations and drops recorded stats."""
+
+        if self.__stats is None:
+            return
+        for name in _INSTRUMENTED:
+            delattr(self, name)
+        self.__stats = None
+
+    def stats(self) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        """Returns recorded operations and counters.
+
+        Returns:
+            dict with "operations", mapping operation names to their
+            calls, total and maximum duration in seconds and latency
+            histogram (bucket upper bound in microseconds to number
+            of calls), and "counters"; or None if stats are disabled.
+        """
+
+        if self.__stats is None:
+            return None
+        return self.__stats.as_dict()
+
+    def snapshot(self) -> "AddressSpaceView":
+        """Takes an immutable view of described IP objects.
+
+        Views share their index with the address space, so taking one
+        is O(1) and later changes only copy the index nodes on their
+        own path.  The index is built by the first snapshot and kept
+        up to date from then on.
+
+        Returns:
+            AddressSpaceView instance, unaffected by later changes.
+
+        doctest example:
+            >>> as_ = AddressSpace(strict_=False)
+            >>> as_.describe(ip_parameter="192.0.2.0/24",
+            ...              description="TEST-NET-1")
+            True
+            >>> view = as_.snapshot()
+            >>> as_.describe(ip_parameter="192.0.2.1",
+            ...              description="TEST-NET-1 gateway")
+            True
+            >>> as_.delete(ip_parameter="192.0.2.0/24", cascade=False)
+            True
+            >>> view.description("192.0.2.1")
+            ''
+            >>> view.description("192.0.2.0/24")
+            'TEST-NET-1'
+            >>> as_.snapshot().description("192.0.2.0/24")
+            >>>
+        """
+
+        if self.__view_index is None:
+            self.__view_index = dict()
+            for node in self.__nodes.values():
+                self.__track(node)
+
+        return AddressSpaceView(
+            self.__strict,
+            {
+                version: index.freeze()
+                for version, index in self.__view_index.items()
+            },
+        )
+
+
+class AddressSpaceView:
+    """Immutable view of an address space, taken by snapshot.
+
+    Answers the same queries as AddressSpace from a frozen index, so
+    it can be used from any thread, without locking, while its address
+    space keeps changing.
+    """
+
+    def __init__(
+        self, strict: bool, index: typing.Dict[int, PersistentRadixTree]
+    ) -> None:
+        """Uses frozen view indexes of an address space.
+
+        Args:
+            strict: strictness of address space.
+            index: frozen PersistentRadixTree of each IP version.
+        """
+        self.__strict = strict
+        self.__index = index
+
+    @property
+    def strict(self) -> bool:
+        """Returns strict value of address space."""
+        return self.__strict
+
+    def description(self, ip_parameter: IPParameter) -> typing.Optional[str]:
+        """Same as AddressSpace.description, at snapshot time."""
+
+        if isinstance(ip_parameter, int):
+            raise TypeError("ip_parameter must not be int")
+
+        ip_object = helpers.clean_ip_parameter(ip_parameter)
+
+        if ip_object is None:
+            raise TypeError("ip_parameter must be a valid IP parameter")
+
+        version, address, prefixlen, rank = _unpack(ip_object)
+        index = self.__index.get(version)
+        if index is None:
+            return None
+
+        key, key_prefixlen = _view_key(version, address, rank)
+        description = index.get(key, key_prefixlen)
+        if description is not None:
+            return description
+
+        if rank != _ADDRESS_RANK:
+            # A network is not its own supernet.
+            if prefixlen == 0:
+                return None
+            prefixlen -= 1
+        if index.longest_match(key, prefixlen) is not None:
+            return str("")
+
+        return None
+
+    def description_many(
+        self, ip_parameters: typing.Iterable[IPParameter]
+    ) -> typing.List[typing.Optional[str]]:
+        """Same as AddressSpace.description_many, at snapshot time."""
+        return [
+            self.description(ip_parameter) for ip_parameter in ip_parameters
+        ]
+
+    def iter_export(
+        self
+    ) -> typing.Iterator[typing.Tuple[int, IPObject, str]]:
+        """Same as AddressSpace.iter_export, at snapshot time."""
+
+        for version in sorted(self.__index):
+            width = _MAX_PREFIXLEN[version] + 1
+            # Last keys of networks enclosing current entry.
+            stack = list()
+            for key, prefixlen, description in self.__index[version].items():
+                while stack and stack[-1] < key:
+                    stack.pop()
+                depth = len(stack)
+                if prefixlen == width:
+                    ip_object = _ADDRESS_CLASS[version](key >> 1)
+                else:
+                    ip_object = _NETWORK_CLASS[version]((key >> 1, prefixlen))
+                    stack.append(key | ((1 << (width - prefixlen)) - 1))
+                yield depth, ip_object, description
+
+    def export_data(self) -> typing.Dict[str, dict]:
+        """Same as AddressSpace.export_data, at snapshot time."""
+        return _nest_export(self.iter_export())
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Module with asyncio lookup server over an address space.
+
+Clients send one JSON object per line and receive one JSON object per
+line, in request order, so many requests can be pipelined on a single
+connection.  Requests have an "op" member and optionally an "id"
+member, echoed back in its response:
+
+- {"op": "description", "ip": ...}
+- {"op": "describe", "ip": ..., "description": ..., "delegated": false}
+- {"op": "delete", "ip": ..., "cascade": false}
+
+Responses have either a "result" member, with the value returned by the
+AddressSpace method of same name, or an "error" member, with "type" and
+"message" of the raised exception.
+
+Lookups of every connection arriving in the same event loop iteration
+are answered by a single description_many call.  Mutations first answer
+pending lookups, so requests are applied in arrival order.
+
+Usage:
+    python -m pppipam.server [--host HOST] [--port PORT | --unix PATH]
+                             [--load DUMP | --snapshot PATH]
+"""
+
+import argparse
+import asyncio
+import json
+import typing
+
+from .pppipam import AddressSpace
+
+
+OPERATIONS = ("description", "describe", "delete")
+
+
+def _error(error: Exception) -> typing.Dict[str, str]:
+    """Returns response error member of an exception."""
+    return {"type": type(error).__name__, "message": str(error)}
+
+
+class LookupServer:
+    """Serves an address space to line-delimited JSON clients.
+
+    doctest example:
+        >>> async def demo():
+        ...     server = LookupServer(AddressSpace(strict_=False))
+        ...     listener = await server.start_tcp("127.0.0.1", 0)
+        ...     port = listener.sockets[0].getsockname()[1]
+        ...     reader, writer = await asyncio.open_connection(
+        ...         "127.0.0.1", port)
+        ...     writer.write(
+        ...         b'{"op": "describe", "ip": "192.0.2.0/24", '
+        ...         b'"description": "TEST-NET-1"}\\n'
+        ...         b'{"id": 2, "op": "description", "ip": "192.0.2.1"}\\n')
+        ...     writer.write_eof()
+        ...     print((await reader.read()).decode().strip())
+        ...     writer.close()
+        ...     listener.close()
+        ...     await listener.wait_closed()
+        >>> asyncio.run(demo())
+        {"result": true}
+        {"id": 2, "result": ""}
+        >>>
+    """
+
+    def __init__(
+        self, address_space: AddressSpace, *, max_batch: int = 1024
+    ) -> None:
+        """Serves an address space.
+
+        Args:
+            address_space: AddressSpace, or any object with the same
+                           description_many, describe and delete
+                           methods, used only by the server.
+            max_batch: largest number of lookups per description_many.
+
+        Raises:
+            TypeError: max_batch not int.
+            ValueError: max_batch not positive.
+        """
+        if isinstance(max_batch, bool) or not isinstance(max_batch, int):
+            raise TypeError("max_batch must be int")
+        if max_batch < 1:
+            raise ValueError("max_batch must be positive")
+
+        self.__address_space = address_space
+        self.__max_batch = max_batch
+        self.__pending = list()
+
+    async def start_tcp(
+        self, host: typing.Optional[str], port: int
+    ) -> asyncio.AbstractServer:
+        """Starts listening on a TCP address.
+
+        Args:
+            host: address to bind or None for every interface.
+            port: port to bind, or 0 for any free port.
+
+        Returns:
+            started asyncio server.
+        """
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        """Starts listening on a Unix socket.
+
+        Args:
+            path: socket file path.
+
+        Returns:
+            started asyncio server.
+        """
+        return await asyncio.start_unix_server(self.handle, path)
+
+    def __lookup(self, ip_parameter: typing.Any) -> asyncio.Future:
+        """Queues a lookup for the next batch.
+
+        Args:
+            ip_parameter: IP parameter of request.
+
+        Returns:
+            future of lookup response.
+        """
+        future = asyncio.get_running_loop().create_future()
+        if not self.__pending:
+            asyncio.get_running_loop().call_soon(self.__flush)
+        self.__pending.append((ip_parameter, future))
+        if len(self.__pending) >= self.__max_batch:
+            self.__flush()
+        return future
+
+    def __flush(self) -> None:
+        """Answers every pending lookup."""
+        pending, self.__pending = self.__pending, list()
+        if not pending:
+            return
+
+        try:
+            results = [
+                {"result": description}
+                for description in self.__address_space.description_many(
+                    ip_parameter for ip_parameter, _ in pending
+                )
+            ]
+        except (TypeError, ValueError):
+            # Some parameter is invalid: answer one by one.
+            results = list()
+            for ip_parameter, _ in pending:
+                try:
+                    results.append({
+                        "result": self.__address_space.description_many(
+                            [ip_parameter]
+                        )[0]
+                    })
+                except Exception as error:
+                    results.append({"error": _error(error)})
+
+        for (_, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
+
+    def __mutate(self, request: typing.Dict[str, typing.Any]) -> dict:
+        """Applies a mutation request after pending lookups.
+
+        Args:
+            request: decoded describe or delete request.
+
+        Returns:
+            response without id.
+        """
+        self.__flush()
+        try:
+            if request["op"] == "describe":
+                result = self.__address_space.describe(
+                    ip_parameter=request.get("ip"),
+                    description=request.get("description"),
+                    is_new_delegated_net=bool(request.get("delegated")),
+                )
+            else:
+                result = self.__address_space.delete(
+                    ip_parameter=request.get("ip"),
+                    cascade=bool(request.get("cascade")),
+                )
+        except Exception as error:
+            return {"error": _error(error)}
+        return {"result": result}
+
+    def __dispatch(self, line: bytes) -> typing.Tuple[typing.Any, typing.Any]:
+        """Starts answering a request line.
+
+        Args:
+            line: request line.
+
+        Returns:
+            tuple of request id (None if missing) and either
+            a response or a future of a response.
+        """
+        try:
+            request = json.loads(line)
+        except ValueError as error:
+            return None, {"error": _error(error)}
+        if not isinstance(request, dict):
+            return None, {
+                "error": _error(ValueError("request must be an object"))
+            }
+
+        request_id = request.get("id")
+        operation = request.get("op")
+        if operation not in OPERATIONS:
+            return request_id, {
+                "error": _error(ValueError(
+                    "op must be one of " + ", ".join(OPERATIONS)
+                ))
+            }
+        if operation == "description":
+            return request_id, self.__lookup(request.get("ip"))
+        return request_id, self.__mutate(request)
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Answers requests of a connection until it is closed.
+
+        Args:
+            reader: connection stream reader.
+            writer: connection stream writer.
+        """
+        responses = asyncio.Queue()
+        sender = asyncio.ensure_future(self.__send(responses, writer))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    responses.put_nowait(self.__dispatch(line))
+        except (ConnectionError, ValueError):
+            # Connection lost or line longer than stream limit.
+            pass
+        finally:
+            responses.put_nowait(None)
+            await sender
+            writer.close()
+
+    async def __send(
+        self, responses: asyncio.Queue, writer: asyncio.StreamWriter
+    ) -> None:
+        """Writes responses of a connection in request order."""
+        while True:
+            item = await responses.get()
+            if item is None:
+                return
+            request_id, response = item
+            if isinstance(response, asyncio.Future):
+                response = await response
+            if request_id is not None:
+                response = {"id": request_id, **response}
+            writer.write(json.dumps(response).encode("utf-8") + b"\n")
+            if responses.empty():
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    return
+
+
+async def serve(
+    address_space: AddressSpace,
+    *,
+    host: typing.Optional[str] = None,
+    port: int = 8053,
+    unix: typing.Optional[str] = None,
+) -> None:
+    """Serves an address space until cancelled.
+
+    Args:
+        address_space: address space to be served.
+        host: TCP address to bind, if unix is None.
+        port: TCP port to bind, if unix is None.
+        unix: Unix socket path to bind instead of TCP.
+    """
+    server = LookupServer(address_space)
+    if unix is not None:
+        listener = await server.start_unix(unix)
+    else:
+        listener = await server.start_tcp(host, port)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        prog="python -m pppipam.server",
+        description="Serves an address space over line-delimited JSON.",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="TCP address")
+    parser.add_argument("--port", type=int, default=8053, help="TCP port")
+    parser.add_argument("--unix", help="Unix socket path, instead of TCP")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--load", help="JSON Lines file written by dump")
+    source.add_argument("--snapshot", help="snapshot file to be loaded")
+    parser.add_argument(
+        "--no-strict", action="store_true",
+        help="start a non strict empty address space",
+    )
+    args = parser.parse_args(argv)
+
+    if args.load is not None:
+        with open(args.load, encoding="utf-8") as fp:
+            address_space = AddressSpace.load(fp)
+    elif args.snapshot is not None:
+        address_space = AddressSpace.load_snapshot(args.snapshot)
+    else:
+        address_space = AddressSpace(strict_=not args.no_strict)
+
+    try:
+        asyncio.run(serve(
+            address_space, host=args.host, port=args.port, unix=args.unix
+        ))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Module with binary snapshot format functions.
+
+A snapshot is made of, in order:
+
+- header: magic bytes, format version, flags (bit 0 for strict),
+  number of records and number of strings;
+- records: one fixed size record per IP object, in tree order (as
+  AddressSpace.iter_export), so also sorted by version, first address
+  and rank; each one has IP version, rank (prefix length or 255 for
+  addresses), description string index, parent record index (-1 if
+  none) and first address as 16 big-endian bytes;
+- keys: one key per record, in the same order, with IP version, first
+  address as 16 big-endian bytes and rank, so comparing keys as bytes
+  compares records and lookups bisect keys without decoding records
+  (format version 2; version 1 snapshots have no keys);
+- string offsets: one offset per string plus the end offset, relative
+  to the start of string data;
+- string data: deduplicated UTF-8 descriptions.
+
+Integers are big-endian.
+"""
+
+import struct
+import typing
+
+
+MAGIC = b"PPPIPAM\x00"
+FORMAT_VERSION = 2
+READABLE_VERSIONS = (1, 2)
+
+HEADER = struct.Struct(">8sHB5xQQ")
+RECORD = struct.Struct(">BB2xIi16s")
+KEY = struct.Struct(">B16sB")
+OFFSET = struct.Struct(">Q")
+
+# version, rank, first address as int, description, parent index
+Record = typing.Tuple[int, int, int, str, int]
+
+
+class Layout(typing.NamedTuple):
+    """Header values and section positions of a snapshot."""
+
+    strict: bool
+    record_count: int
+    string_count: int
+    records_start: int
+    keys_start: typing.Optional[int]
+    offsets_start: int
+    strings_start: int
+
+
+def write_snapshot(
+    fp: typing.BinaryIO,
+    *,
+    strict: bool,
+    record_count: int,
+    records: typing.Iterable[Record],
+) -> None:
+    """Writes a snapshot to a seekable binary file.
+
+    Records are written as they are iterated; only their keys and the
+    deduplicated descriptions are kept until the end.
+
+    Args:
+        fp: seekable binary file open for writing, at position 0.
+        strict: address space strictness.
+        record_count: number of records.
+        records: records in tree order.
+
+    Raises:
+        ValueError: number of records differs from record_count.
+    """
+    fp.write(HEADER.pack(MAGIC, FORMAT_VERSION, bool(strict), 0, 0))
+
+    string_index = dict()
+    keys = bytearray()
+    written = 0
+    for version, rank, address, description, parent in records:
+        index = string_index.setdefault(description, len(string_index))
+        fp.write(RECORD.pack(
+            version, rank, index, parent, address.to_bytes(16, "big")
+        ))
+        keys += pack_key(version, address, rank)
+        written += 1
+
+    if written != record_count:
+        raise ValueError("number of records differs from record_count")
+    fp.write(keys)
+
+    encoded = [description.encode("utf-8") for description in string_index]
+    offset = 0
+    for data in encoded:
+        fp.write(OFFSET.pack(offset))
+        offset += len(data)
+    fp.write(OFFSET.pack(offset))
+    for data in encoded:
+        fp.write(data)
+
+    end = fp.tell()
+    fp.seek(0)
+    fp.write(HEADER.pack(
+        MAGIC, FORMAT_VERSION, bool(strict), record_count, len(encoded)
+    ))
+    fp.seek(end)
+
+
+def pack_key(version: int, address: int, rank: int) -> bytes:
+    """Encodes the key of a record.
+
+    Args:
+        version: IP version.
+        address: first address as int.
+        rank: prefix length or 255 for addresses.
+
+    Returns:
+        key bytes, ordered as records are.
+    """
+    return KEY.pack(version, address.to_bytes(16, "big"), rank)
+
+
+def read_layout(buffer: typing.Union[bytes, memoryview]) -> Layout:
+    """Reads snapshot header.
+
+    Args:
+        buffer: whole snapshot content.
+
+    Returns:
+        Layout instance.
+
+    Raises:
+        ValueError: not a supported snapshot.
+    """
+    if len(buffer) < HEADER.size:
+        raise ValueError("not a supported pppipam snapshot")
+
+    magic, version, flags, record_count, string_count = (
+        HEADER.unpack_from(buffer)
+    )
+    if magic != MAGIC or version not in READABLE_VERSIONS:
+        raise ValueError("not a supported pppipam snapshot")
+
+    records_start = HEADER.size
+    offsets_start = records_start + record_count * RECORD.size
+    keys_start = None
+    if version >= 2:
+        keys_start = offsets_start
+        offsets_start += record_count * KEY.size
+    strings_start = offsets_start + (string_count + 1) * OFFSET.size
+    if len(buffer) < strings_start:
+        raise ValueError("truncated pppipam snapshot")
+
+    return Layout(
+        bool(flags & 1),
+        record_count,
+        string_count,
+        records_start,
+        keys_start,
+        offsets_start,
+        strings_start,
+    )
+
+
+def read_string(
+    buffer: typing.Union[bytes, memoryview], layout: Layout, index: int
+) -> str:
+    """Decodes one description of a snapshot.
+
+    Args:
+        buffer: whole snapshot content.
+        layout: snapshot layout.
+        index: string index.
+
+    Returns:
+        description str.
+    """
+    start, = OFFSET.unpack_from(
+        buffer, layout.offsets_start + index * OFFSET.size
+    )
+    end, = OFFSET.unpack_from(
+        buffer, layout.offsets_start + (index + 1) * OFFSET.size
+    )
+    return str(
+        buffer[layout.strings_start + start:layout.strings_start + end],
+        "utf-8",
+    )
+
+
+def read_record(
+    buffer: typing.Union[bytes, memoryview], layout: Layout, index: int
+) -> typing.Tuple[int, int, int, int, int]:
+    """Decodes one record of a snapshot, without its description.
+
+    Args:
+        buffer: whole snapshot content.
+        layout: snapshot layout.
+        index: record index.
+
+    Returns:
+        tuple of version, rank, first address as int, description
+        string index and parent record index.
+    """
+    version, rank, string, parent, address = RECORD.unpack_from(
+        buffer, layout.records_start + index * RECORD.size
+    )
+    return version, rank, int.from_bytes(address, "big"), string, parent
+
+
+def iter_records(
+    buffer: typing.Union[bytes, memoryview], layout: Layout
+) -> typing.Iterator[Record]:
+    """Decodes every record of a snapshot.
+
+    Args:
+        buffer: whole snapshot content.
+        layout: snapshot layout.
+
+    Yields:
+        records in tree order.
+    """
+    strings = [
+        read_string(buffer, layout, index)
+        for index in range(layout.string_count)
+    ]
+    records = memoryview(buffer)[
+        layout.records_start:
+        layout.records_start + layout.record_count * RECORD.size
+    ]
+    for version, rank, string, parent, address in RECORD.iter_unpack(
+        records
+    ):
+        yield (
+            version,
+            rank,
+            int.from_bytes(address, "big"),
+            strings[string],
+            parent,
+        )
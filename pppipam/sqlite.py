@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Module with SQLite-backed address space.
+
+Every IP object is a row of ip_object table with its IP version,
+first and last addresses as 16 big-endian bytes (so BLOB comparison
+is integer comparison, for both IP versions), prefix length, rank
+(prefix length for networks, 255 for addresses), description and
+parent row id (NULL if there is no supernet).
+
+The unique (version, first, rank) index answers exact lookups,
+longest-prefix matches (one probe per candidate prefix length, in a
+single query) and subnet ranges; the (parent, version, first) index
+finds children to be moved when a network is described or deleted.
+"""
+
+import contextlib
+import functools
+import itertools
+import operator
+import os
+import sqlite3
+import typing
+from dataclasses import dataclass, InitVar
+
+from . import helpers
+from .pppipam import (
+    IPAddressTuple,
+    IPNetworkTuple,
+    IPObject,
+    IPObjectNotInSpaceError,
+    IPParameter,
+    SameDelegationAsNewError,
+    StrictSupernetError,
+    _ADDRESS_CLASS,
+    _ADDRESS_RANK,
+    _MAX_PREFIXLEN,
+    _NETWORK_CLASS,
+    _bulk_row_error,
+    _clean_described_object,
+    _nest_export,
+    _parse_rows,
+    _unpack,
+)
+
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS metadata (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ip_object (
+        id INTEGER PRIMARY KEY,
+        version INTEGER NOT NULL,
+        first BLOB NOT NULL,
+        last BLOB NOT NULL,
+        prefixlen INTEGER NOT NULL,
+        rank INTEGER NOT NULL,
+        description TEXT NOT NULL,
+        parent INTEGER REFERENCES ip_object (id)
+    )
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS ip_object_key
+    ON ip_object (version, first, rank)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ip_object_parent
+    ON ip_object (parent, version, first)
+    """,
+)
+
+_COLUMNS = "id, version, first, last, prefixlen, rank, description, parent"
+
+
+class _Row(typing.NamedTuple):
+    """ip_object row."""
+
+    id: int
+    version: int
+    first: bytes
+    last: bytes
+    prefixlen: int
+    rank: int
+    description: str
+    parent: typing.Optional[int]
+
+
+def _encode(address: int) -> bytes:
+    """Returns address as 16 big-endian bytes."""
+    return address.to_bytes(16, "big")
+
+
+@functools.lru_cache(maxsize=None)
+def _supernet_query(count: int) -> str:
+    """Returns longest-prefix match query for a number of candidates.
+
+    Candidates are (rank, first) pairs of every possible supernet;
+    each one is a probe of ip_object_key index.
+    """
+    return (
+        "WITH candidate (rank, first) AS (VALUES "
+        + ", ".join(["(?, ?)"] * count)
+        + ") SELECT "
+        + ", ".join("o." + column for column in _COLUMNS.split(", "))
+        + " FROM candidate AS c JOIN ip_object AS o"
+        " ON o.version = ? AND o.first = c.first AND o.rank = c.rank"
+        " ORDER BY o.rank DESC LIMIT 1"
+    )
+
+
+@dataclass(init=False)
+class SQLiteAddressSpace:
+    """IP addresses and networks description manager over SQLite.
+
+    Same API and semantics as AddressSpace, but IP objects are kept
+    in a SQLite database instead of memory.
+
+    doctest example:
+        >>> sas = SQLiteAddressSpace(strict_=True)
+        >>> sas.describe_new_delegated_network(
+        ...     network_parameter="192.0.2.0/24",
+        ...     description="TEST-NET-1")
+        True
+        >>> with sas.batch():
+        ...     sas.describe(ip_parameter="192.0.2.1",
+        ...                  description="TEST-NET-1 gateway")
+        ...     sas.describe(ip_parameter="192.0.2.128/25",
+        ...                  description="TEST-NET-1 upper half")
+        True
+        True
+        >>> sas.description("192.0.2.200")
+        ''
+        >>> sas.delete(ip_parameter="192.0.2.0/24", cascade=False)
+        True
+        >>> for depth, ip_object, description in sas.iter_export():
+        ...     print(depth, ip_object, description)
+        0 192.0.2.1 TEST-NET-1 gateway
+        0 192.0.2.128/25 TEST-NET-1 upper half
+        >>>
+    """
+
+    __strict: bool
+    __connection: sqlite3.Connection
+    strict_: InitVar[bool] = True
+    path: InitVar[typing.Union[str, os.PathLike]] = ":memory:"
+
+    def __init__(
+        self,
+        *,
+        strict_: bool = True,
+        path: typing.Union[str, os.PathLike] = ":memory:",
+    ) -> None:
+        """Opens, or creates, an address space database.
+
+        Args:
+            strict_: if evaluated to True, stricts address space
+                     handling by only permitting descriptions if
+                     previous delegated networks are inserted;
+                     only used if database is new.
+            path: SQLite database path; in memory by default.
+        """
+        self.__connection = sqlite3.connect(
+            os.fspath(path), isolation_level=None
+        )
+        self.__batch_depth = 0
+        with self.batch():
+            for statement in _SCHEMA:
+                self.__connection.execute(statement)
+            self.__connection.execute(
+                "INSERT OR IGNORE INTO metadata (name, value)"
+                " VALUES ('strict', ?)",
+                (int(bool(strict_)),),
+            )
+            self.__strict = bool(self.__connection.execute(
+                "SELECT value FROM metadata WHERE name = 'strict'"
+            ).fetchone()[0])
+
+    def close(self) -> None:
+        """Closes database connection."""
+        self.__connection.close()
+
+    def __enter__(self) -> "SQLiteAddressSpace":
+        return self
+
+    def __exit__(self, *exc_info: typing.Any) -> None:
+        self.close()
+
+    @contextlib.contextmanager
+    def batch(self) -> typing.Iterator[None]:
+        """Groups writes into a single transaction.
+
+        Batches can be nested; only the outermost one commits.  If an
+        error leaves the outermost batch, all its writes are rolled
+        back.
+        """
+        if self.__batch_depth == 0:
+            self.__connection.execute("BEGIN")
+        self.__batch_depth += 1
+        try:
+            yield
+        except BaseException:
+            self.__batch_depth -= 1
+            if self.__batch_depth == 0:
+                self.__connection.execute("ROLLBACK")
+            raise
+        self.__batch_depth -= 1
+        if self.__batch_depth == 0:
+            self.__connection.execute("COMMIT")
+
+    def __eq__(self, other: typing.Any) -> bool:
+        """Compares strictness and described IP objects."""
+
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        if self.__strict != other.__strict:
+            return False
+
+        missing = object()
+        return all(
+            mine == theirs
+            for mine, theirs in itertools.zip_longest(
+                self.iter_export(), other.iter_export(), fillvalue=missing
+            )
+        )
+
+    @property
+    def strict(self) -> bool:
+        """Returns strict value."""
+        return bool(self.__strict)
+
+    def __get(
+        self, version: int, address: int, rank: int
+    ) -> typing.Optional[_Row]:
+        """Retrieves row of an IP object, if described."""
+        row = self.__connection.execute(
+            "SELECT " + _COLUMNS + " FROM ip_object"
+            " WHERE version = ? AND first = ? AND rank = ?",
+            (version, _encode(address), rank),
+        ).fetchone()
+        return _Row(*row) if row is not None else None
+
+    def __get_supernet(
+        self, version: int, address: int, prefixlen: int, rank: int
+    ) -> typing.Optional[_Row]:
+        """Retrieves row of the smallest supernet of an IP object.
+
+        Args:
+            version: IP version of IP object.
+            address: first address of IP object as int.
+            prefixlen: prefix length of IP object.
+            rank: prefix length of network or _ADDRESS_RANK.
+
+        Returns:
+            network row or None.
+        """
+        max_prefixlen = _MAX_PREFIXLEN[version]
+        # An address may be covered by its own single address network.
+        count = max_prefixlen + 1 if rank == _ADDRESS_RANK else prefixlen
+        if count == 0:
+            return None
+
+        parameters = list()
+        for candidate in range(count):
+            host_bits = max_prefixlen - candidate
+            parameters.append(candidate)
+            parameters.append(_encode(address >> host_bits << host_bits))
+        parameters.append(version)
+
+        row = self.__connection.execute(
+            _supernet_query(count), parameters
+        ).fetchone()
+        return _Row(*row) if row is not None else None
+
+    def __insert(
+        self,
+        version: int,
+        address: int,
+        prefixlen: int,
+        rank: int,
+        description: str,
+        supernet: typing.Optional[_Row],
+    ) -> None:
+        """Inserts a row and moves the children it covers under it."""
+        first = _encode(address)
+        last = _encode(
+            address | ((1 << (_MAX_PREFIXLEN[version] - prefixlen)) - 1)
+        )
+        parent = supernet.id if supernet is not None else None
+
+        row_id = self.__connection.execute(
+            "INSERT INTO ip_object"
+            " (version, first, last, prefixlen, rank, description, parent)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (version, first, last, prefixlen, rank, description, parent),
+        ).lastrowid
+
+        if rank != _ADDRESS_RANK:
+            self.__connection.execute(
+                "UPDATE ip_object SET parent = ?"
+                " WHERE parent IS ? AND version = ?"
+                " AND first BETWEEN ? AND ? AND id != ?",
+                (row_id, parent, version, first, last, row_id),
+            )
+
+    def describe(
+        self,
+        *,
+        ip_parameter: IPParameter,
+        description: str,
+        is_new_delegated_net: bool = False,
+    ) -> bool:
+        """Insert an IP address or network with a description.
+
+        Same as AddressSpace.describe.
+        """
+
+        ip_object = _clean_described_object(ip_parameter, description)
+
+        is_new_delegated_net = bool(is_new_delegated_net)
+
+        if is_new_delegated_net and isinstance(ip_object, IPAddressTuple):
+            raise ValueError(
+                "is_new_delegated_net was set with address parameter"
+            )
+
+        version, address, prefixlen, rank = _unpack(ip_object)
+
+        with self.batch():
+            supernet = self.__get_supernet(version, address, prefixlen, rank)
+
+            if rank != _ADDRESS_RANK and is_new_delegated_net:
+                if supernet is not None:
+                    raise ValueError(
+                        "Invalid combination of existing supernet "
+                        "and new delegated network"
+                    )
+            elif self.__strict and supernet is None:
+                raise StrictSupernetError("supernet not found")
+
+            row = self.__get(version, address, rank)
+            if row is not None:
+                self.__connection.execute(
+                    "UPDATE ip_object SET description = ? WHERE id = ?",
+                    (description, row.id),
+                )
+            else:
+                self.__insert(
+                    version, address, prefixlen, rank, description, supernet
+                )
+
+        return True
+
+    def describe_many(
+        self,
+        rows: typing.Iterable[typing.Tuple[IPParameter, str]],
+        *,
+        delegated: typing.Optional[bool] = False,
+    ) -> typing.List[typing.Tuple[int, Exception]]:
+        """Insert many IP addresses or networks with descriptions.
+
+        Same as AddressSpace.describe_many, in a single transaction.
+        """
+
+        if delegated is not None:
+            delegated = bool(delegated)
+
+        parsed, errors = _parse_rows(rows)
+        parsed.sort(key=operator.itemgetter(0, 1, 2))
+
+        with self.batch():
+            for version, address, rank, prefixlen, description, position in (
+                parsed
+            ):
+                row = self.__get(version, address, rank)
+                supernet = self.__get_supernet(
+                    version, address, prefixlen, rank
+                )
+                error = _bulk_row_error(
+                    self.__strict, rank, supernet, row, delegated
+                )
+                if error is not None:
+                    errors.append((position, error))
+                elif row is not None:
+                    self.__connection.execute(
+                        "UPDATE ip_object SET description = ? WHERE id = ?",
+                        (description, row.id),
+                    )
+                else:
+                    self.__insert(
+                        version, address, prefixlen, rank, description,
+                        supernet,
+                    )
+
+        errors.sort(key=operator.itemgetter(0))
+
+        return errors
+
+    def describe_new_delegated_network(
+        self, *, network_parameter: helpers.IPNetworkParameter, description: str
+    ) -> bool:
+        """Describe a new delegated network, if possible.
+
+        Same as AddressSpace.describe_new_delegated_network.
+        """
+
+        if isinstance(network_parameter, int):
+            raise TypeError("network_parameter must not be int")
+
+        as_network = helpers.clean_ip_parameter(network_parameter)
+
+        if isinstance(as_network, IPAddressTuple):
+            raise ValueError("No address as parameter allowed")
+
+        if isinstance(as_network, IPNetworkTuple):
+            version, address, prefixlen, rank = _unpack(as_network)
+            if self.__get_supernet(
+                version, address, prefixlen, rank
+            ) is not None:
+                raise StrictSupernetError("supernet already described")
+            if self.__get(version, address, rank) is not None:
+                raise SameDelegationAsNewError("already described")
+        else:
+            raise TypeError("network_parameter must be "
+                            "a valid IP network parameter")
+
+        return self.describe(
+            ip_parameter=as_network,
+            description=description,
+            is_new_delegated_net=True,
+        )
+
+    def description(self, ip_parameter: IPParameter) -> typing.Optional[str]:
+        """Retrieve a description of an IP address or IP network.
+
+        Same as AddressSpace.description.
+        """
+
+        if isinstance(ip_parameter, int):
+            raise TypeError("ip_parameter must not be int")
+
+        ip_object = helpers.clean_ip_parameter(ip_parameter)
+
+        if ip_object is None:
+            raise TypeError("ip_parameter must be a valid IP parameter")
+
+        version, address, prefixlen, rank = _unpack(ip_object)
+        row = self.__get(version, address, rank)
+        if row is not None:
+            return row.description
+
+        supernet = self.__get_supernet(version, address, prefixlen, rank)
+        if supernet is not None:
+            return str("")
+
+        return None
+
+    def description_many(
+        self, ip_parameters: typing.Iterable[IPParameter]
+    ) -> typing.List[typing.Optional[str]]:
+        """Retrieve descriptions of many IP addresses or IP networks.
+
+        Same as AddressSpace.description_many.
+        """
+        return [
+            self.description(ip_parameter) for ip_parameter in ip_parameters
+        ]
+
+    def delete(self, *, ip_parameter: IPParameter, cascade: bool) -> bool:
+        """Delete only described IP object and optionally its children.
+
+        Same as AddressSpace.delete.  In cascade, the whole subtree is
+        a single range delete.
+        """
+
+        ip_object = helpers.clean_ip_parameter(ip_parameter)
+
+        if ip_object is not None:
+            version, address, prefixlen, rank = _unpack(ip_object)
+            row = self.__get(version, address, rank)
+            if row is None and rank == _ADDRESS_RANK:
+                # An address parameter also stands for its single
+                # address network.
+                row = self.__get(version, address, prefixlen)
+
+            if row is not None:
+                with self.batch():
+                    if cascade and row.rank != _ADDRESS_RANK:
+                        self.__connection.execute(
+                            "DELETE FROM ip_object WHERE version = ?"
+                            " AND first BETWEEN ? AND ? AND rank >= ?",
+                            (row.version, row.first, row.last, row.rank),
+                        )
+                    else:
+                        self.__connection.execute(
+                            "UPDATE ip_object SET parent = ?"
+                            " WHERE parent = ?",
+                            (row.parent, row.id),
+                        )
+                        self.__connection.execute(
+                            "DELETE FROM ip_object WHERE id = ?", (row.id,)
+                        )
+                return True
+
+        raise IPObjectNotInSpaceError("cannot delete undescribed IP object")
+
+    def iter_export(
+        self
+    ) -> typing.Iterator[typing.Tuple[int, IPObject, str]]:
+        """Iterates described IP objects in tree order.
+
+        Same as AddressSpace.iter_export.
+        """
+
+        stack = list()
+        for row_id, version, first, prefixlen, rank, description, parent in (
+            self.__connection.execute(
+                "SELECT id, version, first, prefixlen, rank, description,"
+                " parent FROM ip_object ORDER BY version, first, rank"
+            )
+        ):
+            while stack and stack[-1] != parent:
+                stack.pop()
+            address = int.from_bytes(first, "big")
+            if rank == _ADDRESS_RANK:
+                ip_object = _ADDRESS_CLASS[version](address)
+            else:
+                ip_object = _NETWORK_CLASS[version]((address, prefixlen))
+            yield len(stack), ip_object, description
+            if rank != _ADDRESS_RANK:
+                stack.append(row_id)
+
+    def export_data(self) -> typing.Dict[str, dict]:
+        """Exports data as dict.
+
+        Same as AddressSpace.export_data.
+        """
+        return _nest_export(self.iter_export())
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Module with address space instrumentation.
+
+Stats count calls and time spent per operation, with a latency
+histogram of power of two microsecond buckets, and counters of the work
+done inside operations:
+
+- supernet_searches: supernet lookups;
+- supernet_candidates: networks examined by supernet lookups;
+- child_rearrangements: networks inserted or removed that moved
+  children from or to their supernet;
+- children_moved: children moved by those rearrangements.
+"""
+
+import threading
+import time
+import typing
+
+
+COUNTERS = (
+    "supernet_searches",
+    "supernet_candidates",
+    "child_rearrangements",
+    "children_moved",
+)
+
+# Called after each operation with its name, duration in seconds and
+# counters incremented during it.
+Hook = typing.Callable[[str, float, typing.Dict[str, int]], typing.Any]
+
+
+class OperationStats:
+    """Calls and latencies of an operation."""
+
+    __slots__ = ("calls", "seconds", "max_seconds", "histogram")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        # Upper bound in microseconds of bucket, to number of calls.
+        self.histogram = dict()
+
+    def add(self, seconds: float) -> None:
+        """Records a call.
+
+        Args:
+            seconds: call duration.
+        """
+        self.calls += 1
+        self.seconds += seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+        bucket = 1 << int(seconds * 1e6).bit_length()
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+    def as_dict(self) -> typing.Dict[str, typing.Any]:
+        """Returns recorded values as dict."""
+        return {
+            "calls": self.calls,
+            "seconds": self.seconds,
+            "max_seconds": self.max_seconds,
+            "histogram_us": dict(sorted(self.histogram.items())),
+        }
+
+
+class Stats:
+    """Operation stats and counters of an address space.
+
+    Only the outermost instrumented operation of a call is recorded, so
+    operations calling other ones (such as describe_new_delegated_network
+    calling describe) are not counted twice.
+
+    Stats can be shared by threads, as the readers of an address space
+    guarded by ThreadSafeAddressSpace: counters are kept per thread
+    while an operation runs, then added to the totals under a lock.
+    The hook may then be called from several threads at once.
+
+    >>> stats = Stats()
+    >>> def lookup():
+    ...     stats.count("supernet_searches")
+    ...     return "found"
+    >>> stats.wrap("lookup", lookup)()
+    'found'
+    >>> stats.as_dict()["operations"]["lookup"]["calls"]
+    1
+    >>> stats.as_dict()["counters"]["supernet_searches"]
+    1
+    """
+
+    def __init__(self, hook: typing.Optional[Hook] = None) -> None:
+        """Creates empty stats.
+
+        Args:
+            hook: callable called after every recorded operation with
+                  its name, duration in seconds and dict of counters
+                  incremented during it.
+        """
+        self.hook = hook
+        self.operations = dict()
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.__lock = threading.Lock()
+        # Counters of the operation running in each thread, if any.
+        self.__running = threading.local()
+
+    def count(self, counter: str, value: int = 1) -> None:
+        """Increments a counter.
+
+        Args:
+            counter: one of COUNTERS.
+            value: increment.
+        """
+        running = getattr(self.__running, "counters", None)
+        if running is not None:
+            running[counter] += value
+            return
+        with self.__lock:
+            self.counters[counter] += value
+
+    def wrap(self, name: str, method: typing.Callable) -> typing.Callable:
+        """Returns method recording its calls as an operation.
+
+        Args:
+            name: operation name.
+            method: callable to be recorded.
+
+        Returns:
+            callable with same parameters and result as method.
+        """
+        clock = time.perf_counter
+        running = self.__running
+
+        def recorded(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+            if getattr(running, "counters", None) is not None:
+                return method(*args, **kwargs)
+            running.counters = dict.fromkeys(COUNTERS, 0)
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                seconds = clock() - start
+                counters, running.counters = running.counters, None
+                self.__record(name, seconds, counters)
+
+        recorded.__name__ = getattr(method, "__name__", name)
+        recorded.__doc__ = getattr(method, "__doc__", None)
+        return recorded
+
+    def __record(
+        self, name: str, seconds: float, counters: typing.Dict[str, int]
+    ) -> None:
+        """Records an operation call and calls hook, if any."""
+        with self.__lock:
+            if name not in self.operations:
+                self.operations[name] = OperationStats()
+            self.operations[name].add(seconds)
+            for counter, value in counters.items():
+                self.counters[counter] += value
+        if self.hook is not None:
+            self.hook(name, seconds, counters)
+
+    def as_dict(self) -> typing.Dict[str, typing.Any]:
+        """Returns recorded operations and counters as dict."""
+        with self.__lock:
+            return {
+                "operations": {
+                    name: operation.as_dict()
+                    for name, operation in sorted(self.operations.items())
+                },
+                "counters": dict(self.counters),
+            }
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Module with thread-safe address space.
+
+AddressSpace mutations update several indexes in sequence, so a reader
+running in another thread could observe a half-applied change.
+ThreadSafeAddressSpace guards an AddressSpace with a readers-writer
+lock: queries share the lock and run alongside each other, while
+mutations hold it exclusively.
+"""
+
+import contextlib
+import os
+import threading
+import typing
+
+from . import helpers
+from .pppipam import (
+    AddressSpace, AddressSpaceView, IPObject, IPParameter, Utilization
+)
+
+
+class ReadWriteLock:
+    """Readers-writer lock preferring writers.
+
+    Any number of threads may hold the lock for reading at once, and a
+    single thread may hold it for writing.  Once a writer is waiting, new
+    readers wait as well, so a steady flow of readers cannot starve
+    writers.  The lock is not reentrant: a thread holding it must not
+    acquire it again.
+
+    doctest example:
+        >>> lock = ReadWriteLock()
+        >>> with lock.read():
+        ...     with lock.read():
+        ...         "shared"
+        'shared'
+        >>> with lock.write():
+        ...     "exclusive"
+        'exclusive'
+        >>>
+    """
+
+    def __init__(self) -> None:
+        """Creates an unlocked readers-writer lock."""
+        self.__mutex = threading.Lock()
+        self.__condition = threading.Condition(self.__mutex)
+        self.__readers = 0
+        self.__writing = False
+        self.__waiting_writers = 0
+
+    def acquire_read(self) -> None:
+        """Waits until lock can be shared, then acquires it for reading."""
+        with self.__mutex:
+            while self.__writing or self.__waiting_writers:
+                self.__condition.wait()
+            self.__readers += 1
+
+    def release_read(self) -> None:
+        """Releases lock acquired for reading."""
+        with self.__mutex:
+            self.__readers -= 1
+            if not self.__readers and self.__waiting_writers:
+                self.__condition.notify_all()
+
+    def acquire_write(self) -> None:
+        """Waits until lock is free, then acquires it for writing."""
+        with self.__condition:
+            self.__waiting_writers += 1
+            try:
+                while self.__writing or self.__readers:
+                    self.__condition.wait()
+            finally:
+                self.__waiting_writers -= 1
+            self.__writing = True
+
+    def release_write(self) -> None:
+        """Releases lock acquired for writing."""
+        with self.__condition:
+            self.__writing = False
+            self.__condition.notify_all()
+
+    @contextlib.contextmanager
+    def read(self) -> typing.Iterator[None]:
+        """Holds lock for reading within a with block."""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextlib.contextmanager
+    def write(self) -> typing.Iterator[None]:
+        """Holds lock for writing within a with block."""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class ThreadSafeAddressSpace:
+    """Address space shared between threads.
+
+    Every AddressSpace query runs while holding a ReadWriteLock for
+    reading and every mutation while holding it for writing, so queries
+    only ever observe whole mutations.  iter_export holds the lock for
+    reading until its iterator is exhausted or closed; the thread
+    consuming it must not mutate the address space meanwhile.
+
+    Lookups (description, description_many and utilization) acquire
+    and release the lock explicitly rather than through read(), to
+    skip creating a generator on every call.
+
+    doctest example:
+        >>> tsas = ThreadSafeAddressSpace(strict_=False)
+        >>> tsas.describe(ip_parameter="192.0.2.0/24",
+        ...               description="TEST-NET-1")
+        True
+        >>> results = dict()
+        >>> def lookup(ip_parameter):
+        ...     results[ip_parameter] = tsas.description(ip_parameter)
+        >>> workers = [
+        ...     threading.Thread(target=lookup, args=(ip_parameter,))
+        ...     for ip_parameter in ("192.0.2.0/24", "192.0.2.1",
+        ...                          "198.51.100.1")
+        ... ]
+        >>> for worker in workers:
+        ...     worker.start()
+        >>> for worker in workers:
+        ...     worker.join()
+        >>> for ip_parameter in sorted(results):
+        ...     print(ip_parameter, repr(results[ip_parameter]))
+        192.0.2.0/24 'TEST-NET-1'
+        192.0.2.1 ''
+        198.51.100.1 None
+        >>>
+    """
+
+    def __init__(
+        self,
+        address_space: typing.Optional[AddressSpace] = None,
+        *,
+        strict_: bool = True,
+    ) -> None:
+        """Guards an address space, or a new empty one.
+
+        Args:
+            address_space: AddressSpace instance to be guarded; it must
+                           not be used directly afterwards.  If None, a
+                           new one is created.
+            strict_: strictness of a new address space; ignored if
+                     address_space is given.
+
+        Raises:
+            TypeError: address_space not an AddressSpace instance.
+        """
+        if address_space is None:
+            address_space = AddressSpace(strict_=strict_)
+        elif not isinstance(address_space, AddressSpace):
+            raise TypeError("address_space must be an AddressSpace instance")
+
+        self.__address_space = address_space
+        self.__lock = ReadWriteLock()
+
+    @classmethod
+    def load(cls, fp: typing.TextIO) -> "ThreadSafeAddressSpace":
+        """Thread-safe AddressSpace.load."""
+        return cls(AddressSpace.load(fp))
+
+    @classmethod
+    def load_snapshot(
+        cls, path: typing.Union[str, os.PathLike]
+    ) -> "ThreadSafeAddressSpace":
+        """Thread-safe AddressSpace.load_snapshot."""
+        return cls(AddressSpace.load_snapshot(path))
+
+    def __eq__(self, other: typing.Any) -> bool:
+        """Compares guarded address space with another address space."""
+        if isinstance(other, ThreadSafeAddressSpace):
+            if other is self:
+                return True
+            # Same locking order in every thread avoids deadlocks.
+            first, second = sorted((self, other), key=id)
+            with first.__lock.read(), second.__lock.read():
+                return self.__address_space == other.__address_space
+        with self.__lock.read():
+            return self.__address_space == other
+
+    @property
+    def strict(self) -> bool:
+        """Returns strict value of address space."""
+        return self.__address_space.strict
+
+    def describe(
+        self,
+        *,
+        ip_parameter: IPParameter,
+        description: str,
+        is_new_delegated_net: bool = False,
+    ) -> bool:
+        """Thread-safe AddressSpace.describe."""
+        with self.__lock.write():
+            return self.__address_space.describe(
+                ip_parameter=ip_parameter,
+                description=description,
+                is_new_delegated_net=is_new_delegated_net,
+            )
+
+    def describe_many(
+        self,
+        rows: typing.Iterable[typing.Tuple[IPParameter, str]],
+        *,
+        delegated: typing.Optional[bool] = False,
+    ) -> typing.List[typing.Tuple[int, Exception]]:
+        """Thread-safe AddressSpace.describe_many."""
+        with self.__lock.write():
+            return self.__address_space.describe_many(
+                rows, delegated=delegated
+            )
+
+    def describe_new_delegated_network(
+        self, *, network_parameter: helpers.IPNetworkParameter, description: str
+    ) -> bool:
+        """Thread-safe AddressSpace.describe_new_delegated_network."""
+        with self.__lock.write():
+            return self.__address_space.describe_new_delegated_network(
+                network_parameter=network_parameter, description=description
+            )
+
+    def allocate(
+        self,
+        parent: helpers.IPNetworkParameter,
+        prefixlen: int,
+        description: str,
+    ) -> helpers.IPNetwork:
+        """Thread-safe AddressSpace.allocate."""
+        with self.__lock.write():
+            return self.__address_space.allocate(
+                parent, prefixlen, description
+            )
+
+    def allocate_address(
+        self,
+        network: helpers.IPNetworkParameter,
+        description: str,
+        *,
+        skip_network_broadcast: bool = True,
+    ) -> helpers.IPAddress:
+        """Thread-safe AddressSpace.allocate_address."""
+        with self.__lock.write():
+            return self.__address_space.allocate_address(
+                network,
+                description,
+                skip_network_broadcast=skip_network_broadcast,
+            )
+
+    def delete(self, *, ip_parameter: IPParameter, cascade: bool) -> bool:
+        """Thread-safe AddressSpace.delete."""
+        with self.__lock.write():
+            return self.__address_space.delete(
+                ip_parameter=ip_parameter, cascade=cascade
+            )
+
+    def utilization(
+        self, network: helpers.IPNetworkParameter
+    ) -> Utilization:
+        """Thread-safe AddressSpace.utilization."""
+        self.__lock.acquire_read()
+        try:
+            return self.__address_space.utilization(network)
+        finally:
+            self.__lock.release_read()
+
+    def description(self, ip_parameter: IPParameter) -> typing.Optional[str]:
+        """Thread-safe AddressSpace.description."""
+        self.__lock.acquire_read()
+        try:
+            return self.__address_space.description(ip_parameter)
+        finally:
+            self.__lock.release_read()
+
+    def description_many(
+        self, ip_parameters: typing.Iterable[IPParameter]
+    ) -> typing.List[typing.Optional[str]]:
+        """Thread-safe AddressSpace.description_many."""
+        self.__lock.acquire_read()
+        try:
+            return self.__address_space.description_many(ip_parameters)
+        finally:
+            self.__lock.release_read()
+
+    def iter_export(
+        self
+    ) -> typing.Iterator[typing.Tuple[int, IPObject, str]]:
+        """Thread-safe AddressSpace.iter_export."""
+        with self.__lock.read():
+            yield from self.__address_space.iter_export()
+
+    def export_data(self) -> typing.Dict[str, dict]:
+        """Thread-safe AddressSpace.export_data."""
+        with self.__lock.read():
+            return self.__address_space.export_data()
+
+    def snapshot(self) -> AddressSpaceView:
+        """Thread-safe AddressSpace.snapshot.
+
+        Views need no lock, so long queries can run on one without
+        blocking mutations.
+        """
+        with self.__lock.write():
+            return self.__address_space.snapshot()
+
+    def dump(self, fp: typing.TextIO) -> None:
+        """Thread-safe AddressSpace.dump."""
+        with self.__lock.read():
+            self.__address_space.dump(fp)
+
+    def write_snapshot(self, fp: typing.BinaryIO) -> None:
+        """Thread-safe AddressSpace.write_snapshot."""
+        with self.__lock.read():
+            self.__address_space.write_snapshot(fp)
+
+    def save_snapshot(self, path: typing.Union[str, os.PathLike]) -> None:
+        """Thread-safe AddressSpace.save_snapshot."""
+        with self.__lock.read():
+            self.__address_space.save_snapshot(path)
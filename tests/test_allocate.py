@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests related to allocate methods in pppipam.AddressSpace."""
+
+import ipaddress
+import unittest
+
+from pppipam.pppipam import (
+    AddressSpace, IPObjectNotInSpaceError, NoFreeSpaceError
+)
+
+
+class AddressSpace_allocate_TestCase(unittest.TestCase):
+    """Tests related to allocate method in AddressSpace."""
+
+    def setUp(self):
+        self.address_space = AddressSpace(strict_=True)
+        self.address_space.describe_many(
+            [
+                ("2001:db8::/48", "IPv6 documentation subnet"),
+                ("198.51.100.0/24", "TEST-NET-2"),
+            ],
+            delegated=True,
+        )
+
+    def test_allocate_fills_network_in_order(self):
+        """Allocations should take consecutive free blocks."""
+        allocated = [
+            self.address_space.allocate("198.51.100.0/24", 26, str(number))
+            for number in range(4)
+        ]
+        self.assertEqual(
+            allocated,
+            list(ipaddress.ip_network("198.51.100.0/24").subnets(2)),
+        )
+        for number, network in enumerate(allocated):
+            with self.subTest(network=network):
+                self.assertEqual(
+                    self.address_space.description(network), str(number)
+                )
+        with self.assertRaises(NoFreeSpaceError):
+            self.address_space.allocate("198.51.100.0/24", 32, "full")
+
+    def test_allocate_skips_described_objects(self):
+        """Blocks overlapping described IP objects should not be taken."""
+        for ip_parameter in (
+            "198.51.100.0/27", "198.51.100.33", "198.51.100.128/26"
+        ):
+            self.address_space.describe(
+                ip_parameter=ip_parameter, description="taken"
+            )
+        for prefixlen, expected in (
+            (27, "198.51.100.64/27"),
+            (26, "198.51.100.192/26"),
+            (32, "198.51.100.32/32"),
+            (30, "198.51.100.36/30"),
+        ):
+            with self.subTest(prefixlen=prefixlen):
+                self.assertEqual(
+                    self.address_space.allocate(
+                        "198.51.100.0/24", prefixlen, "allocated"
+                    ),
+                    ipaddress.ip_network(expected),
+                )
+
+    def test_allocate_after_delete(self):
+        """Deleted IP objects should free their blocks again."""
+        first = self.address_space.allocate("2001:db8::/48", 64, "first")
+        second = self.address_space.allocate("2001:db8::/48", 64, "second")
+        self.address_space.describe(
+            ip_parameter="2001:db8::1", description="inside first"
+        )
+        self.address_space.delete(ip_parameter=first, cascade=False)
+        self.assertEqual(
+            self.address_space.allocate("2001:db8::/48", 64, "third"),
+            ipaddress.ip_network("2001:db8:0:2::/64"),
+        )
+        self.address_space.delete(ip_parameter="2001:db8::1", cascade=False)
+        self.assertEqual(
+            self.address_space.allocate("2001:db8::/48", 64, "fourth"),
+            first,
+        )
+        self.address_space.delete(ip_parameter=second, cascade=True)
+        self.assertEqual(
+            self.address_space.allocate("2001:db8::/48", 63, "fifth"),
+            ipaddress.ip_network("2001:db8:0:4::/63"),
+        )
+        self.assertEqual(
+            self.address_space.allocate("2001:db8::/48", 64, "sixth"),
+            second,
+        )
+
+    def test_allocate_invalid_parameters(self):
+        """Invalid parameters should raise as describe does."""
+        for args, error in (
+            ((123, 26, "int parent"), TypeError),
+            (("abc", 26, "invalid parent"), TypeError),
+            (("198.51.100.1", 32, "address parent"), ValueError),
+            (("192.0.2.0/24", 26, "undescribed"), IPObjectNotInSpaceError),
+            (("198.51.100.0/24", "26", "str prefixlen"), TypeError),
+            (("198.51.100.0/24", 24, "same prefixlen"), ValueError),
+            (("198.51.100.0/24", 33, "long prefixlen"), ValueError),
+            (("198.51.100.0/24", 26, ""), ValueError),
+            (("198.51.100.0/24", 26, None), TypeError),
+        ):
+            with self.subTest(args=args):
+                with self.assertRaises(error):
+                    self.address_space.allocate(*args)
+
+
+class AddressSpace_allocate_address_TestCase(unittest.TestCase):
+    """Tests related to allocate_address method in AddressSpace."""
+
+    def setUp(self):
+        self.address_space = AddressSpace(strict_=False)
+        for network in ("192.0.2.0/29", "192.0.2.8/31", "2001:db8::/126"):
+            self.address_space.describe(
+                ip_parameter=network, description="subnet"
+            )
+
+    def test_allocate_address_as_hosts(self):
+        """Allocated addresses should follow ipaddress hosts()."""
+        for network in ("192.0.2.0/29", "192.0.2.8/31", "2001:db8::/126"):
+            with self.subTest(network=network):
+                allocated = list()
+                while True:
+                    try:
+                        allocated.append(
+                            self.address_space.allocate_address(
+                                network, "host"
+                            )
+                        )
+                    except NoFreeSpaceError:
+                        break
+                self.assertEqual(
+                    allocated, list(ipaddress.ip_network(network).hosts())
+                )
+
+    def test_allocate_address_skips_described_objects(self):
+        """Described addresses and subnets should not be allocated."""
+        for ip_parameter in ("192.0.2.1", "192.0.2.2/31", "192.0.2.5"):
+            self.address_space.describe(
+                ip_parameter=ip_parameter, description="taken"
+            )
+        self.assertEqual(
+            self.address_space.allocate_address("192.0.2.0/29", "host"),
+            ipaddress.ip_address("192.0.2.4"),
+        )
+        self.assertEqual(
+            self.address_space.allocate_address("192.0.2.0/29", "host"),
+            ipaddress.ip_address("192.0.2.6"),
+        )
+        with self.assertRaises(NoFreeSpaceError):
+            self.address_space.allocate_address("192.0.2.0/29", "host")
+        self.assertEqual(
+            self.address_space.allocate_address(
+                "192.0.2.0/29", "host", skip_network_broadcast=False
+            ),
+            ipaddress.ip_address("192.0.2.0"),
+        )
+
+    def test_allocate_address_after_delete(self):
+        """Deleted addresses should be allocated again."""
+        first = self.address_space.allocate_address("192.0.2.0/29", "host")
+        self.address_space.allocate_address("192.0.2.0/29", "host")
+        self.address_space.delete(ip_parameter=first, cascade=False)
+        self.assertEqual(
+            self.address_space.allocate_address("192.0.2.0/29", "host"),
+            first,
+        )
+
+    def test_allocate_address_in_full_network(self):
+        """Last free address of an almost full network should be found."""
+        self.address_space.describe(
+            ip_parameter="10.0.0.0/20", description="large subnet"
+        )
+        self.address_space.describe_many(
+            (f"10.0.{third}.{fourth}", "host")
+            for third in range(16)
+            for fourth in range(256)
+            if (third, fourth) != (12, 100)
+        )
+        self.assertEqual(
+            self.address_space.allocate_address("10.0.0.0/20", "last"),
+            ipaddress.ip_address("10.0.12.100"),
+        )
@@ -343,7 +343,9 @@ class AddressSpace_more_data_delete_TestCase(unittest.TestCase):
                         "Deleting a described IP object should "
                         "return True.",
                     )
-                self.assertFalse(self.address_spaces[value]._AddressSpace__description)
+                self.assertFalse(
+                    self.address_spaces[value].export_data()["description"]
+                )
                 for deleted_data in (
                     *self.delegated_tuples,
                     *self.subnet_tuples,
@@ -357,3 +359,94 @@ class AddressSpace_more_data_delete_TestCase(unittest.TestCase):
                         "Description of objects in delagated should be removed,"
                         " and no subnet, so None"
                     )
+
+
+class AddressSpace_cascade_delete_TestCase(unittest.TestCase):
+    """Tests related to cascading delete of large subtrees."""
+
+    def test_cascade_delete_same_as_rebuilt(self):
+        """Cascading delete should leave the same state as rebuilding."""
+        rows = [("10.0.0.0/8", "top"), ("192.0.2.0/24", "other")]
+        for second in range(4):
+            rows.append((f"10.{second}.0.0/16", f"level 2 {second}"))
+            for third in range(4):
+                rows.append(
+                    (f"10.{second}.{third}.0/24", f"level 3 {third}")
+                )
+                for fourth in range(0, 256, 64):
+                    rows.append((
+                        f"10.{second}.{third}.{fourth}",
+                        f"address {fourth}",
+                    ))
+        for deleted in ("10.1.0.0/16", "10.2.3.0/24", "10.0.0.0/8"):
+            with self.subTest(deleted=deleted):
+                address_space = AddressSpace(strict_=False)
+                address_space.describe_many(rows)
+                address_space.allocate("10.0.0.0/8", 16, "allocated")
+                address_space.delete(ip_parameter=deleted, cascade=True)
+
+                remaining = [
+                    (ip_object, description)
+                    for _, ip_object, description
+                    in address_space.iter_export()
+                ]
+                rebuilt = AddressSpace(strict_=False)
+                rebuilt.describe_many(remaining)
+                self.assertEqual(address_space, rebuilt)
+                for ip_object, _ in remaining:
+                    if "/" in str(ip_object):
+                        self.assertEqual(
+                            address_space.utilization(ip_object),
+                            rebuilt.utilization(ip_object),
+                        )
+
+                if deleted != "10.0.0.0/8":
+                    self.assertEqual(
+                        address_space.allocate("10.0.0.0/8", 16, "next"),
+                        rebuilt.allocate("10.0.0.0/8", 16, "next"),
+                    )
+                address_space.describe(
+                    ip_parameter=deleted, description="again"
+                )
+                self.assertEqual(address_space.description(deleted), "again")
+
+    def test_non_cascade_deletes_hand_children_over(self):
+        """Children of deleted networks should belong to their supernet."""
+        networks = [
+            "10.0.0.0/8", "10.0.0.0/12", "10.0.0.0/16", "10.0.0.0/20",
+        ]
+        rows = [(network, network) for network in networks]
+        rows.extend((f"10.0.{third}.{fourth}", "host")
+                    for third in range(16) for fourth in range(1, 255, 3))
+        for order in ((1, 2), (2, 1), (3, 1, 2), (0, 3), (2, 3, 1, 0)):
+            with self.subTest(order=order):
+                address_space = AddressSpace(strict_=False)
+                address_space.describe_many(rows)
+                for index in order:
+                    address_space.delete(
+                        ip_parameter=networks[index], cascade=False
+                    )
+                    if index == 2:
+                        address_space.describe(
+                            ip_parameter="10.0.0.0/14", description="new"
+                        )
+
+                remaining = [
+                    (ip_object, description)
+                    for _, ip_object, description
+                    in address_space.iter_export()
+                ]
+                rebuilt = AddressSpace(strict_=False)
+                rebuilt.describe_many(remaining)
+                self.assertEqual(address_space, rebuilt)
+                for ip_object, _ in remaining:
+                    if "/" in str(ip_object):
+                        self.assertEqual(
+                            address_space.utilization(ip_object),
+                            rebuilt.utilization(ip_object),
+                        )
+
+                top = str(remaining[0][0])
+                address_space.delete(ip_parameter=top, cascade=True)
+                rebuilt.delete(ip_parameter=top, cascade=True)
+                self.assertEqual(address_space, rebuilt)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests related to describe_many method in pppipam.AddressSpace."""
+
+import random
+import unittest
+
+from pppipam.pppipam import (
+    AddressSpace, SameDelegationAsNewError, StrictSupernetError
+)
+
+
+class AddressSpace_describe_many_TestCase(unittest.TestCase):
+    """Tests related to describe_many method in AddressSpace."""
+
+    def setUp(self):
+        self.delegated_tuples = (
+            ("2001:db8::/32", "IPv6 documentation network space"),
+            ("203.0.113.0/24", "one of IPv4 test net"),
+            ("192.0.2.0/24", "another IPv4 test net"),
+        )
+        self.other_tuples = (
+            ("2001:db8::/48", "zeroed doc subnet"),
+            ("2001:db8:abcd::/48", "letter doc subnet"),
+            ("203.0.113.0/26", "a 1/4 test subnet"),
+            ("192.0.2.128/25", "1/2 of a test subnet"),
+            ("2001:db8:9876:5432:10::", "direct IPv6 doc address"),
+            ("2001:db8::abc", "letter address of zeroed doc subnet"),
+            ("203.0.113.0", "first address of a 1/4 test subnet"),
+            ("203.0.113.200", "direct address of a IPv4 test net"),
+            ("192.0.2.200", "200 of 1/2 of a test subnet"),
+            ("192.0.2.12", "direct address of another IPv4 test net"),
+        )
+
+    def described_one_by_one(self, strict):
+        """AddressSpace described with describe."""
+        address_space = AddressSpace(strict_=strict)
+        for network, description in self.delegated_tuples:
+            address_space.describe_new_delegated_network(
+                network_parameter=network, description=description
+            )
+        for ip_parameter, description in self.other_tuples:
+            address_space.describe(
+                ip_parameter=ip_parameter, description=description
+            )
+        return address_space
+
+    def test_describe_many_same_export_as_describe(self):
+        """Bulk description should export the same data as describe."""
+        random.seed(0)
+        for strict in (False, True):
+            with self.subTest(strict=strict):
+                rows = list(self.other_tuples)
+                random.shuffle(rows)
+                address_space = AddressSpace(strict_=strict)
+                self.assertEqual(
+                    address_space.describe_many(
+                        self.delegated_tuples, delegated=True
+                    ),
+                    [],
+                )
+                self.assertEqual(address_space.describe_many(rows), [])
+                self.assertEqual(
+                    address_space.export_data(),
+                    self.described_one_by_one(strict).export_data(),
+                )
+
+    def test_describe_many_into_non_empty_space(self):
+        """Bulk description should rearrange previous IP objects."""
+        address_space = AddressSpace(strict_=False)
+        address_space.describe_many(self.other_tuples)
+        self.assertEqual(
+            address_space.describe_many(self.delegated_tuples), []
+        )
+        self.assertEqual(
+            address_space.export_data(),
+            self.described_one_by_one(False).export_data(),
+        )
+
+    def test_describe_many_delegated_none(self):
+        """Networks without supernet should be taken as delegated."""
+        address_space = AddressSpace(strict_=True)
+        self.assertEqual(
+            address_space.describe_many(
+                (*self.other_tuples, *self.delegated_tuples), delegated=None
+            ),
+            [],
+        )
+        self.assertEqual(
+            address_space.export_data(),
+            self.described_one_by_one(True).export_data(),
+        )
+
+    def test_describe_many_reports_every_invalid_row(self):
+        """Invalid rows should be reported by position."""
+        address_space = AddressSpace(strict_=True)
+        address_space.describe_many(self.delegated_tuples, delegated=True)
+        errors = address_space.describe_many([
+            ("192.0.2.1", "valid"),
+            ("invalid IP parameter", "invalid"),
+            ("10.0.0.1", "no supernet in strict mode"),
+            ("192.0.2.2", ""),
+            (123, "int"),
+            ("192.0.2.3", None),
+            ("192.0.2.4",),
+            ("192.0.2.5", "valid too"),
+        ])
+        self.assertEqual(
+            [(position, type(error)) for position, error in errors],
+            [
+                (1, TypeError),
+                (2, StrictSupernetError),
+                (3, ValueError),
+                (4, TypeError),
+                (5, TypeError),
+                (6, ValueError),
+            ],
+        )
+        for ip_parameter in ("192.0.2.1", "192.0.2.5"):
+            with self.subTest(ip_parameter=ip_parameter):
+                self.assertTrue(address_space.description(ip_parameter))
+
+    def test_describe_many_delegated_errors(self):
+        """Delegated rows follow describe_new_delegated_network rules."""
+        address_space = AddressSpace(strict_=True)
+        address_space.describe_many(self.delegated_tuples, delegated=True)
+        errors = address_space.describe_many(
+            [
+                ("198.51.100.0/24", "new delegation"),
+                ("198.51.100.0/25", "subnet of new delegation"),
+                ("192.0.2.0/24", "already described"),
+                ("192.0.2.1", "an address"),
+            ],
+            delegated=True,
+        )
+        self.assertEqual(
+            [(position, type(error)) for position, error in errors],
+            [
+                (1, StrictSupernetError),
+                (2, SameDelegationAsNewError),
+                (3, ValueError),
+            ],
+        )
+
+    def test_describe_many_repeated_rows_keep_last_description(self):
+        """Repeated rows should behave as repeated describe calls."""
+        address_space = AddressSpace(strict_=False)
+        self.assertEqual(
+            address_space.describe_many([
+                ("10.0.0.0/8", "first"),
+                ("10.0.0.1", "first"),
+                ("10.0.0.0/8", "second"),
+                ("10.0.0.1", "second"),
+            ]),
+            [],
+        )
+        for ip_parameter in ("10.0.0.0/8", "10.0.0.1"):
+            with self.subTest(ip_parameter=ip_parameter):
+                self.assertEqual(
+                    address_space.description(ip_parameter), "second"
+                )
+        self.assertEqual(len(address_space.export_data()["description"]), 2)
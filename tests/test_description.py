@@ -267,3 +267,113 @@ class AddressSpace_description_TestCase(unittest.TestCase):
                 self.assertIs(
                     self.address_space.description(outside_network), None
                 )
+
+    def test_describe_covering_network_moves_only_covered_children(self):
+        """New network should take only children inside its range."""
+        for ip_parameter, description in (
+            ("10.0.0.0/8", "private network"),
+            ("10.1.0.0/24", "a subnet"),
+            ("10.1.1.1", "an address"),
+            ("10.2.0.1", "another address"),
+            ("2001:db8::1", "an IPv6 address"),
+        ):
+            self.address_space.describe(
+                ip_parameter=ip_parameter, description=description
+            )
+        self.address_space.describe(
+            ip_parameter="10.1.0.0/16", description="covering network"
+        )
+        nested = self.address_space.export_data()["nested_ip_objects"]
+        self.assertEqual(
+            nested[4][ipaddress.ip_network("10.0.0.0/8")],
+            {
+                ipaddress.ip_network("10.1.0.0/16"): {
+                    ipaddress.ip_network("10.1.0.0/24"): dict(),
+                    ipaddress.ip_address("10.1.1.1"): dict(),
+                },
+                ipaddress.ip_address("10.2.0.1"): dict(),
+            },
+        )
+        self.assertEqual(
+            nested[6], {ipaddress.ip_address("2001:db8::1"): dict()}
+        )
+
+    def test_describe_again_only_updates_description(self):
+        """Describing an IP object again should keep its position."""
+        for ip_parameter, description in (
+            ("10.0.0.0/8", "private network"),
+            ("10.1.0.0/16", "a subnet"),
+            ("10.1.1.1", "an address"),
+        ):
+            self.address_space.describe(
+                ip_parameter=ip_parameter, description=description
+            )
+        expected_nested = self.address_space.export_data()["nested_ip_objects"]
+        for ip_parameter in ("10.0.0.0/8", "10.1.0.0/16", "10.1.1.1"):
+            with self.subTest(ip_parameter=ip_parameter):
+                self.assertTrue(
+                    self.address_space.describe(
+                        ip_parameter=ip_parameter, description="new"
+                    )
+                )
+                self.assertEqual(
+                    self.address_space.description(ip_parameter), "new"
+                )
+                self.assertEqual(
+                    self.address_space.export_data()["nested_ip_objects"],
+                    expected_nested,
+                )
+
+
+class AddressSpace_description_many_TestCase(unittest.TestCase):
+    """Tests for description_many method."""
+
+    def setUp(self):
+        """Set up AddressSpace with nested IP objects."""
+        self.address_space = AddressSpace(strict_=False)
+        for ip_parameter, description in (
+            ("10.0.0.0/8", "private network"),
+            ("10.1.0.0/16", "a subnet"),
+            ("10.1.2.3", "an address in subnet"),
+            ("10.200.0.1", "an address in private network"),
+            ("192.0.2.1", "a top-level address"),
+            ("192.0.2.0/31", "a tiny network"),
+            ("2001:db8::/32", "IPv6 documentation network"),
+            ("2001:db8::1", "an IPv6 address"),
+        ):
+            self.address_space.describe(
+                ip_parameter=ip_parameter, description=description
+            )
+
+    def test_description_many_same_as_description(self):
+        """Results should be the same as description for each one."""
+        parameters = [
+            "10.0.0.0/8", "10.1.0.0/16", "10.1.2.3", "10.200.0.1",
+            "192.0.2.1", "192.0.2.0/31", "2001:db8::/32", "2001:db8::1",
+            "10.0.0.0", "10.255.255.255", "10.1.0.0/24", "10.0.0.0/7",
+            "11.0.0.0", "9.255.255.255", "192.0.2.0", "192.0.2.2",
+            "192.0.2.0/32", "192.0.2.0/30", "2001:db8:1::/48", "2001::",
+            "::a00:1", ipaddress.ip_address("10.1.2.3"),
+            ipaddress.ip_network("10.1.0.0/17"),
+        ]
+        self.assertEqual(
+            self.address_space.description_many(parameters),
+            [
+                self.address_space.description(parameter)
+                for parameter in parameters
+            ],
+        )
+
+    def test_description_many_empty_space(self):
+        """Nothing described should return None for every parameter."""
+        self.assertEqual(
+            AddressSpace().description_many(["10.0.0.1", "::/0"]),
+            [None, None],
+        )
+
+    def test_description_many_invalid_parameter_typeerror(self):
+        """Invalid parameters should raise TypeError as description."""
+        for invalid in (None, "abc", 123):
+            with self.subTest(invalid=invalid):
+                with self.assertRaises(TypeError):
+                    self.address_space.description_many(["10.0.0.1", invalid])
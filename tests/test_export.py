@@ -64,7 +64,10 @@ class AddressSpace_default_export_TestCase(unittest.TestCase):
         """Exported description should be the same as instance's."""
         self.assertEqual(
             self.exported_data["description"],
-            self.address_space._AddressSpace__description,
+            {
+                node.ip_object(): node.description
+                for node in self.address_space._AddressSpace__nodes.values()
+            },
             "Exported description should be the same as instance's.",
         )
 
@@ -72,10 +75,12 @@ class AddressSpace_default_export_TestCase(unittest.TestCase):
         """Nested IP object keys validation."""
         self.assertEqual(
             set(self.exported_data["nested_ip_objects"]),
-            set(self.address_space._AddressSpace__networks)
-            .union(set(self.address_space._AddressSpace__addresses)),
+            {
+                node.version
+                for node in self.address_space._AddressSpace__nodes.values()
+            },
             "Exported nested IP object should have the same keys as "
-            "union of networks and address keys."
+            "versions of described IP objects."
         )
 
 class AddressSpace_more_data_export_TestCase(unittest.TestCase):
@@ -278,9 +283,11 @@ class AddressSpace_more_data_export_TestCase(unittest.TestCase):
         """Exported description should be the same as instance's."""
         for value in self.address_spaces:
             with self.subTest(value=value):
+                nodes = self.address_spaces[value]._AddressSpace__nodes
                 self.assertEqual(
                     self.exported_data[value]["description"],
-                    self.address_spaces[value]._AddressSpace__description,
+                    {node.ip_object(): node.description
+                     for node in nodes.values()},
                     "Exported description should be the same as instance's.",
                 )
 
@@ -288,17 +295,12 @@ class AddressSpace_more_data_export_TestCase(unittest.TestCase):
         """Nested IP object keys validation."""
         for value in self.address_spaces:
             with self.subTest(value=value):
-                network_keys = set(
-                    self.address_spaces[value]._AddressSpace__networks
-                )
-                address_keys = set(
-                    self.address_spaces[value]._AddressSpace__addresses
-                )
+                nodes = self.address_spaces[value]._AddressSpace__nodes
                 self.assertEqual(
                     set(self.exported_data[value]["nested_ip_objects"]),
-                    network_keys.union(address_keys),
+                    {node.version for node in nodes.values()},
                     "Exported nested IP object should have the same keys as "
-                    "union of networks and address keys."
+                    "versions of described IP objects."
                 )
 
     def test_more_data_export(self):
@@ -311,3 +313,67 @@ class AddressSpace_more_data_export_TestCase(unittest.TestCase):
                     self.expected,
                     "exported description data should match",
                 )
+
+
+class AddressSpace_iter_export_TestCase(unittest.TestCase):
+    """Tests related to AddressSpace's streaming export."""
+
+    def setUp(self):
+        self.address_space = AddressSpace(strict_=False)
+        for ip_parameter, description in (
+            ("2001:db8::/32", "IPv6 documentation network space"),
+            ("2001:db8:abcd::/48", "letter doc subnet"),
+            ("2001:db8::/48", "zeroed doc subnet"),
+            ("2001:db8::abc", "letter address of zeroed doc subnet"),
+            ("203.0.113.0/24", "one of IPv4 test net"),
+            ("203.0.113.200", "direct address of a IPv4 test net"),
+            ("203.0.113.0/26", "a 1/4 test subnet"),
+            ("192.0.2.12", "address without supernet"),
+        ):
+            self.address_space.describe(
+                ip_parameter=ip_parameter, description=description
+            )
+
+    def test_iter_export_empty_space(self):
+        """Default instance should yield nothing."""
+        self.assertEqual(list(AddressSpace().iter_export()), [])
+
+    def test_iter_export_tree_order(self):
+        """IP objects should be yielded in tree order with depth."""
+        self.assertEqual(
+            [
+                (depth, str(ip_object))
+                for depth, ip_object, _ in self.address_space.iter_export()
+            ],
+            [
+                (0, "192.0.2.12"),
+                (0, "203.0.113.0/24"),
+                (1, "203.0.113.0/26"),
+                (1, "203.0.113.200"),
+                (0, "2001:db8::/32"),
+                (1, "2001:db8::/48"),
+                (2, "2001:db8::abc"),
+                (1, "2001:db8:abcd::/48"),
+            ],
+        )
+
+    def test_iter_export_same_descriptions_as_export_data(self):
+        """Yielded descriptions should match export_data's."""
+        self.assertEqual(
+            {
+                ip_object: description
+                for _, ip_object, description
+                in self.address_space.iter_export()
+            },
+            self.address_space.export_data()["description"],
+        )
+
+    def test_iter_export_is_lazy(self):
+        """Iterator should yield before traversing whole space."""
+        iterator = self.address_space.iter_export()
+        depth, ip_object, description = next(iterator)
+        self.assertEqual(
+            (depth, ip_object, description),
+            (0, ipaddress.ip_address("192.0.2.12"),
+             "address without supernet"),
+        )
@@ -5,8 +5,10 @@
 
 import ipaddress
 import unittest
+from unittest import mock
 
-from pppipam.helpers import clean_address, clean_network
+from pppipam import helpers
+from pppipam.helpers import clean_address, clean_ip_parameter, clean_network
 
 
 class clean_address_TestCase(unittest.TestCase):
@@ -125,3 +127,99 @@ class clean_network_TestCase(unittest.TestCase):
                     clean_network(ipaddress.IPv6Network(ipv6_str)),
                     ipaddress.IPv6Network(ipv6_str),
                 )
+
+
+class clean_ip_parameter_TestCase(unittest.TestCase):
+    """Tests for clean_ip_parameter."""
+
+    def setUp(self):
+        helpers.parse_failures.clear()
+
+    def test_clean_ip_parameter_same_as_address_then_network(self):
+        """Result should be the same as clean_address then clean_network."""
+        for parameter in (
+            "192.0.2.1",
+            "2001:db8::f00",
+            "::",
+            "10.0.0.0/16",
+            "192.0.2.1/32",
+            "fe80::/64",
+            ipaddress.ip_address("203.0.113.128"),
+            ipaddress.ip_network("0.0.0.0/0"),
+            b"\xc0\x00\x02\x01",
+        ):
+            with self.subTest(parameter=parameter):
+                expected = clean_address(parameter)
+                if expected is None:
+                    expected = clean_network(parameter)
+                self.assertEqual(clean_ip_parameter(parameter), expected)
+                self.assertIs(
+                    type(clean_ip_parameter(parameter)), type(expected)
+                )
+        self.assertFalse(helpers.parse_failures)
+
+    def test_clean_ip_parameter_invalid_counted_not_logged(self):
+        """Invalid parameters should be counted and not logged."""
+        with mock.patch.object(helpers.logging, "info") as logging_info:
+            for invalid in ("", "address", "192.0.2.256", "192.0.2.1/8"):
+                with self.subTest(invalid=invalid):
+                    self.assertIsNone(clean_ip_parameter(invalid))
+        logging_info.assert_not_called()
+        self.assertEqual(helpers.parse_failures["address"], 3)
+        self.assertEqual(helpers.parse_failures["network"], 1)
+
+    def test_clean_ip_parameter_opt_in_logging(self):
+        """Invalid parameters should be logged if enabled."""
+        helpers.log_parse_failures = True
+        try:
+            with self.assertLogs(level="INFO"):
+                self.assertIsNone(clean_ip_parameter("address"))
+        finally:
+            helpers.log_parse_failures = False
+
+
+class parameter_cache_TestCase(unittest.TestCase):
+    """Tests for parsed str parameter cache."""
+
+    def setUp(self):
+        helpers.configure_parameter_cache(2)
+
+    def tearDown(self):
+        helpers.configure_parameter_cache(0)
+
+    def test_parameter_cache_hits_and_misses(self):
+        """Repeated str parameters should be cache hits."""
+        for parameter in ("192.0.2.1", "192.0.2.1", "10.0.0.0/8", "x", "x"):
+            clean_ip_parameter(parameter)
+        info = helpers.parameter_cache_info()
+        self.assertEqual((info.hits, info.misses), (2, 3))
+        self.assertEqual(info.currsize, 2)
+
+    def test_parameter_cache_same_results(self):
+        """Cached results should be the same as uncached ones."""
+        for parameter in ("192.0.2.1", "fe80::/64", "invalid", "192.0.2.1"):
+            with self.subTest(parameter=parameter):
+                cached = clean_ip_parameter(parameter)
+                helpers.configure_parameter_cache(0)
+                self.assertEqual(cached, clean_ip_parameter(parameter))
+                helpers.configure_parameter_cache(2)
+
+    def test_parameter_cache_ignores_ip_objects(self):
+        """IP objects should not go through cache."""
+        clean_ip_parameter(ipaddress.ip_address("192.0.2.1"))
+        info = helpers.parameter_cache_info()
+        self.assertEqual((info.hits, info.misses), (0, 0))
+
+    def test_parameter_cache_disabled(self):
+        """Disabled cache has no statistics."""
+        helpers.configure_parameter_cache(0)
+        self.assertIsNone(helpers.parameter_cache_info())
+
+    def test_parameter_cache_invalid_maxsize(self):
+        """maxsize should be a non-negative int."""
+        with self.assertRaises(ValueError):
+            helpers.configure_parameter_cache(-1)
+        for maxsize in (None, 1.5, True):
+            with self.subTest(maxsize=maxsize):
+                with self.assertRaises(TypeError):
+                    helpers.configure_parameter_cache(maxsize)
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests for index structures of `pppipam` package."""
+
+import ipaddress
+import random
+import unittest
+
+from pppipam.index import ChildIndex, PersistentRadixTree, RadixTree
+
+
+class RadixTree_TestCase(unittest.TestCase):
+    """Tests for RadixTree."""
+
+    def setUp(self):
+        self.networks = [
+            ipaddress.ip_network(network)
+            for network in (
+                "0.0.0.0/0",
+                "10.0.0.0/8",
+                "10.0.0.0/16",
+                "10.0.0.0/24",
+                "10.0.0.0/32",
+                "10.128.0.0/9",
+                "10.128.64.0/18",
+                "192.0.2.0/24",
+                "192.0.2.128/25",
+                "192.0.2.64/26",
+                "203.0.113.0/24",
+            )
+        ]
+
+    def brute_force_supernet(self, networks, address):
+        """Longest matching network by linear scan."""
+        matches = [network for network in networks if address in network]
+        if not matches:
+            return None
+        return max(matches, key=lambda network: network.prefixlen)
+
+    def test_radix_tree_empty_lookup(self):
+        """Empty tree has no match."""
+        tree = RadixTree(32)
+        self.assertIsNone(tree.longest_match(0, 32))
+        self.assertEqual(len(tree), 0)
+
+    def test_radix_tree_longest_match_same_as_linear_scan(self):
+        """Longest match should be the same as a linear scan."""
+        random.seed(0)
+        tree = RadixTree(32)
+        for network in self.networks:
+            tree.insert(
+                int(network.network_address), network.prefixlen, network
+            )
+        self.assertEqual(len(tree), len(self.networks))
+        candidates = [network.network_address for network in self.networks]
+        candidates.extend(
+            ipaddress.IPv4Address(random.getrandbits(32)) for _ in range(200)
+        )
+        for address in candidates:
+            with self.subTest(address=address):
+                self.assertEqual(
+                    tree.longest_match(int(address), 32),
+                    self.brute_force_supernet(self.networks, address),
+                )
+
+    def test_radix_tree_remove_keeps_other_entries(self):
+        """Removing entries in any order keeps remaining ones reachable."""
+        random.seed(1)
+        for _ in range(20):
+            tree = RadixTree(32)
+            for network in self.networks:
+                tree.insert(
+                    int(network.network_address), network.prefixlen, network
+                )
+            remaining = list(self.networks)
+            random.shuffle(remaining)
+            while remaining:
+                removed = remaining.pop()
+                self.assertEqual(
+                    tree.remove(
+                        int(removed.network_address), removed.prefixlen
+                    ),
+                    removed,
+                )
+                for network in self.networks:
+                    address = network.network_address
+                    self.assertEqual(
+                        tree.longest_match(int(address), 32),
+                        self.brute_force_supernet(remaining, address),
+                    )
+            self.assertEqual(len(tree), 0)
+
+    def test_radix_tree_remove_missing_entry_raises_key_error(self):
+        """Removing an entry not in tree should raise KeyError."""
+        tree = RadixTree(32)
+        tree.insert(0x0A000000, 8, "10.0.0.0/8")
+        for key, prefixlen in ((0x0A000000, 16), (0x0B000000, 8), (0, 0)):
+            with self.subTest(key=key, prefixlen=prefixlen):
+                with self.assertRaises(KeyError):
+                    tree.remove(key, prefixlen)
+
+    def test_radix_tree_remove_covered(self):
+        """Removing a prefix should remove every entry inside it."""
+        for prefix in self.networks:
+            with self.subTest(prefix=prefix):
+                tree = RadixTree(32)
+                for network in self.networks:
+                    tree.insert(
+                        int(network.network_address),
+                        network.prefixlen,
+                        network,
+                    )
+                remaining = [
+                    network for network in self.networks
+                    if not network.subnet_of(prefix)
+                ]
+                self.assertEqual(
+                    tree.remove_covered(
+                        int(prefix.network_address), prefix.prefixlen
+                    ),
+                    len(self.networks) - len(remaining),
+                )
+                self.assertEqual(len(tree), len(remaining))
+                for network in self.networks:
+                    address = network.network_address
+                    self.assertEqual(
+                        tree.longest_match(int(address), 32),
+                        self.brute_force_supernet(remaining, address),
+                    )
+                self.assertEqual(tree.remove_covered(0x0B000000, 8), 0)
+
+    def test_radix_tree_ipv6_width(self):
+        """Tree should handle IPv6 width keys."""
+        tree = RadixTree(128)
+        network = ipaddress.ip_network("2001:db8::/32")
+        tree.insert(int(network.network_address), 32, network)
+        address = ipaddress.ip_address("2001:db8::1")
+        self.assertEqual(tree.longest_match(int(address), 128), network)
+        self.assertIsNone(tree.longest_match(int(address), 31))
+
+
+class PersistentRadixTree_TestCase(unittest.TestCase):
+    """Tests for PersistentRadixTree."""
+
+    def test_frozen_trees_keep_their_entries(self):
+        """Frozen trees should keep entries of their time."""
+        random.seed(1)
+        tree = PersistentRadixTree(32)
+        entries = dict()
+        frozen = list()
+        for step in range(2000):
+            prefixlen = random.randint(0, 32)
+            key = random.getrandbits(prefixlen) << (32 - prefixlen)
+            if (key, prefixlen) in entries and random.random() < 0.5:
+                self.assertEqual(
+                    tree.remove(key, prefixlen), entries.pop((key, prefixlen))
+                )
+            else:
+                tree.insert(key, prefixlen, step)
+                entries[key, prefixlen] = step
+            if step % 100 == 0:
+                frozen.append((tree.freeze(), dict(entries)))
+        frozen.append((tree, entries))
+        for tree, entries in frozen:
+            self.assertEqual(len(tree), len(entries))
+            self.assertEqual(
+                [(key, prefixlen) for key, prefixlen, _ in tree.items()],
+                sorted(entries),
+            )
+            for (key, prefixlen), value in entries.items():
+                self.assertEqual(tree.get(key, prefixlen), value)
+
+    def test_remove_covered_keeps_frozen_entries(self):
+        """Removing a prefix should not change frozen trees."""
+        random.seed(2)
+        tree = PersistentRadixTree(32)
+        entries = dict()
+        for step in range(500):
+            prefixlen = random.randint(0, 32)
+            key = random.getrandbits(prefixlen) << (32 - prefixlen)
+            tree.insert(key, prefixlen, step)
+            entries[key, prefixlen] = step
+        frozen = tree.freeze()
+        before = list(frozen.items())
+        for prefixlen in (24, 8, 4):
+            key = random.getrandbits(prefixlen) << (32 - prefixlen)
+            covered = [
+                entry for entry in entries
+                if entry[1] >= prefixlen
+                and entry[0] >> (32 - prefixlen) == key >> (32 - prefixlen)
+            ]
+            self.assertEqual(
+                tree.remove_covered(key, prefixlen), len(covered)
+            )
+            for entry in covered:
+                del entries[entry]
+            self.assertEqual(len(tree), len(entries))
+            self.assertEqual(
+                [(key, prefixlen) for key, prefixlen, _ in tree.items()],
+                sorted(entries),
+            )
+        self.assertEqual(list(frozen.items()), before)
+        with self.assertRaises(TypeError):
+            frozen.remove_covered(0, 0)
+
+    def test_missing_entries(self):
+        """Missing entries should not be found nor removed."""
+        tree = PersistentRadixTree(32)
+        tree.insert(0x0A000000, 8, "10.0.0.0/8")
+        tree.insert(0x0A010000, 16, "10.1.0.0/16")
+        tree.insert(0x0A020000, 16, "10.2.0.0/16")
+        tree.remove(0x0A000000, 8)
+        self.assertIsNone(tree.get(0x0A000000, 8))
+        self.assertIsNone(tree.get(0x0B000000, 8))
+        for key, prefixlen in ((0x0A000000, 8), (0x0A030000, 16), (0, 0)):
+            with self.assertRaises(KeyError):
+                tree.remove(key, prefixlen)
+        self.assertEqual(len(tree), 2)
+
+
+class ChildIndex_TestCase(unittest.TestCase):
+    """Tests for ChildIndex."""
+
+    def setUp(self):
+        self.children = ChildIndex()
+        for start in (40, 10, 30, 20):
+            self.children.add(start, str(start))
+
+    def test_child_index_iterates_by_start(self):
+        """Children should be iterated by their first address."""
+        self.assertEqual(list(self.children), ["10", "20", "30", "40"])
+        self.assertEqual(len(self.children), 4)
+
+    def test_child_index_pop_range_is_inclusive(self):
+        """Children starting at both boundaries should be popped."""
+        popped = self.children.pop_range(20, 30)
+        self.assertEqual(list(popped), ["20", "30"])
+        self.assertEqual(list(self.children), ["10", "40"])
+
+    def test_child_index_pop_empty_range(self):
+        """No child in range should pop nothing."""
+        self.assertEqual(len(self.children.pop_range(11, 19)), 0)
+        self.assertEqual(len(self.children), 4)
+
+    def test_child_index_remove(self):
+        """Removing a child should keep others ordered."""
+        self.children.remove(30, "30")
+        self.assertEqual(list(self.children), ["10", "20", "40"])
+        with self.assertRaises(ValueError):
+            self.children.remove(30, "30")
+
+    def test_child_index_merge_into_gap(self):
+        """Merged children should fill the gap they belong to."""
+        other = self.children.pop_range(20, 30)
+        other.add(25, "25")
+        self.children.merge(other)
+        self.assertEqual(
+            list(self.children), ["10", "20", "25", "30", "40"]
+        )
+        self.assertEqual(len(other), 0)
+
+    def test_child_index_merge_larger_into_gap(self):
+        """Merging a larger index should keep both orders."""
+        for first, last in ((0, 5), (15, 35), (45, 50), (20, 30)):
+            with self.subTest(first=first, last=last):
+                children = ChildIndex()
+                for start in (10, 20, 30, 40):
+                    children.add(start, str(start))
+                children.pop_range(first, last)
+                other = ChildIndex()
+                for start in range(first, last + 1):
+                    if start % 10:
+                        other.add(start, str(start))
+                expected = sorted(list(children) + list(other), key=int)
+                children.merge(other)
+                self.assertEqual(list(children), expected)
+                self.assertEqual(children.starts, sorted(children.starts))
+                self.assertEqual(len(other), 0)
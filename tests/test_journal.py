@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests related to pppipam.journal.JournaledAddressSpace."""
+
+import os
+import tempfile
+import threading
+import unittest
+
+from pppipam.journal import JournaledAddressSpace
+from pppipam.pppipam import AddressSpace, IPObjectNotInSpaceError
+
+
+def describe_sample(address_space):
+    """Describes and deletes some IP objects."""
+    address_space.describe_new_delegated_network(
+        network_parameter="203.0.113.0/24", description="one of IPv4 test net"
+    )
+    address_space.describe(
+        ip_parameter="2001:db8::/32",
+        description="IPv6 documentation network space",
+        is_new_delegated_net=True,
+    )
+    address_space.describe(
+        ip_parameter="203.0.113.0/26", description="a 1/4 test subnet"
+    )
+    address_space.describe(
+        ip_parameter="203.0.113.1", description="gateway with ç"
+    )
+    address_space.describe(
+        ip_parameter="203.0.113.200", description="direct address"
+    )
+    address_space.describe(
+        ip_parameter="2001:db8::/48", description="zeroed doc subnet"
+    )
+    address_space.describe(
+        ip_parameter="2001:db8::abc", description="letter address"
+    )
+    address_space.describe(
+        ip_parameter="203.0.113.200", description="redescribed address"
+    )
+    address_space.delete(ip_parameter="203.0.113.0/26", cascade=False)
+    address_space.delete(ip_parameter="2001:db8::/48", cascade=True)
+
+
+class JournaledAddressSpace_TestCase(unittest.TestCase):
+    """Tests related to journal replay and compaction."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.directory.name
+        self.expected = AddressSpace(strict_=True)
+        describe_sample(self.expected)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_reopen_replays_journal(self):
+        """Reopened address space should have every journaled mutation."""
+        for sync in ("always", "batch", "never"):
+            with self.subTest(sync=sync):
+                path = os.path.join(self.path, sync)
+                with JournaledAddressSpace(
+                    path, sync=sync, batch_size=3
+                ) as journaled:
+                    describe_sample(journaled)
+                    self.assertEqual(
+                        journaled.export_data(), self.expected.export_data()
+                    )
+                with JournaledAddressSpace(path, strict_=False) as journaled:
+                    self.assertIs(journaled.strict, True)
+                    self.assertEqual(
+                        journaled.export_data(), self.expected.export_data()
+                    )
+                    self.assertEqual(
+                        journaled.description("203.0.113.1"), "gateway with ç"
+                    )
+
+    def test_failed_mutation_not_journaled(self):
+        """Mutations raising errors should not be replayed."""
+        with JournaledAddressSpace(self.path) as journaled:
+            describe_sample(journaled)
+            with self.assertRaises(IPObjectNotInSpaceError):
+                journaled.delete(ip_parameter="198.51.100.0/24", cascade=True)
+            with self.assertRaises(ValueError):
+                journaled.describe(ip_parameter="203.0.113.2", description="")
+        with JournaledAddressSpace(self.path) as journaled:
+            self.assertEqual(
+                journaled.export_data(), self.expected.export_data()
+            )
+
+    def test_torn_record_truncated(self):
+        """Incomplete last record should be dropped on replay."""
+        with JournaledAddressSpace(self.path) as journaled:
+            describe_sample(journaled)
+        journal_path = os.path.join(self.path, "journal.0")
+        size = os.path.getsize(journal_path)
+        with JournaledAddressSpace(self.path) as journaled:
+            journaled.describe(
+                ip_parameter="203.0.113.2", description="torn record"
+            )
+        with open(journal_path, "r+b") as fp:
+            fp.truncate(os.path.getsize(journal_path) - 3)
+
+        with JournaledAddressSpace(self.path) as journaled:
+            self.assertEqual(os.path.getsize(journal_path), size)
+            self.assertEqual(
+                journaled.export_data(), self.expected.export_data()
+            )
+            journaled.describe(
+                ip_parameter="203.0.113.3", description="after truncation"
+            )
+        with JournaledAddressSpace(self.path) as journaled:
+            self.assertEqual(
+                journaled.description("203.0.113.3"), "after truncation"
+            )
+
+    def test_compaction_folds_journal_into_snapshot(self):
+        """Compaction should leave a snapshot and a new journal."""
+        with JournaledAddressSpace(self.path) as journaled:
+            describe_sample(journaled)
+            journaled.compact(wait=True)
+            self.assertEqual(
+                sorted(os.listdir(self.path)), ["journal.1", "snapshot.1"]
+            )
+            self.assertEqual(
+                AddressSpace.load_snapshot(
+                    os.path.join(self.path, "snapshot.1")
+                ),
+                self.expected,
+            )
+            journaled.delete(ip_parameter="203.0.113.0/24", cascade=True)
+        with JournaledAddressSpace(self.path) as journaled:
+            self.assertIsNone(journaled.description("203.0.113.1"))
+            self.assertEqual(
+                journaled.description("2001:db8::/32"),
+                "IPv6 documentation network space",
+            )
+
+    def test_compaction_threshold(self):
+        """Journal growing past threshold should start a compaction."""
+        with JournaledAddressSpace(
+            self.path, strict_=False, compaction_threshold=512
+        ) as journaled:
+            for fourth in range(64):
+                journaled.describe(
+                    ip_parameter=f"192.0.2.{fourth}", description="host"
+                )
+        names = os.listdir(self.path)
+        self.assertTrue(any(name.startswith("snapshot.") for name in names))
+        with JournaledAddressSpace(self.path) as journaled:
+            self.assertIs(journaled.strict, False)
+            self.assertEqual(
+                len(journaled.export_data()["description"]), 64
+            )
+
+    def test_threshold_after_failed_compaction(self):
+        """Mutations crossing threshold should not raise old errors."""
+        journaled = JournaledAddressSpace(
+            self.path, strict_=False, compaction_threshold=256
+        )
+        # Snapshot cannot be written over a directory.
+        os.mkdir(os.path.join(self.path, "snapshot.1"))
+        journaled.compact()
+        for thread in threading.enumerate():
+            if thread.name == "pppipam-compaction":
+                thread.join()
+        for fourth in range(32):
+            self.assertTrue(journaled.describe(
+                ip_parameter=f"192.0.2.{fourth}", description="host"
+            ))
+        self.assertEqual(journaled.description("192.0.2.31"), "host")
+        with self.assertRaises(OSError):
+            journaled.close()
+
+    def test_invalid_parameters(self):
+        """Invalid options should not be accepted."""
+        for kwargs, error in (
+            ({"sync": "sometimes"}, ValueError),
+            ({"batch_size": 0}, ValueError),
+            ({"compaction_threshold": "1"}, TypeError),
+        ):
+            with self.subTest(kwargs=kwargs):
+                with self.assertRaises(error):
+                    JournaledAddressSpace(self.path, **kwargs)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests related to pppipam.mapped.MappedAddressSpace."""
+
+import ipaddress
+import os
+import tempfile
+import unittest
+
+from pppipam import snapshot
+from pppipam.mapped import MappedAddressSpace
+from pppipam.pppipam import AddressSpace
+
+from .test_persistence import build_address_space
+
+
+class MappedAddressSpace_TestCase(unittest.TestCase):
+    """Tests related to queries over a mapped snapshot."""
+
+    queries = (
+        "2001:db8::/32",
+        "2001:db8::/48",
+        "2001:db8::abc",
+        "2001:db8::abd",
+        "2001:db8::/64",
+        "2001:db8:1::/48",
+        "2001:db9::",
+        "::/0",
+        "203.0.113.0/24",
+        "203.0.113.0/26",
+        "203.0.113.0",
+        "203.0.113.1",
+        "203.0.113.200",
+        "203.0.112.0/23",
+        "192.0.2.12/32",
+        "192.0.2.12",
+        "192.0.2.13",
+        "192.0.2.0",
+        "192.0.1.255",
+        "0.0.0.0",
+        "255.255.255.255",
+        ipaddress.ip_network("192.0.2.128/25"),
+        ipaddress.ip_address("2001:db8::1"),
+    )
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "space.snapshot")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_same_description_as_address_space(self):
+        """Mapped description should match AddressSpace's."""
+        for strict in (False, True):
+            address_space = build_address_space(strict)
+            address_space.save_snapshot(self.path)
+            with MappedAddressSpace(self.path) as mapped:
+                self.assertIs(mapped.strict, strict)
+                self.assertEqual(len(mapped), 10)
+                for query in self.queries:
+                    with self.subTest(strict=strict, query=query):
+                        self.assertEqual(
+                            mapped.description(query),
+                            address_space.description(query),
+                        )
+                self.assertEqual(
+                    mapped.description_many(self.queries),
+                    address_space.description_many(self.queries),
+                )
+
+    def test_supernet(self):
+        """Supernet should be the smallest described covering network."""
+        build_address_space(False).save_snapshot(self.path)
+        with MappedAddressSpace(self.path) as mapped:
+            for query, supernet in (
+                ("2001:db8::abc", "2001:db8::/48"),
+                ("2001:db8::/48", "2001:db8::/32"),
+                ("2001:db8::/32", None),
+                ("2001:db8:1::1", "2001:db8::/32"),
+                ("203.0.113.0", "203.0.113.0/26"),
+                ("203.0.113.200", "203.0.113.0/24"),
+                ("192.0.2.12", "192.0.2.12/32"),
+                ("192.0.2.12/32", "192.0.2.0/24"),
+                ("198.51.100.1", None),
+            ):
+                with self.subTest(query=query):
+                    self.assertEqual(
+                        mapped.supernet(query),
+                        supernet and ipaddress.ip_network(supernet),
+                    )
+
+    def test_iter_export_as_address_space(self):
+        """Mapped iter_export should match AddressSpace's."""
+        address_space = build_address_space(True)
+        address_space.save_snapshot(self.path)
+        with MappedAddressSpace(self.path) as mapped:
+            self.assertEqual(
+                list(mapped.iter_export()), list(address_space.iter_export())
+            )
+
+    def test_from_buffer(self):
+        """Snapshot content in memory should be queried as mapped file."""
+        build_address_space(False).save_snapshot(self.path)
+        with open(self.path, "rb") as fp:
+            data = fp.read()
+        for buffer in (data, memoryview(bytearray(data))):
+            with self.subTest(buffer=type(buffer)):
+                mapped = MappedAddressSpace.from_buffer(buffer)
+                self.assertEqual(mapped.description("203.0.113.1"), "")
+                self.assertEqual(mapped.description("203.0.113.0/26"),
+                                 "a 1/4 test subnet")
+
+    def test_version_1_snapshot(self):
+        """Snapshots without keys should still be queried and loaded."""
+        address_space = build_address_space(False)
+        address_space.save_snapshot(self.path)
+        with open(self.path, "rb") as fp:
+            data = fp.read()
+        layout = snapshot.read_layout(data)
+        magic, _, flags, record_count, string_count = (
+            snapshot.HEADER.unpack_from(data)
+        )
+        with open(self.path, "wb") as fp:
+            fp.write(snapshot.HEADER.pack(
+                magic, 1, flags, record_count, string_count
+            ))
+            fp.write(data[layout.records_start:layout.keys_start])
+            fp.write(data[layout.offsets_start:])
+
+        with MappedAddressSpace(self.path) as mapped:
+            self.assertEqual(
+                mapped.description_many(self.queries),
+                address_space.description_many(self.queries),
+            )
+        self.assertEqual(AddressSpace.load_snapshot(self.path), address_space)
+
+    def test_empty_snapshot(self):
+        """Nothing should be described in an empty snapshot."""
+        AddressSpace(strict_=False).save_snapshot(self.path)
+        with MappedAddressSpace(self.path) as mapped:
+            self.assertEqual(len(mapped), 0)
+            self.assertIsNone(mapped.description("10.0.0.1"))
+            self.assertIsNone(mapped.supernet("10.0.0.0/8"))
+
+    def test_invalid_parameter_typeerror(self):
+        """Invalid parameters should raise as AddressSpace does."""
+        build_address_space(False).save_snapshot(self.path)
+        with MappedAddressSpace(self.path) as mapped:
+            for parameter in (None, "abc", 123):
+                with self.subTest(parameter=parameter):
+                    with self.assertRaises(TypeError):
+                        mapped.description(parameter)
+
+    def test_invalid_snapshot_valueerror(self):
+        """Files that are not snapshots should not be mapped."""
+        for content in (b"", b"not a snapshot" * 4):
+            with self.subTest(content=content):
+                with open(self.path, "wb") as fp:
+                    fp.write(content)
+                with self.assertRaises(ValueError):
+                    MappedAddressSpace(self.path)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests related to pppipam.parallel.ParallelResolver."""
+
+import ipaddress
+import io
+import os
+import random
+import tempfile
+import unittest
+
+from pppipam.mapped import MappedAddressSpace
+from pppipam.parallel import ParallelResolver, load_parallel, shared_memory
+from pppipam.pppipam import AddressSpace
+
+from .test_persistence import build_address_space
+
+
+@unittest.skipIf(shared_memory is None, "requires shared memory")
+class ParallelResolver_TestCase(unittest.TestCase):
+    """Tests related to lookups across worker processes."""
+
+    def setUp(self):
+        self.address_space = build_address_space(True)
+
+    def test_same_results_in_input_order(self):
+        """Results should match description, in input order."""
+        generator = random.Random(0)
+        ip_parameters = [
+            str(ipaddress.IPv4Address(
+                generator.choice([0xC0000200, 0xCB007100])
+                + generator.randrange(256)
+            ))
+            for _ in range(500)
+        ]
+        ip_parameters.extend(["2001:db8::abc", "2001:db8::/48", "::1"])
+        with ParallelResolver(
+            self.address_space, processes=3, chunksize=37
+        ) as resolver:
+            self.assertEqual(
+                resolver.description_many(ip_parameters),
+                self.address_space.description_many(ip_parameters),
+            )
+            self.assertEqual(resolver.description_many([]), [])
+
+    def test_snapshot_bytes_match_file(self):
+        """write_snapshot should write what mapped spaces read."""
+        buffer = io.BytesIO()
+        self.address_space.write_snapshot(buffer)
+        mapped = MappedAddressSpace.from_buffer(buffer.getvalue())
+        self.assertEqual(
+            list(mapped.iter_export()),
+            list(self.address_space.iter_export()),
+        )
+
+    def test_invalid_parameter(self):
+        """Invalid IP parameters should raise as description does."""
+        with ParallelResolver(self.address_space, processes=1) as resolver:
+            with self.assertRaises(TypeError):
+                resolver.description_many(["192.0.2.1", "invalid"])
+
+    def test_invalid_chunksize(self):
+        """chunksize should be a positive int."""
+        for chunksize, error in ((0, ValueError), (1.5, TypeError)):
+            with self.subTest(chunksize=chunksize):
+                with self.assertRaises(error):
+                    ParallelResolver(self.address_space, chunksize=chunksize)
+
+
+class load_parallel_TestCase(unittest.TestCase):
+    """Tests related to loading dumps across worker processes."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "space.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, header, lines):
+        """Writes a dump file with header and IP object lines."""
+        with open(self.path, "w", encoding="utf-8") as fp:
+            fp.write(header + "\n")
+            for line in lines:
+                fp.write(line + "\n")
+
+    def load(self):
+        """Loads dump file sequentially."""
+        with open(self.path, encoding="utf-8") as fp:
+            return AddressSpace.load(fp)
+
+    def test_same_as_load(self):
+        """Parallel load should build the same address space as load."""
+        for strict in (True, False):
+            address_space = build_address_space(strict)
+            with self.subTest(strict=strict):
+                with open(self.path, "w", encoding="utf-8") as fp:
+                    address_space.dump(fp)
+                for chunk_bytes in (1, 100, 1 << 20):
+                    self.assertEqual(
+                        load_parallel(
+                            self.path, processes=2, chunk_bytes=chunk_bytes
+                        ),
+                        address_space,
+                    )
+
+    def test_unsorted_rows_with_many_chunks(self):
+        """Shuffled rows and repeated IP objects should load as load does."""
+        generator = random.Random(3)
+        lines = list()
+        for third in range(40):
+            lines.append(
+                f'{{"ip": "10.{third}.0.0/16", "description": "net {third}"}}'
+            )
+            for _ in range(5):
+                fourth = generator.randrange(256)
+                lines.append(
+                    f'{{"ip": "10.{third}.1.{fourth}", '
+                    f'"description": "host {generator.random()}"}}'
+                )
+            lines.append("")
+        lines.append('{"ip": "2001:db8::/32", "description": "doc"}')
+        generator.shuffle(lines)
+        self.write('{"format": "pppipam", "version": 1, "strict": true}', lines)
+
+        loaded = load_parallel(self.path, processes=3, chunk_bytes=256)
+        self.assertEqual(loaded, self.load())
+        self.assertEqual(
+            loaded.utilization("10.0.0.0/16"),
+            self.load().utilization("10.0.0.0/16"),
+        )
+
+    def test_address_orphaned_by_delete(self):
+        """Addresses left without supernet by a delete should load."""
+        address_space = AddressSpace(strict_=True)
+        address_space.describe(
+            ip_parameter="10.0.0.0/8",
+            description="delegated",
+            is_new_delegated_net=True,
+        )
+        address_space.describe(ip_parameter="10.0.0.1", description="host")
+        address_space.describe(
+            ip_parameter="192.0.2.0/24",
+            description="TEST-NET-1",
+            is_new_delegated_net=True,
+        )
+        address_space.delete(ip_parameter="10.0.0.0/8", cascade=False)
+        with open(self.path, "w", encoding="utf-8") as fp:
+            address_space.dump(fp)
+        loaded = load_parallel(self.path, processes=2, chunk_bytes=1)
+        self.assertEqual(loaded, address_space)
+        self.assertEqual(loaded.description("10.0.0.1"), "host")
+
+    def test_invalid_rows_as_load(self):
+        """Invalid rows should be reported as load does."""
+        self.write('{"format": "pppipam", "version": 1, "strict": true}', [
+            '{"ip": "192.0.2.0/24", "description": "TEST-NET-1"}',
+            '{"ip": "192.0.2.1", "description": ""}',
+            '{"ip": "198.51.100.1/8", "description": "host bits set"}',
+        ])
+        with self.assertRaises(ValueError) as expected:
+            self.load()
+        with self.assertRaises(ValueError) as raised:
+            load_parallel(self.path, processes=2, chunk_bytes=1)
+        self.assertEqual(str(raised.exception), str(expected.exception))
+
+    def test_invalid_files(self):
+        """Files other than dumps should not be loaded."""
+        self.write('{"format": "other"}', [])
+        with self.assertRaises(ValueError):
+            load_parallel(self.path, processes=1)
+        self.write('{"format": "pppipam", "version": 1}', ["not json"])
+        with self.assertRaises(ValueError):
+            load_parallel(self.path, processes=1)
+        for chunk_bytes, error in ((0, ValueError), (1.0, TypeError)):
+            with self.subTest(chunk_bytes=chunk_bytes):
+                with self.assertRaises(error):
+                    load_parallel(self.path, chunk_bytes=chunk_bytes)
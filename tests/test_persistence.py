@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests related to persistence of pppipam.AddressSpace."""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from pppipam.pppipam import AddressSpace
+
+
+def build_address_space(strict):
+    """AddressSpace with nested IP objects of both versions."""
+    address_space = AddressSpace(strict_=strict)
+    address_space.describe_many(
+        [
+            ("2001:db8::/32", "IPv6 documentation network space"),
+            ("203.0.113.0/24", "one of IPv4 test net"),
+            ("192.0.2.0/24", "another IPv4 test net"),
+        ],
+        delegated=True,
+    )
+    address_space.describe_many([
+        ("2001:db8::/48", "zeroed doc subnet"),
+        ("2001:db8::abc", "letter address of zeroed doc subnet"),
+        ("203.0.113.0/26", "a 1/4 test subnet"),
+        ("203.0.113.0", "first address of a 1/4 test subnet"),
+        ("203.0.113.200", "direct address with \"quotes\" and ç"),
+        ("192.0.2.12/32", "a single address network"),
+        ("192.0.2.12", "the address of single address network"),
+    ])
+    return address_space
+
+
+class AddressSpace_dump_load_TestCase(unittest.TestCase):
+    """Tests related to dump and load methods."""
+
+    def test_dump_then_load_same_address_space(self):
+        """Loaded address space should be equal to dumped one."""
+        for strict in (False, True):
+            with self.subTest(strict=strict):
+                address_space = build_address_space(strict)
+                fp = io.StringIO()
+                address_space.dump(fp)
+                fp.seek(0)
+                loaded = AddressSpace.load(fp)
+                self.assertEqual(loaded, address_space)
+                self.assertIs(loaded.strict, strict)
+                self.assertEqual(
+                    loaded.export_data(), address_space.export_data()
+                )
+
+    def test_dump_format(self):
+        """Every line should be a JSON object."""
+        fp = io.StringIO()
+        build_address_space(True).dump(fp)
+        lines = [json.loads(line) for line in fp.getvalue().splitlines()]
+        self.assertEqual(
+            lines[0], {"format": "pppipam", "version": 1, "strict": True}
+        )
+        self.assertEqual(len(lines), 11)
+        for line in lines[1:]:
+            with self.subTest(line=line):
+                self.assertEqual(set(line), {"ip", "description"})
+
+    def test_dump_empty_address_space(self):
+        """Empty address space should dump only the header."""
+        fp = io.StringIO()
+        AddressSpace(strict_=False).dump(fp)
+        self.assertEqual(fp.getvalue().count("\n"), 1)
+        fp.seek(0)
+        self.assertEqual(AddressSpace.load(fp), AddressSpace(strict_=False))
+
+    def test_load_invalid_header_valueerror(self):
+        """Files without a supported header should not be loaded."""
+        for content in (
+            "",
+            "[]\n",
+            '{"format": "other", "version": 1}\n',
+            '{"format": "pppipam", "version": 999}\n',
+        ):
+            with self.subTest(content=content):
+                with self.assertRaises(ValueError):
+                    AddressSpace.load(io.StringIO(content))
+
+    def test_load_invalid_rows_valueerror(self):
+        """Invalid IP object lines should not be loaded."""
+        content = (
+            '{"format":"pppipam","version":1,"strict":true}\n'
+            '{"ip":"192.0.2.0/24","description":"a network"}\n'
+            '{"ip":"192.0.2.1","description":""}\n'
+        )
+        with self.assertRaises(ValueError):
+            AddressSpace.load(io.StringIO(content))
+
+    def test_load_address_orphaned_by_delete(self):
+        """Addresses left without supernet by a delete should load."""
+        address_space = AddressSpace(strict_=True)
+        address_space.describe(
+            ip_parameter="10.0.0.0/8",
+            description="delegated",
+            is_new_delegated_net=True,
+        )
+        address_space.describe(ip_parameter="10.0.0.1", description="host")
+        address_space.delete(ip_parameter="10.0.0.0/8", cascade=False)
+        fp = io.StringIO()
+        address_space.dump(fp)
+        fp.seek(0)
+        loaded = AddressSpace.load(fp)
+        self.assertEqual(loaded, address_space)
+        self.assertEqual(loaded.description("10.0.0.1"), "host")
+
+
+class AddressSpace_snapshot_TestCase(unittest.TestCase):
+    """Tests related to save_snapshot and load_snapshot methods."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "space.snapshot")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_save_then_load_same_address_space(self):
+        """Loaded address space should be equal to saved one."""
+        for strict in (False, True):
+            with self.subTest(strict=strict):
+                address_space = build_address_space(strict)
+                address_space.save_snapshot(self.path)
+                loaded = AddressSpace.load_snapshot(self.path)
+                self.assertEqual(loaded, address_space)
+                self.assertIs(loaded.strict, strict)
+                self.assertEqual(
+                    loaded.export_data(), address_space.export_data()
+                )
+                self.assertEqual(os.listdir(self.directory.name),
+                                 ["space.snapshot"])
+
+    def test_loaded_snapshot_is_usable(self):
+        """Loaded address space should keep working as described one."""
+        build_address_space(True).save_snapshot(self.path)
+        loaded = AddressSpace.load_snapshot(self.path)
+        self.assertTrue(
+            loaded.describe(
+                ip_parameter="192.0.2.0/25", description="lower half"
+            )
+        )
+        self.assertEqual(loaded.description("192.0.2.12"),
+                         "the address of single address network")
+        self.assertTrue(loaded.delete(ip_parameter="192.0.2.0/24",
+                                      cascade=True))
+        self.assertIsNone(loaded.description("192.0.2.12"))
+
+    def test_snapshot_deduplicates_descriptions(self):
+        """Repeated descriptions should be stored once."""
+        address_space = AddressSpace(strict_=False)
+        address_space.describe_many(
+            (f"10.0.{third}.{fourth}", "a rather long repeated description")
+            for third in range(4)
+            for fourth in range(256)
+        )
+        address_space.save_snapshot(self.path)
+        self.assertLess(
+            os.path.getsize(self.path),
+            len(address_space.export_data()["description"]) * 60,
+        )
+        self.assertEqual(AddressSpace.load_snapshot(self.path), address_space)
+
+    def test_load_invalid_snapshot_valueerror(self):
+        """Files that are not snapshots should not be loaded."""
+        for content in (b"", b"PPPIPAM", b"not a snapshot" * 4):
+            with self.subTest(content=content):
+                with open(self.path, "wb") as fp:
+                    fp.write(content)
+                with self.assertRaises(ValueError):
+                    AddressSpace.load_snapshot(self.path)
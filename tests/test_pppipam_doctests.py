@@ -6,11 +6,28 @@
 import doctest
 import unittest
 
-from pppipam import helpers, pppipam
+from pppipam import (
+    helpers,
+    index,
+    journal,
+    parallel,
+    pppipam,
+    server,
+    sqlite,
+    stats,
+    threadsafe,
+)
 
 
 def load_tests(loader, tests, ignore):
     """Base example provided in doctest documentation."""
     tests.addTests(doctest.DocTestSuite(helpers))
+    tests.addTests(doctest.DocTestSuite(index))
+    tests.addTests(doctest.DocTestSuite(journal))
+    tests.addTests(doctest.DocTestSuite(parallel))
     tests.addTests(doctest.DocTestSuite(pppipam))
+    tests.addTests(doctest.DocTestSuite(server))
+    tests.addTests(doctest.DocTestSuite(sqlite))
+    tests.addTests(doctest.DocTestSuite(stats))
+    tests.addTests(doctest.DocTestSuite(threadsafe))
     return tests
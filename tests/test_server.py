@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests related to pppipam.server.LookupServer."""
+
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import unittest
+
+from pppipam.pppipam import AddressSpace
+from pppipam.server import LookupServer
+
+
+class CountingAddressSpace(AddressSpace):
+    """Address space counting batches of description_many."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.batches = list()
+
+    def description_many(self, ip_parameters):
+        ip_parameters = list(ip_parameters)
+        self.batches.append(len(ip_parameters))
+        return super().description_many(ip_parameters)
+
+
+async def exchange(address, requests, *, unix=False):
+    """Sends pipelined requests and returns decoded responses."""
+    if unix:
+        reader, writer = await asyncio.open_unix_connection(address)
+    else:
+        reader, writer = await asyncio.open_connection(*address)
+    writer.write(b"".join(
+        request if isinstance(request, bytes)
+        else json.dumps(request).encode("utf-8") + b"\n"
+        for request in requests
+    ))
+    writer.write_eof()
+    data = await reader.read()
+    writer.close()
+    return [json.loads(line) for line in data.splitlines()]
+
+
+class LookupServer_TestCase(unittest.TestCase):
+    """Tests related to LookupServer."""
+
+    def setUp(self):
+        self.address_space = CountingAddressSpace(strict_=True)
+        self.address_space.describe_many(
+            [("192.0.2.0/24", "TEST-NET-1"), ("2001:db8::/32", "doc")],
+            delegated=True,
+        )
+        self.address_space.describe(
+            ip_parameter="192.0.2.1", description="gateway"
+        )
+        self.address_space.batches.clear()
+
+    def run_clients(self, clients, **kwargs):
+        """Serves address space over TCP while clients run."""
+        async def run():
+            server = LookupServer(self.address_space, **kwargs)
+            listener = await server.start_tcp("127.0.0.1", 0)
+            address = listener.sockets[0].getsockname()[:2]
+            try:
+                return await asyncio.gather(*(
+                    exchange(address, requests) for requests in clients
+                ))
+            finally:
+                listener.close()
+                await listener.wait_closed()
+        return asyncio.run(run())
+
+    def test_pipelined_responses_in_request_order(self):
+        """Responses should follow requests, with their ids."""
+        responses, = self.run_clients([[
+            {"id": 1, "op": "description", "ip": "192.0.2.1"},
+            {"id": 2, "op": "describe", "ip": "192.0.2.2",
+             "description": "host"},
+            {"id": 3, "op": "description", "ip": "192.0.2.2"},
+            {"id": "x", "op": "description", "ip": "198.51.100.1"},
+            {"op": "delete", "ip": "192.0.2.0/24", "cascade": True},
+            {"op": "description", "ip": "192.0.2.1"},
+        ]])
+        self.assertEqual(responses, [
+            {"id": 1, "result": "gateway"},
+            {"id": 2, "result": True},
+            {"id": 3, "result": "host"},
+            {"id": "x", "result": None},
+            {"result": True},
+            {"result": None},
+        ])
+
+    def test_concurrent_lookups_are_batched(self):
+        """Lookups of many connections should share batches."""
+        clients = [
+            [{"op": "description", "ip": f"192.0.2.{fourth}"}
+             for fourth in range(50)]
+            for _ in range(8)
+        ]
+        results = self.run_clients(clients)
+        for responses in results:
+            self.assertEqual(len(responses), 50)
+            self.assertEqual(responses[1], {"result": "gateway"})
+            self.assertEqual(responses[2], {"result": ""})
+        self.assertEqual(sum(self.address_space.batches), 400)
+        self.assertLess(len(self.address_space.batches), 400)
+
+    def test_max_batch(self):
+        """Batches should not exceed max_batch lookups."""
+        self.run_clients(
+            [[{"op": "description", "ip": "192.0.2.1"}] * 100],
+            max_batch=16,
+        )
+        self.assertEqual(sum(self.address_space.batches), 100)
+        self.assertLessEqual(max(self.address_space.batches), 16)
+
+    def test_errors(self):
+        """Invalid requests should only fail their own responses."""
+        responses, = self.run_clients([[
+            b"not json\n",
+            [1, 2],
+            {"id": 1, "op": "unknown"},
+            {"id": 2, "op": "description", "ip": "invalid"},
+            {"id": 3, "op": "description", "ip": "192.0.2.1"},
+            {"id": 4, "op": "describe", "ip": "10.0.0.1",
+             "description": "outside delegations"},
+            {"id": 5, "op": "delete", "ip": "10.0.0.1"},
+        ]])
+        self.assertEqual(
+            [response.get("error", {}).get("type") for response in responses],
+            [
+                "JSONDecodeError", "ValueError", "ValueError", "TypeError",
+                None, "StrictSupernetError", "IPObjectNotInSpaceError",
+            ],
+        )
+        self.assertEqual(responses[4], {"id": 3, "result": "gateway"})
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "requires Unix sockets")
+    def test_unix_socket(self):
+        """Server should also listen on Unix sockets."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "pppipam.sock")
+
+            async def run():
+                server = LookupServer(self.address_space)
+                listener = await server.start_unix(path)
+                try:
+                    return await exchange(
+                        path,
+                        [{"op": "description", "ip": "2001:db8::1"}],
+                        unix=True,
+                    )
+                finally:
+                    listener.close()
+                    await listener.wait_closed()
+
+            self.assertEqual(asyncio.run(run()), [{"result": ""}])
+
+    def test_invalid_max_batch(self):
+        """max_batch should be a positive int."""
+        for max_batch, error in ((0, ValueError), ("1", TypeError)):
+            with self.subTest(max_batch=max_batch):
+                with self.assertRaises(error):
+                    LookupServer(self.address_space, max_batch=max_batch)
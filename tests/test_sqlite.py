@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests related to pppipam.sqlite.SQLiteAddressSpace.
+
+Existing AddressSpace test cases are run again with AddressSpace
+replaced by SQLiteAddressSpace in their modules.
+"""
+
+import ipaddress
+import os
+import random
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from pppipam.pppipam import AddressSpace, StrictSupernetError
+from pppipam.sqlite import SQLiteAddressSpace
+
+from . import (
+    test_delete,
+    test_describe_many,
+    test_description,
+    test_export,
+    test_strictness,
+)
+
+
+def with_sqlite_backend(test_case, skipped=()):
+    """Subclasses an AddressSpace test case to use SQLiteAddressSpace.
+
+    Args:
+        test_case: unittest.TestCase subclass using AddressSpace name
+                   of its module.
+        skipped: names of tests inspecting AddressSpace internals.
+
+    Returns:
+        new unittest.TestCase subclass.
+    """
+    module = sys.modules[test_case.__module__]
+
+    def setUp(self):
+        patcher = mock.patch.object(module, "AddressSpace", SQLiteAddressSpace)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        test_case.setUp(self)
+
+    namespace = {"setUp": setUp}
+    for name in skipped:
+        namespace[name] = unittest.skip("inspects AddressSpace internals")(
+            getattr(test_case, name)
+        )
+
+    return type("SQLite" + test_case.__name__, (test_case,), namespace)
+
+
+SQLiteAddressSpace_delete_TestCase = with_sqlite_backend(
+    test_delete.AddressSpace_delete_TestCase
+)
+SQLiteAddressSpace_more_data_delete_TestCase = with_sqlite_backend(
+    test_delete.AddressSpace_more_data_delete_TestCase
+)
+SQLiteAddressSpace_describe_many_TestCase = with_sqlite_backend(
+    test_describe_many.AddressSpace_describe_many_TestCase
+)
+SQLiteAddressSpace_description_TestCase = with_sqlite_backend(
+    test_description.AddressSpace_description_TestCase
+)
+SQLiteAddressSpace_description_many_TestCase = with_sqlite_backend(
+    test_description.AddressSpace_description_many_TestCase
+)
+SQLiteAddressSpace_default_export_TestCase = with_sqlite_backend(
+    test_export.AddressSpace_default_export_TestCase,
+    skipped=(
+        "test_address_space_export_description_should_be_the_same",
+        "test_address_space_export_nested_ip_objects_keys",
+    ),
+)
+SQLiteAddressSpace_more_data_export_TestCase = with_sqlite_backend(
+    test_export.AddressSpace_more_data_export_TestCase,
+    skipped=(
+        "test_address_space_export_description_should_be_the_same",
+        "test_address_space_export_nested_ip_objects_keys",
+    ),
+)
+SQLiteAddressSpace_iter_export_TestCase = with_sqlite_backend(
+    test_export.AddressSpace_iter_export_TestCase
+)
+SQLiteAddressSpace_strictness_TestCase = with_sqlite_backend(
+    test_strictness.AddressSpace_strictness_TestCase
+)
+
+
+class SQLiteAddressSpace_TestCase(unittest.TestCase):
+    """Tests specific to SQLite storage."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "space.sqlite3")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_reopen_database(self):
+        """Reopened database should keep IP objects and strictness."""
+        with SQLiteAddressSpace(strict_=True, path=self.path) as sas:
+            sas.describe_new_delegated_network(
+                network_parameter="192.0.2.0/24", description="TEST-NET-1"
+            )
+            sas.describe(ip_parameter="192.0.2.1", description="gateway")
+            expected = sas.export_data()
+        with SQLiteAddressSpace(strict_=False, path=self.path) as sas:
+            self.assertIs(sas.strict, True)
+            self.assertEqual(sas.export_data(), expected)
+
+    def test_batch_rolled_back_on_error(self):
+        """Error leaving a batch should undo all its writes."""
+        with SQLiteAddressSpace(strict_=True, path=self.path) as sas:
+            with self.assertRaises(StrictSupernetError):
+                with sas.batch():
+                    sas.describe_new_delegated_network(
+                        network_parameter="192.0.2.0/24",
+                        description="TEST-NET-1",
+                    )
+                    sas.describe(
+                        ip_parameter="198.51.100.1", description="outside"
+                    )
+            self.assertIsNone(sas.description("192.0.2.0/24"))
+
+    def test_same_results_as_address_space(self):
+        """Random operations should lead to the same IP objects."""
+        generator = random.Random(13)
+        address_space = AddressSpace(strict_=False)
+        sqlite_address_space = SQLiteAddressSpace(strict_=False)
+
+        def random_parameter():
+            if generator.random() < 0.5:
+                prefixlen = generator.randrange(22, 33)
+                address = (10 << 24) | generator.getrandbits(12)
+                max_prefixlen = 32
+            else:
+                prefixlen = generator.randrange(116, 129)
+                address = (0x20010DB8 << 96) | generator.getrandbits(14)
+                max_prefixlen = 128
+            if generator.random() < 0.3:
+                return str(ipaddress.ip_address(address))
+            host_bits = max_prefixlen - prefixlen
+            return str(ipaddress.ip_network(
+                (address >> host_bits << host_bits, prefixlen)
+            ))
+
+        for step in range(400):
+            ip_parameter = random_parameter()
+            if generator.random() < 0.75:
+                for instance in (address_space, sqlite_address_space):
+                    instance.describe(
+                        ip_parameter=ip_parameter, description=str(step)
+                    )
+            else:
+                cascade = generator.random() < 0.5
+                results = list()
+                for instance in (address_space, sqlite_address_space):
+                    try:
+                        results.append(instance.delete(
+                            ip_parameter=ip_parameter, cascade=cascade
+                        ))
+                    except Exception as error:
+                        results.append(error.__class__)
+                self.assertEqual(results[0], results[1])
+
+        self.assertEqual(
+            list(sqlite_address_space.iter_export()),
+            list(address_space.iter_export()),
+        )
+        queries = [random_parameter() for _ in range(200)]
+        self.assertEqual(
+            sqlite_address_space.description_many(queries),
+            address_space.description_many(queries),
+        )
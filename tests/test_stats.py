@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests related to stats methods in pppipam.AddressSpace."""
+
+import threading
+import unittest
+
+from pppipam.pppipam import AddressSpace
+from pppipam.stats import COUNTERS
+from pppipam.threadsafe import ThreadSafeAddressSpace
+
+
+class AddressSpace_stats_TestCase(unittest.TestCase):
+    """Tests related to enable_stats, disable_stats and stats methods."""
+
+    def setUp(self):
+        self.address_space = AddressSpace(strict_=False)
+
+    def describe(self, ip_parameter, description="described"):
+        return self.address_space.describe(
+            ip_parameter=ip_parameter, description=description
+        )
+
+    def test_disabled_by_default(self):
+        """Stats should be None and methods unwrapped by default."""
+        self.assertIsNone(self.address_space.stats())
+        self.assertNotIn("describe", vars(self.address_space))
+
+    def test_enabled_counts_calls(self):
+        """Every outermost operation call should be recorded once."""
+        self.address_space.enable_stats()
+        self.describe("10.0.0.0/8")
+        self.describe("10.0.0.1")
+        self.address_space.description("10.0.0.1")
+        self.address_space.describe_new_delegated_network(
+            network_parameter="192.0.2.0/24", description="delegated"
+        )
+        operations = self.address_space.stats()["operations"]
+        self.assertEqual(operations["describe"]["calls"], 2)
+        self.assertEqual(operations["description"]["calls"], 1)
+        self.assertEqual(
+            operations["describe_new_delegated_network"]["calls"], 1
+        )
+        for operation in operations.values():
+            self.assertEqual(
+                sum(operation["histogram_us"].values()), operation["calls"]
+            )
+            self.assertGreaterEqual(
+                operation["seconds"], operation["max_seconds"]
+            )
+
+    def test_failed_calls_recorded(self):
+        """Operations raising exceptions should still be recorded."""
+        self.address_space.enable_stats()
+        with self.assertRaises(TypeError):
+            self.address_space.description("not an IP")
+        operations = self.address_space.stats()["operations"]
+        self.assertEqual(operations["description"]["calls"], 1)
+
+    def test_supernet_counters(self):
+        """Supernet searches should count covering networks examined."""
+        self.describe("10.0.0.0/8")
+        self.describe("10.1.0.0/16")
+        self.address_space.enable_stats()
+        self.address_space.description("10.1.2.3")
+        counters = self.address_space.stats()["counters"]
+        self.assertEqual(counters["supernet_searches"], 1)
+        self.assertEqual(counters["supernet_candidates"], 2)
+
+    def test_rearrangement_counters(self):
+        """Inserting and removing supernets should count moved children."""
+        self.describe("10.1.0.0/16")
+        self.describe("10.2.0.0/16")
+        self.describe("10.3.0.1")
+        self.address_space.enable_stats()
+        self.describe("10.0.0.0/8")
+        self.address_space.delete(ip_parameter="10.0.0.0/8", cascade=False)
+        counters = self.address_space.stats()["counters"]
+        self.assertEqual(counters["child_rearrangements"], 2)
+        self.assertEqual(counters["children_moved"], 6)
+
+    def test_hook(self):
+        """Hook should receive every operation with its counter deltas."""
+        calls = list()
+        self.describe("10.0.0.0/8")
+        self.address_space.enable_stats(
+            lambda name, seconds, counters: calls.append((name, counters))
+        )
+        self.address_space.description("10.0.0.1")
+        self.address_space.description("10.0.0.2")
+        self.assertEqual([name for name, _ in calls], ["description"] * 2)
+        for _, counters in calls:
+            self.assertEqual(set(counters), set(COUNTERS))
+            self.assertEqual(counters["supernet_searches"], 1)
+
+    def test_disable_restores_methods(self):
+        """Disabling stats should remove instance wrappers."""
+        self.address_space.enable_stats()
+        self.describe("10.0.0.0/8")
+        self.address_space.disable_stats()
+        self.assertIsNone(self.address_space.stats())
+        self.assertNotIn("describe", vars(self.address_space))
+        self.assertEqual(self.address_space.description("10.0.0.0/8"),
+                         "described")
+
+    def test_enable_resets(self):
+        """Enabling stats again should start from scratch."""
+        self.address_space.enable_stats()
+        self.describe("10.0.0.0/8")
+        self.address_space.enable_stats()
+        stats = self.address_space.stats()
+        self.assertEqual(stats["operations"], dict())
+        self.assertEqual(set(stats["counters"].values()), {0})
+
+    def test_stats_do_not_affect_equality(self):
+        """Address spaces with and without stats should compare equal."""
+        other = AddressSpace(strict_=False)
+        self.address_space.enable_stats()
+        self.describe("10.0.0.0/8")
+        other.describe(ip_parameter="10.0.0.0/8", description="described")
+        self.assertEqual(self.address_space, other)
+
+    def test_threads_sharing_stats(self):
+        """Concurrent readers should all be recorded, with own counters."""
+        self.describe("10.0.0.0/8")
+        self.describe("10.1.0.0/16")
+        deltas = list()
+        self.address_space.enable_stats(
+            lambda name, seconds, counters: deltas.append(counters)
+        )
+        shared = ThreadSafeAddressSpace(self.address_space)
+
+        def lookups():
+            for fourth in range(200):
+                shared.description(f"10.1.0.{fourth}")
+
+        workers = [threading.Thread(target=lookups) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        stats = self.address_space.stats()
+        self.assertEqual(stats["operations"]["description"]["calls"], 800)
+        self.assertEqual(stats["counters"]["supernet_searches"], 800)
+        self.assertEqual(stats["counters"]["supernet_candidates"], 1600)
+        self.assertEqual(len(deltas), 800)
+        for counters in deltas:
+            self.assertEqual(counters["supernet_searches"], 1)
+            self.assertEqual(counters["supernet_candidates"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
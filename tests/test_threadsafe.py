@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests related to pppipam.threadsafe module."""
+
+import threading
+import time
+import unittest
+
+from pppipam.pppipam import AddressSpace
+from pppipam.threadsafe import ReadWriteLock, ThreadSafeAddressSpace
+
+
+class ReadWriteLock_TestCase(unittest.TestCase):
+    """Tests related to ReadWriteLock."""
+
+    def test_readers_share_lock(self):
+        """Readers should hold the lock at the same time."""
+        lock = ReadWriteLock()
+        barrier = threading.Barrier(4, timeout=5)
+
+        def reader():
+            with lock.read():
+                barrier.wait()
+
+        readers = [threading.Thread(target=reader) for _ in range(4)]
+        for thread in readers:
+            thread.start()
+        for thread in readers:
+            thread.join()
+        self.assertFalse(barrier.broken)
+
+    def test_writer_excludes_readers(self):
+        """A waiting writer should run before readers arriving later."""
+        lock = ReadWriteLock()
+        events = []
+        lock.acquire_read()
+
+        def writer():
+            with lock.write():
+                events.append("write")
+
+        def reader():
+            with lock.read():
+                events.append("read")
+
+        writer_thread = threading.Thread(target=writer)
+        writer_thread.start()
+        time.sleep(0.05)
+        reader_thread = threading.Thread(target=reader)
+        reader_thread.start()
+        time.sleep(0.05)
+        self.assertEqual(events, [])
+        lock.release_read()
+        writer_thread.join()
+        reader_thread.join()
+        self.assertEqual(events, ["write", "read"])
+
+
+class ThreadSafeAddressSpace_TestCase(unittest.TestCase):
+    """Tests related to ThreadSafeAddressSpace."""
+
+    def test_same_results_as_address_space(self):
+        """Guarded address space should behave as AddressSpace."""
+        address_space = AddressSpace(strict_=True)
+        tsas = ThreadSafeAddressSpace(strict_=True)
+        for space in (address_space, tsas):
+            space.describe_new_delegated_network(
+                network_parameter="192.0.2.0/24", description="TEST-NET-1"
+            )
+            space.describe_many([("192.0.2.1", "gateway")])
+            space.allocate("192.0.2.0/24", 26, "allocated")
+            space.allocate_address("192.0.2.0/24", "host")
+        self.assertIs(tsas.strict, True)
+        self.assertEqual(tsas, address_space)
+        self.assertEqual(tsas, ThreadSafeAddressSpace(address_space))
+        self.assertEqual(tsas.export_data(), address_space.export_data())
+        self.assertEqual(
+            list(tsas.iter_export()), list(address_space.iter_export())
+        )
+        self.assertEqual(
+            tsas.utilization("192.0.2.0/24"),
+            address_space.utilization("192.0.2.0/24"),
+        )
+        self.assertEqual(
+            tsas.description_many(["192.0.2.1", "192.0.2.2", "10.0.0.1"]),
+            ["gateway", "host", None],
+        )
+        self.assertIs(
+            tsas.delete(ip_parameter="192.0.2.0/24", cascade=True), True
+        )
+        self.assertIsNone(tsas.description("192.0.2.1"))
+
+    def test_invalid_address_space(self):
+        """Only AddressSpace instances should be guarded."""
+        with self.assertRaises(TypeError):
+            ThreadSafeAddressSpace({})
+
+    def test_readers_never_see_partial_mutations(self):
+        """Concurrent readers should see each network with its hosts."""
+        tsas = ThreadSafeAddressSpace(strict_=False)
+        stop = threading.Event()
+        errors = []
+
+        def writer():
+            for third in range(200):
+                tsas.describe_many([
+                    (f"10.0.{third}.0/24", "network"),
+                    (f"10.0.{third}.1", "gateway"),
+                ])
+                tsas.delete(ip_parameter=f"10.0.{third}.0/24", cascade=True)
+            stop.set()
+
+        def reader():
+            while not stop.is_set():
+                export = tsas.export_data()["description"]
+                if len(export) % 2:
+                    errors.append(len(export))
+
+        threads = [threading.Thread(target=reader) for _ in range(4)]
+        threads.append(threading.Thread(target=writer))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(tsas.export_data()["description"], {})
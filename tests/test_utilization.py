@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests related to utilization method in pppipam.AddressSpace."""
+
+import ipaddress
+import unittest
+
+from pppipam.pppipam import AddressSpace, IPObjectNotInSpaceError
+
+
+class AddressSpace_utilization_TestCase(unittest.TestCase):
+    """Tests related to utilization method in AddressSpace."""
+
+    def setUp(self):
+        self.address_space = AddressSpace(strict_=False)
+
+    def assert_matches_walk(self):
+        """Counters should equal a full walk of described IP objects."""
+        exported = self.address_space.export_data()["description"]
+        described = [ipaddress.ip_network(key) for key in exported]
+        networks = [
+            ipaddress.ip_network(key) for key in exported if "/" in str(key)
+        ]
+        for network in networks:
+            inside = [
+                other for other in described
+                if other != network
+                and other.version == network.version
+                and other.subnet_of(network)
+            ]
+            covered = sum(
+                other.num_addresses for other in inside
+                if not any(
+                    other != bigger and other.subnet_of(bigger)
+                    for bigger in inside
+                )
+            )
+            with self.subTest(network=network):
+                self.assertEqual(
+                    tuple(self.address_space.utilization(network)[:3]),
+                    (len(inside), covered, network.num_addresses),
+                )
+
+    def test_utilization_of_empty_network(self):
+        """Network without children should be unused."""
+        self.address_space.describe(
+            ip_parameter="2001:db8::/32", description="IPv6 documentation"
+        )
+        self.assertEqual(
+            tuple(self.address_space.utilization("2001:db8::/32")),
+            (0, 0, 2 ** 96, 0.0),
+        )
+
+    def test_utilization_follows_describe_and_delete(self):
+        """Counters should match described IP objects after each change."""
+        for ip_parameter in (
+            "10.0.0.0/8", "10.0.0.1", "10.1.0.0/16", "10.1.2.3",
+            "10.0.0.0/16", "10.1.0.0/24", "10.0.0.0/9", "10.255.255.255",
+            "2001:db8::/32", "2001:db8::1", "2001:db8:1::/48",
+        ):
+            self.address_space.describe(
+                ip_parameter=ip_parameter, description=ip_parameter
+            )
+            self.assert_matches_walk()
+
+        self.assertEqual(
+            tuple(self.address_space.utilization("10.0.0.0/8")),
+            (7, 2 ** 23 + 1, 2 ** 24, (2 ** 23 + 1) * 100 / 2 ** 24),
+        )
+
+        for ip_parameter, cascade in (
+            ("10.0.0.0/9", False),
+            ("10.1.2.3", False),
+            ("10.0.0.0/16", True),
+            ("2001:db8:1::/48", False),
+        ):
+            self.address_space.delete(
+                ip_parameter=ip_parameter, cascade=cascade
+            )
+            self.assert_matches_walk()
+
+        self.assertEqual(
+            self.address_space.utilization("10.0.0.0/8").descendants, 3
+        )
+
+    def test_utilization_of_bulk_loaded_space(self):
+        """Counters should also be kept by describe_many."""
+        self.address_space.describe_many([
+            ("192.0.2.0/24", "TEST-NET-1"),
+            ("192.0.2.1", "gateway"),
+            ("192.0.2.128/25", "upper half"),
+            ("192.0.2.130", "host"),
+        ])
+        self.assert_matches_walk()
+
+    def test_utilization_of_undescribed_network(self):
+        """Only described networks have utilization."""
+        self.address_space.describe(
+            ip_parameter="192.0.2.0/24", description="TEST-NET-1"
+        )
+        with self.assertRaises(IPObjectNotInSpaceError):
+            self.address_space.utilization("192.0.2.0/25")
+        with self.assertRaises(ValueError):
+            self.address_space.utilization("192.0.2.1")
+        with self.assertRaises(TypeError):
+            self.address_space.utilization(24)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests related to snapshot views of pppipam.AddressSpace."""
+
+import ipaddress
+import random
+import unittest
+
+from pppipam.pppipam import AddressSpace
+from pppipam.threadsafe import ThreadSafeAddressSpace
+
+
+class AddressSpace_snapshot_TestCase(unittest.TestCase):
+    """Tests related to snapshot method and AddressSpaceView."""
+
+    queries = (
+        "10.0.0.0/8", "10.0.0.0/16", "10.0.0.0", "10.0.0.1", "10.0.0.1/32",
+        "10.1.0.0/16", "10.1.2.3", "10.255.0.0/16", "11.0.0.0", "0.0.0.0/0",
+        "2001:db8::/32", "2001:db8::1", "2001:db8::/48", "2001:db9::",
+        ipaddress.ip_network("10.0.0.0/24"),
+    )
+
+    def assert_same_as(self, view, address_space):
+        """View should answer as address space does."""
+        self.assertEqual(view.strict, address_space.strict)
+        self.assertEqual(
+            list(view.iter_export()), list(address_space.iter_export())
+        )
+        self.assertEqual(view.export_data(), address_space.export_data())
+        self.assertEqual(
+            view.description_many(self.queries),
+            address_space.description_many(self.queries),
+        )
+
+    def test_view_of_empty_address_space(self):
+        """Views of empty address spaces should know nothing."""
+        address_space = AddressSpace(strict_=True)
+        view = address_space.snapshot()
+        self.assert_same_as(view, address_space)
+        self.assertIsNone(view.description("10.0.0.1"))
+
+    def test_views_are_not_changed(self):
+        """Views should keep answering as of snapshot time."""
+        address_space = AddressSpace(strict_=False)
+        generator = random.Random(20)
+        views = list()
+        copies = list()
+        candidates = [
+            "10.0.0.0/8", "10.0.0.0/16", "10.0.0.0/24", "10.0.0.0",
+            "10.0.0.1", "10.0.0.1/32", "10.1.0.0/16", "10.1.2.3",
+            "10.255.0.0/16", "0.0.0.0/0", "2001:db8::/32", "2001:db8::1",
+            "2001:db8::/48", "2001:db8::1/128",
+        ]
+        for step in range(300):
+            ip_parameter = generator.choice(candidates)
+            if generator.random() < 0.6:
+                address_space.describe(
+                    ip_parameter=ip_parameter, description=f"step {step}"
+                )
+            elif address_space.description(ip_parameter):
+                address_space.delete(
+                    ip_parameter=ip_parameter,
+                    cascade=generator.random() < 0.3,
+                )
+            if step % 25 == 0:
+                views.append(address_space.snapshot())
+                copies.append(self.copy(address_space))
+        for view, copy in zip(views, copies):
+            with self.subTest(view=view):
+                self.assert_same_as(view, copy)
+        self.assert_same_as(address_space.snapshot(), address_space)
+
+    def copy(self, address_space):
+        """Returns an independent copy of an address space."""
+        copy = AddressSpace(strict_=address_space.strict)
+        copy.describe_many(
+            (ip_object, description)
+            for _, ip_object, description in address_space.iter_export()
+        )
+        return copy
+
+    def test_view_follows_bulk_and_allocations(self):
+        """Changes through every mutation should reach later views."""
+        address_space = AddressSpace(strict_=True)
+        address_space.snapshot()
+        address_space.describe_many(
+            [("192.0.2.0/24", "TEST-NET-1"), ("2001:db8::/32", "doc")],
+            delegated=True,
+        )
+        address_space.describe_many([("192.0.2.0/24", "renamed")])
+        address_space.allocate("192.0.2.0/24", 26, "allocated")
+        address_space.allocate_address("192.0.2.0/24", "host")
+        self.assert_same_as(address_space.snapshot(), address_space)
+
+    def test_thread_safe_snapshot(self):
+        """Thread-safe address spaces should also take views."""
+        tsas = ThreadSafeAddressSpace(strict_=False)
+        tsas.describe(ip_parameter="192.0.2.0/24", description="TEST-NET-1")
+        view = tsas.snapshot()
+        tsas.delete(ip_parameter="192.0.2.0/24", cascade=True)
+        self.assertEqual(view.description("192.0.2.0/24"), "TEST-NET-1")
+        self.assertIsNone(tsas.description("192.0.2.0/24"))